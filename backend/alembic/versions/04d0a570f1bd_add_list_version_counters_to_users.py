@@ -0,0 +1,31 @@
+"""Add runs_version and reports_version counters to users
+
+Revision ID: 04d0a570f1bd
+Revises: ca895d721646
+Create Date: 2025-11-08 11:37:14.902615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '04d0a570f1bd'
+down_revision: Union[str, Sequence[str], None] = 'ca895d721646'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 상수 기본값이 있는 NOT NULL 컬럼 추가는 테이블을 다시 쓰지 않음
+    op.add_column('users', sa.Column('runs_version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('reports_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'reports_version')
+    op.drop_column('users', 'runs_version')
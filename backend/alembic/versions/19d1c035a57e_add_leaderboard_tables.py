@@ -0,0 +1,60 @@
+"""Add personal_bests, weekly_distance and leaderboard_buckets tables
+
+Revision ID: 19d1c035a57e
+Revises: 04d0a570f1bd
+Create Date: 2025-11-10 14:22:51.306187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '19d1c035a57e'
+down_revision: Union[str, Sequence[str], None] = '04d0a570f1bd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 기존 기록은 마이그레이션 후 python -m app.leaderboards rebuild로 채움
+    op.create_table('personal_bests',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('distance', sa.String(length=10), nullable=False),
+    sa.Column('pace_seconds_per_km', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('duration_seconds', sa.Integer(), nullable=False),
+    sa.Column('run_id', sa.BigInteger(), nullable=False),
+    sa.Column('run_date', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'distance')
+    )
+    op.create_index('ix_personal_bests_distance_pace_user_id', 'personal_bests', ['distance', 'pace_seconds_per_km', 'user_id'], unique=False)
+    op.create_table('weekly_distance',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('week_start', sa.DATE(), nullable=False),
+    sa.Column('total_distance_km', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('run_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'week_start')
+    )
+    op.create_index('ix_weekly_distance_week_start_total_user_id', 'weekly_distance', ['week_start', sa.text('total_distance_km DESC'), 'user_id'], unique=False)
+    op.create_table('leaderboard_buckets',
+    sa.Column('board', sa.String(length=30), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('entries', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('board', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('leaderboard_buckets')
+    op.drop_index('ix_weekly_distance_week_start_total_user_id', table_name='weekly_distance')
+    op.drop_table('weekly_distance')
+    op.drop_index('ix_personal_bests_distance_pace_user_id', table_name='personal_bests')
+    op.drop_table('personal_bests')
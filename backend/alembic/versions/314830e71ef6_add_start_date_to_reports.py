@@ -0,0 +1,28 @@
+"""Add start_date to reports for range reports
+
+Revision ID: 314830e71ef6
+Revises: 72bade36e5ce
+Create Date: 2025-10-25 15:08:52.117340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '314830e71ef6'
+down_revision: Union[str, Sequence[str], None] = '72bade36e5ce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reports', sa.Column('start_date', sa.DATE(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('reports', 'start_date')
@@ -0,0 +1,35 @@
+"""Add report_outbox table
+
+Revision ID: 43d468689442
+Revises: 89ad43dea2bf
+Create Date: 2025-10-29 19:47:25.631890
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '43d468689442'
+down_revision: Union[str, Sequence[str], None] = '89ad43dea2bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('report_outbox',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('report_id', sa.BigInteger(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['report_id'], ['reports.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('report_outbox')
@@ -0,0 +1,37 @@
+"""Add (user_id, run_date DESC, id DESC) index on runs
+
+Revision ID: 4b8e1f0a9d27
+Revises: c2dfdddcbe3c
+Create Date: 2025-10-20 21:02:11.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e1f0a9d27'
+down_revision: Union[str, Sequence[str], None] = 'c2dfdddcbe3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 운영 중인 runs 테이블에 쓰기 잠금을 걸지 않도록 CONCURRENTLY로 생성
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_runs_user_id_run_date_id',
+            'runs',
+            ['user_id', sa.text('run_date DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_runs_user_id_run_date_id', table_name='runs', postgresql_concurrently=True)
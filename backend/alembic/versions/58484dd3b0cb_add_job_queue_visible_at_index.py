@@ -0,0 +1,29 @@
+"""Add job_queue visible_at index
+
+Revision ID: 58484dd3b0cb
+Revises: ec51be9d65f1
+Create Date: 2025-11-18 09:12:47.305611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '58484dd3b0cb'
+down_revision: Union[str, Sequence[str], None] = 'ec51be9d65f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # claim, dead-letter 이동, 깊이 조회가 모두 visible_at <= now()로 찾음
+    op.create_index(op.f('ix_job_queue_visible_at'), 'job_queue', ['visible_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_queue_visible_at'), table_name='job_queue')
@@ -0,0 +1,41 @@
+"""Add run_daily_stats rollup table
+
+Revision ID: 72bade36e5ce
+Revises: 4b8e1f0a9d27
+Create Date: 2025-10-22 22:41:37.902514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '72bade36e5ce'
+down_revision: Union[str, Sequence[str], None] = '4b8e1f0a9d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 기존 데이터는 `python -m app.backfill`로 채움
+    op.create_table('run_daily_stats',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('day', sa.DATE(), nullable=False),
+    sa.Column('run_count', sa.Integer(), nullable=False),
+    sa.Column('total_distance_km', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('total_duration_seconds', sa.BigInteger(), nullable=False),
+    sa.Column('best_pace_seconds_per_km', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('slowest_pace_seconds_per_km', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('longest_run_km', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('run_daily_stats')
@@ -0,0 +1,42 @@
+"""Add run_tracks table
+
+Revision ID: 754c50ff4e91
+Revises: 7fa8ea269954
+Create Date: 2025-11-14 16:05:37.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '754c50ff4e91'
+down_revision: Union[str, Sequence[str], None] = '7fa8ea269954'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('run_tracks',
+    sa.Column('run_id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('run_date', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('summary', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('run_id')
+    )
+    op.create_index(op.f('ix_run_tracks_user_id'), 'run_tracks', ['user_id'], unique=False)
+    # 이미 압축한 배열이므로 TOAST 압축을 다시 시도하지 않음
+    op.execute("ALTER TABLE run_tracks ALTER COLUMN data SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_run_tracks_user_id'), table_name='run_tracks')
+    op.drop_table('run_tracks')
@@ -0,0 +1,117 @@
+"""Partition runs by month on run_date
+
+Revision ID: 7fa8ea269954
+Revises: 19d1c035a57e
+Create Date: 2025-11-12 09:48:03.771520
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7fa8ea269954'
+down_revision: Union[str, Sequence[str], None] = '19d1c035a57e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 마이그레이션 시점에 이번 달 이후로 미리 만들어 둘 파티션 수 (이후는 app.partitions ensure가 만듦)
+MONTHS_AHEAD = 3
+
+RUN_COLUMNS = (
+    "id, user_id, run_date, distance_km, duration_seconds, avg_pace_seconds_per_km, "
+    "calories_burned, notes, created_at, updated_at"
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 기존 행을 새 파티션 테이블로 복사하는 동안 runs에 쓰기가 막히므로 쓰기가 적은 시간에 실행
+    op.execute("LOCK TABLE runs IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE runs RENAME TO runs_unpartitioned")
+    op.execute("ALTER INDEX runs_pkey RENAME TO runs_unpartitioned_pkey")
+    op.execute("ALTER INDEX ix_runs_id RENAME TO ix_runs_unpartitioned_id")
+    op.execute("ALTER INDEX ix_runs_user_id_run_date_id RENAME TO ix_runs_unpartitioned_user_id_run_date_id")
+    # 기존 id 시퀀스를 이어서 사용, 이전 테이블을 지울 때 같이 지워지지 않도록 소유를 풀어 둠
+    op.execute("ALTER SEQUENCE runs_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE runs (
+            id BIGINT NOT NULL DEFAULT nextval('runs_id_seq'),
+            user_id BIGINT NOT NULL REFERENCES users (id),
+            run_date TIMESTAMP WITH TIME ZONE NOT NULL,
+            distance_km NUMERIC(10, 2) NOT NULL,
+            duration_seconds INTEGER NOT NULL,
+            avg_pace_seconds_per_km INTEGER,
+            calories_burned INTEGER,
+            notes VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT runs_pkey PRIMARY KEY (id, run_date)
+        ) PARTITION BY RANGE (run_date)
+    """)
+    # 파티션이 없는 달의 기록(아주 오래된 기록을 가져온 경우 등)을 받는 파티션
+    op.execute("CREATE TABLE runs_default PARTITION OF runs DEFAULT")
+
+    # 가장 오래된 기록의 달부터 MONTHS_AHEAD개월 뒤까지 월별 파티션 (UTC 기준 월)
+    this_month = date.today().replace(day=1)
+    first_month = op.get_bind().execute(sa.text(
+        "SELECT date_trunc('month', min(run_date) AT TIME ZONE 'UTC')::date FROM runs_unpartitioned"
+    )).scalar() or this_month
+    month = min(first_month, this_month)
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE runs_{month:%Y%m} PARTITION OF runs "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+
+    op.execute(f"INSERT INTO runs ({RUN_COLUMNS}) SELECT {RUN_COLUMNS} FROM runs_unpartitioned")
+    # 부모에 만든 인덱스는 모든 파티션(이후에 만드는 파티션 포함)에 같이 만들어짐
+    op.create_index('ix_runs_id', 'runs', ['id'], unique=False)
+    op.create_index('ix_runs_user_id_run_date_id', 'runs', ['user_id', sa.text('run_date DESC'), sa.text('id DESC')], unique=False)
+    op.execute("DROP TABLE runs_unpartitioned")
+    op.execute("ALTER SEQUENCE runs_id_seq OWNED BY runs.id")
+    op.execute("ANALYZE runs")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # runs에 붙어 있는 파티션의 행만 되돌림 (app.partitions archive로 떼어낸 파티션은 제외)
+    op.execute("LOCK TABLE runs IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE runs RENAME TO runs_partitioned")
+    op.execute("ALTER INDEX runs_pkey RENAME TO runs_partitioned_pkey")
+    op.execute("ALTER INDEX ix_runs_id RENAME TO ix_runs_partitioned_id")
+    op.execute("ALTER INDEX ix_runs_user_id_run_date_id RENAME TO ix_runs_partitioned_user_id_run_date_id")
+    op.execute("ALTER SEQUENCE runs_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE runs (
+            id BIGINT NOT NULL DEFAULT nextval('runs_id_seq'),
+            user_id BIGINT NOT NULL REFERENCES users (id),
+            run_date TIMESTAMP WITH TIME ZONE NOT NULL,
+            distance_km NUMERIC(10, 2) NOT NULL,
+            duration_seconds INTEGER NOT NULL,
+            avg_pace_seconds_per_km INTEGER,
+            calories_burned INTEGER,
+            notes VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT runs_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"INSERT INTO runs ({RUN_COLUMNS}) SELECT {RUN_COLUMNS} FROM runs_partitioned")
+    # 파티션은 부모 테이블과 함께 삭제됨
+    op.execute("DROP TABLE runs_partitioned")
+    op.execute("ALTER SEQUENCE runs_id_seq OWNED BY runs.id")
+    op.create_index('ix_runs_id', 'runs', ['id'], unique=False)
+    op.create_index('ix_runs_user_id_run_date_id', 'runs', ['user_id', sa.text('run_date DESC'), sa.text('id DESC')], unique=False)
@@ -0,0 +1,36 @@
+"""Add (user_id, report_type, target_date) index on reports
+
+Revision ID: 89ad43dea2bf
+Revises: 314830e71ef6
+Create Date: 2025-10-27 20:16:03.584127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '89ad43dea2bf'
+down_revision: Union[str, Sequence[str], None] = '314830e71ef6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reports_user_id_report_type_target_date',
+            'reports',
+            ['user_id', 'report_type', 'target_date'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reports_user_id_report_type_target_date', table_name='reports', postgresql_concurrently=True)
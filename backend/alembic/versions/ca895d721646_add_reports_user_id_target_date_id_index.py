@@ -0,0 +1,36 @@
+"""Add (user_id, target_date DESC, id DESC) index on reports
+
+Revision ID: ca895d721646
+Revises: c7b89ef75fc3
+Create Date: 2025-11-06 16:08:52.271930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca895d721646'
+down_revision: Union[str, Sequence[str], None] = 'c7b89ef75fc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reports_user_id_target_date_id',
+            'reports',
+            ['user_id', sa.text('target_date DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reports_user_id_target_date_id', table_name='reports', postgresql_concurrently=True)
@@ -0,0 +1,40 @@
+"""Shard leaderboard_buckets rows by user_id
+
+Revision ID: efde78ce4396
+Revises: 754c50ff4e91
+Create Date: 2025-11-17 10:31:12.584207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'efde78ce4396'
+down_revision: Union[str, Sequence[str], None] = '754c50ff4e91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 기존 인원 수는 shard 0에 남음 (순위는 합산하므로 그대로 맞음)
+    # python -m app.leaderboards check --repair가 shard별로 다시 나눔
+    op.add_column('leaderboard_buckets', sa.Column('shard', sa.Integer(), server_default='0', nullable=False))
+    op.drop_constraint('leaderboard_buckets_pkey', 'leaderboard_buckets', type_='primary')
+    op.create_primary_key('leaderboard_buckets_pkey', 'leaderboard_buckets', ['board', 'bucket', 'shard'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE TEMPORARY TABLE leaderboard_buckets_merged ON COMMIT DROP AS
+        SELECT board, bucket, sum(entries)::int AS entries FROM leaderboard_buckets GROUP BY board, bucket
+    """)
+    op.execute("DELETE FROM leaderboard_buckets")
+    op.drop_constraint('leaderboard_buckets_pkey', 'leaderboard_buckets', type_='primary')
+    op.drop_column('leaderboard_buckets', 'shard')
+    op.create_primary_key('leaderboard_buckets_pkey', 'leaderboard_buckets', ['board', 'bucket'])
+    op.execute("INSERT INTO leaderboard_buckets (board, bucket, entries) SELECT board, bucket, entries FROM leaderboard_buckets_merged")
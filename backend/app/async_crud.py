@@ -0,0 +1,139 @@
+# app/async_crud.py
+# API 라우터에서 사용하는 crud.py의 async 버전
+# 쿼리는 crud의 *_statement 함수를 같이 사용하고 실행만 await로 함
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import cache, crud, models, schemas
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(crud.user_by_email_statement(email))).scalars().first()
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str):
+    db_user = crud.new_user(user, hashed_password)
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def update_user_password(db: AsyncSession, db_user: models.User, hashed_password: str):
+    db_user.password = hashed_password
+    await db.commit()
+    # 사용자 행이 바뀌었으므로 이 프로세스에 캐시된 토큰/사용자도 버림
+    cache.invalidate_user(db_user.id)
+
+async def get_list_versions(db: AsyncSession, user_id: int):
+    """(runs_version, reports_version)"""
+    return (await db.execute(crud.list_versions_statement(user_id))).one()
+
+async def create_run(db: AsyncSession, run: schemas.RunCreate, user_id: int):
+    db_run = crud.new_run(run, user_id)
+    db.add(db_run)
+    await db.flush()
+    # 일별 집계, 개인 기록, 리더보드도 같은 트랜잭션에서 갱신
+    for stmt in crud.runs_inserted_statements([db_run]):
+        await db.execute(stmt)
+    await db.commit()
+    await db.refresh(db_run)
+    return db_run
+
+async def create_track_run(db: AsyncSession, db_run: models.Run, db_track: models.RunTrack):
+    """crud.new_track_run으로 만든 Run과 트랙을 한 트랜잭션으로 추가"""
+    db.add(db_run)
+    await db.flush()
+    db_track.run_id = db_run.id
+    db.add(db_track)
+    for stmt in crud.runs_inserted_statements([db_run]):
+        await db.execute(stmt)
+    await db.commit()
+    await db.refresh(db_run)
+    return db_run
+
+async def get_run_track(db: AsyncSession, run_id: int, user_id: int, with_samples: bool = True) -> Optional[models.RunTrack]:
+    """트랙 하나는 run_tracks 한 행(샘플 blob 하나)만 읽음"""
+    stmt = crud.run_track_statement(run_id, user_id) if with_samples else crud.run_track_summary_statement(run_id, user_id)
+    return (await db.execute(stmt)).scalars().first()
+
+async def get_runs_by_user(db: AsyncSession, user_id: int, cursor: Optional[Tuple[datetime, int]] = None, limit: int = 100):
+    return (await db.execute(crud.runs_by_user_statement(user_id, cursor, limit))).scalars().all()
+
+async def get_run_rows_by_user(db: AsyncSession, user_id: int, cursor: Optional[Tuple[datetime, int]] = None, limit: int = 100):
+    """목록 응답용, crud.RUN_LIST_COLUMNS의 행을 반환"""
+    stmt = crud.runs_by_user_statement(user_id, cursor, limit, columns=crud.RUN_LIST_COLUMNS)
+    return (await db.execute(stmt)).all()
+
+async def create_run_import(db: AsyncSession, user_id: int, format: str) -> models.RunImport:
+    db_import = models.RunImport(user_id=user_id, format=format, status="PENDING")
+    db.add(db_import)
+    await db.commit()
+    await db.refresh(db_import)
+    return db_import
+
+async def get_run_import(db: AsyncSession, import_id: int, user_id: int) -> Optional[models.RunImport]:
+    return (await db.execute(crud.run_import_statement(import_id, user_id))).scalars().first()
+
+async def find_reusable_report(db: AsyncSession, report: schemas.ReportCreate, user_id: int) -> Optional[models.Report]:
+    existing = (await db.execute(crud.latest_report_statement(report, user_id))).scalars().first()
+    if existing is None:
+        return None
+    last_run_written_at = None
+    if existing.status == "COMPLETED":
+        last_run_written_at = (await db.execute(crud.last_run_written_at_statement(report, user_id))).scalar()
+    return existing if crud.is_report_reusable(existing, last_run_written_at) else None
+
+async def get_or_create_report_request(db: AsyncSession, report: schemas.ReportCreate, user_id: int):
+    await db.execute(crud.report_lock_statement(user_id))
+    existing = await find_reusable_report(db, report, user_id)
+    if existing is not None:
+        await db.commit()
+        return existing, False
+    return await create_report_request(db, report, user_id), True
+
+async def create_report_request(db: AsyncSession, report: schemas.ReportCreate, user_id: int):
+    db_report = models.Report(**report.dict(), user_id=user_id, status="PENDING")
+    db.add(db_report)
+    await db.flush()
+    db.add(models.ReportOutbox(report_id=db_report.id, payload=crud.report_job_message(db_report)))
+    await db.execute(crud.bump_reports_version_statement(user_id))
+    await db.commit()
+    await db.refresh(db_report)
+    return db_report
+
+async def get_reports_by_user(db: AsyncSession, user_id: int, cursor: Optional[Tuple[date, int]] = None, limit: int = 20,
+                              status: Optional[str] = None, report_type: Optional[str] = None) -> List[models.Report]:
+    stmt = crud.reports_by_user_statement(user_id, cursor, limit, status, report_type)
+    return (await db.execute(stmt)).scalars().all()
+
+async def get_report_rows_by_user(db: AsyncSession, user_id: int, cursor: Optional[Tuple[date, int]] = None, limit: int = 20,
+                                  status: Optional[str] = None, report_type: Optional[str] = None):
+    """목록 응답용, crud.REPORT_LIST_COLUMNS의 행을 반환"""
+    stmt = crud.reports_by_user_statement(user_id, cursor, limit, status, report_type, columns=crud.REPORT_LIST_COLUMNS)
+    return (await db.execute(stmt)).all()
+
+async def get_report(db: AsyncSession, report_id: int, user_id: int) -> Optional[models.Report]:
+    return (await db.execute(crud.report_statement(report_id, user_id))).scalars().first()
+
+async def get_training_stats_rows(db: AsyncSession, user_id: int, start_date: date, end_date: date):
+    return (await db.execute(crud.training_stats_statement(user_id, start_date, end_date))).all()
+
+async def get_personal_bests(db: AsyncSession, user_id: int) -> List[models.PersonalBest]:
+    return (await db.execute(crud.personal_bests_by_user_statement(user_id))).scalars().all()
+
+async def get_personal_best(db: AsyncSession, user_id: int, distance: str) -> Optional[models.PersonalBest]:
+    return await db.get(models.PersonalBest, (user_id, distance))
+
+async def get_personal_best_top(db: AsyncSession, distance: str, limit: int):
+    return (await db.execute(crud.personal_best_top_statement(distance, limit))).all()
+
+async def get_personal_best_rank(db: AsyncSession, distance: str, pace) -> int:
+    return (await db.execute(crud.personal_best_rank_statement(distance, pace))).scalar()
+
+async def get_weekly_distance(db: AsyncSession, user_id: int, week_start: date) -> Optional[models.WeeklyDistance]:
+    return (await db.execute(crud.weekly_distance_statement(user_id, week_start))).scalars().first()
+
+async def get_weekly_distance_top(db: AsyncSession, week_start: date, limit: int):
+    return (await db.execute(crud.weekly_distance_top_statement(week_start, limit))).all()
+
+async def get_weekly_distance_rank(db: AsyncSession, week_start: date, total_distance_km) -> int:
+    return (await db.execute(crud.weekly_distance_rank_statement(week_start, total_distance_km))).scalar()
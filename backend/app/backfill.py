@@ -0,0 +1,48 @@
+# app/backfill.py
+"""runs 테이블의 기존 데이터로 run_daily_stats를 채우는 백필 명령
+
+    python -m app.backfill --chunk-size 1000
+
+user_id 순서로 chunk-size명씩 나누어 다시 계산하고 청크마다 커밋함.
+같은 범위를 다시 실행해도 결과가 같으므로 중간에 실패하면 --start-user-id로 이어서 실행하면 됨.
+백필 도중 들어온 기록이 덮어써지지 않도록 쓰기가 적은 시간에 실행하는 것을 권장.
+"""
+
+import argparse
+import logging
+
+from . import crud, models
+from .database import SessionLocal
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log = logging.getLogger("backfill")
+
+
+def backfill_run_daily_stats(chunk_size: int, start_user_id: int = 0):
+    db = SessionLocal()
+    try:
+        last_user_id = start_user_id - 1
+        while True:
+            user_ids = [
+                user_id for (user_id,) in db.query(models.User.id)
+                .filter(models.User.id > last_user_id)
+                .order_by(models.User.id)
+                .limit(chunk_size)
+            ]
+            if not user_ids:
+                break
+            crud.rebuild_run_daily_stats(db, user_ids[0], user_ids[-1])
+            db.commit()
+            last_user_id = user_ids[-1]
+            log.info(f"Backfilled run_daily_stats for user_id {user_ids[0]}..{user_ids[-1]}")
+    finally:
+        db.close()
+    log.info("run_daily_stats backfill finished.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill run_daily_stats from runs")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--start-user-id", type=int, default=0)
+    args = parser.parse_args()
+    backfill_run_daily_stats(args.chunk_size, args.start_user_id)
@@ -0,0 +1,83 @@
+# app/cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+STATS_CACHE_MAX_SIZE = int(os.getenv("STATS_CACHE_MAX_SIZE", "10000"))
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "3600"))
+
+
+class TTLCache:
+    """크기 제한이 있는 LRU 캐시, 항목마다 만료 시각이 있음
+    가득 차면 가장 오래 사용하지 않은 항목부터 버림"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key: Hashable, value, ttl_seconds: Optional[float] = None):
+        """ttl_seconds를 주면 기본 TTL보다 짧은 경우에만 적용 (토큰 만료 시각 등)"""
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[object], bool]):
+        with self._lock:
+            for key in [key for key, (_, value) in self._items.items() if predicate(value)]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+# 검증이 끝난 토큰 -> schemas.CurrentUser
+token_cache = TTLCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
+# 이메일 -> schemas.CurrentUser (uid 클레임이 없는 이전 토큰용)
+user_cache = TTLCache(AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+# (user_id, start_date, end_date) -> (runs_version, 인코딩된 GET /stats 응답)
+# 기록이 추가되면 runs_version이 바뀌므로 이전 항목은 버전 비교로 무효가 됨
+stats_cache = TTLCache(STATS_CACHE_MAX_SIZE, STATS_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int):
+    """사용자 정보가 바뀌거나 삭제되었을 때 호출해서 캐시된 토큰/사용자를 버림
+    캐시가 프로세스마다 따로 있으므로 다른 프로세스에는 TTL이 지나야 반영됨"""
+    token_cache.invalidate_where(lambda user: user.id == user_id)
+    user_cache.invalidate_where(lambda user: user.id == user_id)
@@ -0,0 +1,32 @@
+# app/conditional.py
+# 목록 응답의 ETag / If-None-Match 처리
+# ETag는 사용자별 버전(users.runs_version, reports_version)과 쿼리 문자열로 만들어서
+# 버전만 조회하면 목록 행을 읽지 않고도 변경 여부를 알 수 있음
+
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+
+
+def make_etag(kind: str, user_id: int, version: int, request: Request) -> str:
+    # 같은 목록이라도 cursor/limit/필터가 다르면 다른 응답이므로 쿼리 문자열도 포함
+    query = hashlib.sha256(str(request.url.query).encode()).hexdigest()[:16]
+    return f'"{kind}-{user_id}-{version}-{query}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (candidate.strip() for candidate in header.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """If-None-Match가 현재 ETag와 같으면 304 응답을, 아니면 None을 반환하고 응답에 ETag를 붙임"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,55 +1,797 @@
 # app/crud.py
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from . import models, schemas, hashing
-from datetime import datetime
-from typing import List
+import json
+import math
+from decimal import ROUND_HALF_UP, Decimal
+from sqlalchemy.orm import Session, defer
+from sqlalchemy import DATE, DECIMAL, Integer, and_, cast, delete, except_, func, literal, literal_column, select, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from . import models, schemas, hashing, tracing, tracks
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+# 아래 *_statement 함수들은 쿼리만 만들고, 실행은 crud(sync)와 async_crud가 각각 담당
+
+def user_by_email_statement(email: str):
+    return select(models.User).where(models.User.email == email)
 
 def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+    return db.execute(user_by_email_statement(email)).scalars().first()
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = hashing.Hasher.get_password_hash(user.password)
-    db_user = models.User(
+def new_user(user: schemas.UserCreate, hashed_password: str) -> models.User:
+    return models.User(
         username=user.username, email=user.email, password=hashed_password
     )
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    if hashed_password is None:
+        hashed_password = hashing.Hasher.get_password_hash(user.password)
+    db_user = new_user(user, hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
-def create_run(db: Session, run: schemas.RunCreate, user_id: int):
-    db_run = models.Run(
-        **run.dict(),
-        user_id=user_id,
-        run_date=datetime.now()
+def bump_runs_version_statement(user_ids: Iterable[int]):
+    """목록 캐시 무효화용 버전 증가, 프로필 변경이 아니므로 updated_at은 그대로 둠"""
+    return update(models.User).where(models.User.id.in_(sorted(set(user_ids)))).values(
+        runs_version=models.User.runs_version + 1, updated_at=models.User.updated_at
+    )
+
+def bump_reports_version_statement(user_id):
+    """user_id에는 값이나 스칼라 서브쿼리를 넘길 수 있음"""
+    return update(models.User).where(models.User.id == user_id).values(
+        reports_version=models.User.reports_version + 1, updated_at=models.User.updated_at
     )
+
+def list_versions_statement(user_id: int):
+    return select(models.User.runs_version, models.User.reports_version).where(models.User.id == user_id)
+
+# 기록의 날짜(run_daily_stats.day, 주간 거리, 리포트/통계의 날짜 조건)는 run_date의 UTC 기준 날짜
+# 클라이언트 시간대(+09:00 등)로 저장된 기록도 증분 갱신과 재계산이 같은 날로 셈
+# 시간대가 없는 시각은 UTC로 봄 (월별 파티션도 UTC 기준)
+def as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def run_day_of(run_date: datetime) -> date:
+    return as_utc(run_date).date()
+
+def run_day_expression():
+    """run_day_of와 같은 날짜를 계산하는 SQL 식 (세션 시간대와 관계없음)"""
+    # GROUP BY에서 SELECT와 같은 식으로 인식되도록 상수로 씀
+    return cast(func.timezone(literal_column("'UTC'"), models.Run.run_date), DATE)
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+def day_start_utc(day: date) -> datetime:
+    """run_date를 날짜 범위로 거를 때의 경계 (UTC 자정)"""
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+def new_run_values(run: schemas.RunCreate, user_id: int) -> dict:
+    return {
+        **run.dict(),
+        **tracks.derived_run_values(run.distance_km, run.duration_seconds),
+        "user_id": user_id,
+        "run_date": datetime.now(timezone.utc),
+    }
+
+def new_run(run: schemas.RunCreate, user_id: int) -> models.Run:
+    return models.Run(**new_run_values(run, user_id))
+
+def create_run(db: Session, run: schemas.RunCreate, user_id: int):
+    db_run = new_run(run, user_id)
     db.add(db_run)
+    db.flush()
+    # 일별 집계, 개인 기록, 리더보드도 같은 트랜잭션에서 갱신
+    for stmt in runs_inserted_statements([db_run]):
+        db.execute(stmt)
     db.commit()
     db.refresh(db_run)
     return db_run
 
-def get_runs_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Run).filter(models.Run.user_id == user_id).offset(skip).limit(limit).all()
+def insert_runs(db: Session, rows: List[dict]):
+    """여러 Run을 multi-row INSERT로 추가하고 일별 집계와 리더보드도 같이 갱신, 커밋은 호출하는 쪽에서
+    rows는 models.Run 컬럼 이름의 dict"""
+    if not rows:
+        return
+    runs = db.scalars(insert_runs_returning_statement(), rows).all()
+    for stmt in runs_inserted_statements(runs):
+        db.execute(stmt)
+
+def insert_runs_returning_statement():
+    """executemany로 실행하는 multi-row INSERT ... RETURNING, 결과는 파라미터 순서와 같음"""
+    return insert(models.Run).returning(models.Run, sort_by_parameter_order=True)
+
+def daily_stats_rows(runs: Iterable[models.Run]):
+    """새로 추가되는 Run들을 (user_id, day)별 증분 값으로 묶는 함수"""
+    rows = {}
+    for run in runs:
+        key = (run.user_id, run_day_of(run.run_date))
+        distance = float(run.distance_km)
+        pace = run.duration_seconds / distance if distance > 0 else None
+        row = rows.get(key)
+        if row is None:
+            rows[key] = {
+                "user_id": run.user_id,
+                "day": key[1],
+                "run_count": 1,
+                "total_distance_km": distance,
+                "total_duration_seconds": run.duration_seconds,
+                "best_pace_seconds_per_km": pace,
+                "slowest_pace_seconds_per_km": pace,
+                "longest_run_km": distance,
+            }
+            continue
+        row["run_count"] += 1
+        row["total_distance_km"] += distance
+        row["total_duration_seconds"] += run.duration_seconds
+        if pace is not None:
+            row["best_pace_seconds_per_km"] = min(p for p in (row["best_pace_seconds_per_km"], pace) if p is not None)
+            row["slowest_pace_seconds_per_km"] = max(p for p in (row["slowest_pace_seconds_per_km"], pace) if p is not None)
+        row["longest_run_km"] = max(row["longest_run_km"], distance)
+    return list(rows.values())
+
+def run_daily_stats_upsert_statement(rows: List[dict]):
+    """run_daily_stats에 증분 값을 더하는 upsert"""
+    table = models.RunDailyStat
+    stmt = insert(table).values(rows)
+    excluded = stmt.excluded
+    # PostgreSQL의 LEAST/GREATEST는 NULL을 무시함
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.user_id, table.day],
+        set_={
+            "run_count": table.run_count + excluded.run_count,
+            "total_distance_km": table.total_distance_km + excluded.total_distance_km,
+            "total_duration_seconds": table.total_duration_seconds + excluded.total_duration_seconds,
+            "best_pace_seconds_per_km": func.least(table.best_pace_seconds_per_km, excluded.best_pace_seconds_per_km),
+            "slowest_pace_seconds_per_km": func.greatest(table.slowest_pace_seconds_per_km, excluded.slowest_pace_seconds_per_km),
+            "longest_run_km": func.greatest(table.longest_run_km, excluded.longest_run_km),
+            "updated_at": func.now(),
+        }
+    )
+    return stmt
+
+def get_run_daily_stats(db: Session, user_id: int, day: date) -> Optional[models.RunDailyStat]:
+    return db.get(models.RunDailyStat, (user_id, day))
+
+def get_run_daily_stats_bulk(db: Session, keys: Iterable[Tuple[int, date]]) -> List[models.RunDailyStat]:
+    keys = list(keys)
+    if not keys:
+        return []
+    return db.query(models.RunDailyStat).filter(
+        tuple_(models.RunDailyStat.user_id, models.RunDailyStat.day).in_(keys)
+    ).all()
+
+def rebuild_run_daily_stats(db: Session, first_user_id: int, last_user_id: int):
+    """user_id 범위에 해당하는 run_daily_stats를 runs 원본에서 다시 계산 (커밋은 호출하는 쪽에서)"""
+    table = models.RunDailyStat
+    pace = models.Run.duration_seconds / func.nullif(models.Run.distance_km, 0)
+    run_day = run_day_expression()
+    select_stmt = db.query(
+        models.Run.user_id,
+        run_day,
+        func.count(models.Run.id),
+        func.sum(models.Run.distance_km),
+        func.sum(models.Run.duration_seconds),
+        func.min(pace),
+        func.max(pace),
+        func.max(models.Run.distance_km),
+    ).filter(
+        models.Run.user_id >= first_user_id,
+        models.Run.user_id <= last_user_id
+    ).group_by(models.Run.user_id, run_day).statement
+
+    columns = [
+        "user_id", "day", "run_count", "total_distance_km", "total_duration_seconds",
+        "best_pace_seconds_per_km", "slowest_pace_seconds_per_km", "longest_run_km",
+    ]
+    stmt = insert(table).from_select(columns, select_stmt)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.user_id, table.day],
+        set_={**{name: stmt.excluded[name] for name in columns[2:]}, "updated_at": func.now()}
+    )
+    db.execute(stmt)
+
+# 키셋 페이지네이션: (run_date, id) 내림차순으로 정렬하고 커서 이후의 행만 조회
+# (user_id, run_date DESC, id DESC) 인덱스를 그대로 타므로 몇 번째 페이지든 비용이 같음
+# 목록 응답(schemas.RunDisplay)에 필요한 컬럼만, 필드 순서도 RunDisplay와 같게
+RUN_LIST_COLUMNS = (
+    models.Run.distance_km, models.Run.duration_seconds, models.Run.notes,
+    models.Run.id, models.Run.user_id, models.Run.run_date,
+    models.Run.avg_pace_seconds_per_km, models.Run.calories_burned,
+)
+
+def runs_by_user_statement(user_id: int, cursor: Optional[Tuple[datetime, int]] = None, limit: int = 100, columns=None):
+    """columns를 주면 ORM 객체 대신 해당 컬럼의 행(tuple)을 조회"""
+    stmt = (select(*columns) if columns else select(models.Run)).where(models.Run.user_id == user_id)
+    if cursor is not None:
+        stmt = stmt.where(tuple_(models.Run.run_date, models.Run.id) < cursor)
+    return stmt.order_by(models.Run.run_date.desc(), models.Run.id.desc()).limit(limit)
+
+def get_runs_by_user(db: Session, user_id: int, cursor: Optional[Tuple[datetime, int]] = None, limit: int = 100):
+    return db.execute(runs_by_user_statement(user_id, cursor, limit)).scalars().all()
+
+# 내보내기(GET /runs/export)용, 오래된 기록부터
+RUN_EXPORT_COLUMNS = (
+    models.Run.id, models.Run.run_date, models.Run.distance_km, models.Run.duration_seconds,
+    models.Run.avg_pace_seconds_per_km, models.Run.calories_burned, models.Run.notes, models.Run.created_at,
+)
+
+def run_export_statement(user_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """기간을 주면 run_date 조건으로 해당 월의 파티션만 읽음"""
+    stmt = select(*RUN_EXPORT_COLUMNS).where(models.Run.user_id == user_id)
+    if start_date is not None:
+        stmt = stmt.where(models.Run.run_date >= day_start_utc(start_date))
+    if end_date is not None:
+        stmt = stmt.where(models.Run.run_date < day_start_utc(end_date + timedelta(days=1)))
+    return stmt.order_by(models.Run.run_date, models.Run.id)
+
+def new_track_run(user_id: int, track: tracks.Track, notes: Optional[str] = None) -> Tuple[models.Run, models.RunTrack]:
+    """GPS 트랙에서 Run과 RunTrack을 만듦, RunTrack.run_id는 Run을 flush한 뒤 채움
+    배열 인코딩과 구간 계산은 CPU 작업이므로 요청 처리 중에는 스레드풀에서 호출"""
+    summary = tracks.summarize(track)
+    db_run = models.Run(**tracks.run_values(track, summary), user_id=user_id, notes=notes)
+    db_track = models.RunTrack(
+        user_id=user_id,
+        run_date=track.start,
+        sample_count=len(track.seconds),
+        data=tracks.encode(track),
+        summary=summary,
+    )
+    return db_run, db_track
+
+def run_track_statement(run_id: int, user_id: int):
+    return select(models.RunTrack).where(models.RunTrack.run_id == run_id, models.RunTrack.user_id == user_id)
+
+def run_track_summary_statement(run_id: int, user_id: int):
+    """샘플이 필요 없을 때 data(blob)는 읽지 않음"""
+    return run_track_statement(run_id, user_id).options(defer(models.RunTrack.data))
+
+
+def report_period(report_type: str, target_date: date, start_date: Optional[date] = None):
+    """리포트 종류에 따른 집계 기간 (start, end)을 반환, 양 끝 포함"""
+    if report_type == "daily":
+        return target_date, target_date
+    if report_type == "weekly":
+        # target_date가 속한 월요일~일요일
+        start = target_date - timedelta(days=target_date.weekday())
+        return start, start + timedelta(days=6)
+    if report_type == "monthly":
+        start = target_date.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    if report_type == "range":
+        if start_date is None or start_date > target_date:
+            raise ValueError(f"Invalid range: {start_date} ~ {target_date}")
+        return start_date, target_date
+    raise ValueError(f"Unsupported report_type: {report_type}")
+
+def report_data_period(report_type: str, target_date: date, start_date: Optional[date] = None):
+    """리포트가 실제로 읽는 기간, daily가 아니면 전주 비교용으로 start가 속한 주의 앞 주부터 포함"""
+    start, end = report_period(report_type, target_date, start_date)
+    if report_type != "daily":
+        start = start - timedelta(days=start.weekday() + 7)
+    return start, end
 
+def latest_report_statement(report: schemas.ReportCreate, user_id: int):
+    """같은 (report_type, target_date, start_date)로 처리 중이거나 완료된 가장 최근 리포트"""
+    return select(models.Report).where(
+        models.Report.user_id == user_id,
+        models.Report.report_type == report.report_type,
+        models.Report.target_date == report.target_date,
+        models.Report.start_date.is_not_distinct_from(report.start_date),
+        models.Report.status.in_(("PENDING", "COMPLETED"))
+    ).order_by(models.Report.created_at.desc()).limit(1)
+
+def last_run_written_at_statement(report: schemas.ReportCreate, user_id: int):
+    """리포트가 읽는 기간에 마지막으로 기록이 추가된 시각"""
+    start, end = report_data_period(report.report_type, report.target_date, report.start_date)
+    return select(func.max(models.RunDailyStat.updated_at)).where(
+        models.RunDailyStat.user_id == user_id,
+        models.RunDailyStat.day >= start,
+        models.RunDailyStat.day <= end
+    )
+
+# pg_advisory_xact_lock(namespace, key)의 namespace, 용도마다 키 공간을 나눠서 서로 막지 않게 함
+REPORT_LOCK_NAMESPACE = 1
+PARTITION_LOCK_NAMESPACE = 2
+
+def report_lock_statement(user_id: int):
+    # 같은 사용자의 동시 요청이 중복 리포트를 만들지 않도록 트랜잭션 동안 사용자 단위로 직렬화
+    # 두 인자 형식은 int4이므로 하위 31비트만 씀 (겹치면 두 사용자의 요청이 서로 기다릴 뿐)
+    return select(func.pg_advisory_xact_lock(REPORT_LOCK_NAMESPACE, user_id & 0x7FFFFFFF))
+
+def is_report_reusable(existing: models.Report, last_run_written_at: Optional[datetime]) -> bool:
+    """완료 리포트는 생성 이후 해당 기간에 기록이 추가되지 않았을 때만 유효함"""
+    if existing.status == "PENDING":
+        return True
+    return last_run_written_at is None or last_run_written_at < existing.created_at
+
+def find_reusable_report(db: Session, report: schemas.ReportCreate, user_id: int) -> Optional[models.Report]:
+    """처리 중이거나 아직 유효한 완료 리포트를 찾음"""
+    existing = db.execute(latest_report_statement(report, user_id)).scalars().first()
+    if existing is None:
+        return None
+    last_run_written_at = None
+    if existing.status == "COMPLETED":
+        last_run_written_at = db.execute(last_run_written_at_statement(report, user_id)).scalar()
+    return existing if is_report_reusable(existing, last_run_written_at) else None
+
+def get_or_create_report_request(db: Session, report: schemas.ReportCreate, user_id: int):
+    """재사용할 리포트가 있으면 그대로, 없으면 새 PENDING 리포트를 만들어 (report, created)로 반환"""
+    db.execute(report_lock_statement(user_id))
+    existing = find_reusable_report(db, report, user_id)
+    if existing is not None:
+        db.commit()
+        return existing, False
+    return create_report_request(db, report, user_id), True
+
+# 워커에 전달할 리포트 작업 메시지
+def report_job_message(report: models.Report) -> dict:
+    message = {
+        "report_id": report.id,
+        "user_id": report.user_id,
+        "report_type": report.report_type,
+        "target_date": report.target_date.isoformat(),
+        "start_date": report.start_date.isoformat() if report.start_date else None
+    }
+    # 요청한 API의 trace를 워커까지 이어가기 위해 현재 span을 같이 기록
+    trace = tracing.current()
+    if trace is not None:
+        message["trace_id"], message["parent_span_id"] = trace
+    return message
 
 # DB에 리포트 요청 기록 생성
 # status는 기본적으로 "PENDING"
+# 큐에 보낼 메시지는 같은 트랜잭션에서 outbox에 기록하고, 실제 전송은 outbox.OutboxPublisher가 담당
 def create_report_request(db: Session, report: schemas.ReportCreate, user_id: int):
     db_report = models.Report(**report.dict(), user_id=user_id, status="PENDING")
     db.add(db_report)
+    db.flush()
+    db.add(models.ReportOutbox(report_id=db_report.id, payload=report_job_message(db_report)))
+    db.execute(bump_reports_version_statement(user_id))
     db.commit()
     db.refresh(db_report)
     return db_report
 
-def update_report_content(db: Session, report_id: int, content: dict, status: str):
-    db.query(models.Report).filter(models.Report.id == report_id).update({
-        "content": content,
+def claim_outbox_batch(db: Session, limit: int) -> List[models.ReportOutbox]:
+    """다른 publisher가 잡고 있지 않은 outbox 행을 오래된 순으로 잠그고 가져옴"""
+    return db.query(models.ReportOutbox).order_by(models.ReportOutbox.id).limit(limit).with_for_update(skip_locked=True).all()
+
+def delete_outbox_entries(db: Session, outbox_ids: List[int]):
+    if outbox_ids:
+        db.query(models.ReportOutbox).filter(models.ReportOutbox.id.in_(outbox_ids)).delete(synchronize_session=False)
+
+def run_import_statement(import_id: int, user_id: int):
+    return select(models.RunImport).where(models.RunImport.id == import_id, models.RunImport.user_id == user_id)
+
+def update_run_import(db: Session, import_id: int, **values):
+    db.query(models.RunImport).filter(models.RunImport.id == import_id).update(values)
+
+# API 프로세스들이 LISTEN하는 리포트 상태 변경 채널 (app.report_events)
+REPORT_EVENTS_CHANNEL = "report_events"
+
+def report_event_payload(report_id: int, user_id: int, status: str, report_type: str, target_date: date) -> str:
+    return json.dumps({
+        "report_id": report_id,
+        "user_id": user_id,
         "status": status,
-        "completed_at": func.now()
+        "report_type": report_type,
+        "target_date": target_date.isoformat(),
     })
+
+def update_report_content(db: Session, report_id: int, content: dict, status: str):
+    updated = db.execute(
+        update(models.Report).where(models.Report.id == report_id).values(
+            content=content,
+            status=status,
+            completed_at=func.now()
+        ).returning(models.Report.user_id, models.Report.report_type, models.Report.target_date)
+    ).first()
+    if updated is not None:
+        db.execute(bump_reports_version_statement(updated.user_id))
+        # NOTIFY는 커밋될 때 전달되므로 클라이언트가 알림을 받은 뒤 조회하면 항상 바뀐 상태가 보임
+        payload = report_event_payload(report_id, updated.user_id, status, updated.report_type, updated.target_date)
+        db.execute(select(func.pg_notify(REPORT_EVENTS_CHANNEL, payload)))
     db.commit()
 
-def get_reports_by_user(db: Session, user_id: int) -> List[models.Report]:
-    return db.query(models.Report).filter(models.Report.user_id == user_id).order_by(models.Report.target_date.desc()).all()
\ No newline at end of file
+# 목록 응답(schemas.ReportSummary)에 필요한 컬럼만, 필드 순서도 ReportSummary와 같게
+REPORT_LIST_COLUMNS = (
+    models.Report.report_type, models.Report.target_date, models.Report.start_date,
+    models.Report.id, models.Report.user_id, models.Report.status,
+    models.Report.created_at, models.Report.completed_at,
+)
+
+def reports_by_user_statement(user_id: int, cursor: Optional[Tuple[date, int]] = None, limit: int = 20,
+                              status: Optional[str] = None, report_type: Optional[str] = None, columns=None):
+    """목록 조회용이므로 content는 읽지 않음 (GET /reports/{id}에서 따로 조회)
+    columns를 주면 ORM 객체 대신 해당 컬럼의 행(tuple)을 조회"""
+    if columns:
+        stmt = select(*columns)
+    else:
+        stmt = select(models.Report).options(defer(models.Report.content))
+    stmt = stmt.where(models.Report.user_id == user_id)
+    if status is not None:
+        stmt = stmt.where(models.Report.status == status)
+    if report_type is not None:
+        stmt = stmt.where(models.Report.report_type == report_type)
+    if cursor is not None:
+        stmt = stmt.where(tuple_(models.Report.target_date, models.Report.id) < cursor)
+    return stmt.order_by(models.Report.target_date.desc(), models.Report.id.desc()).limit(limit)
+
+def get_reports_by_user(db: Session, user_id: int, cursor: Optional[Tuple[date, int]] = None, limit: int = 20,
+                        status: Optional[str] = None, report_type: Optional[str] = None) -> List[models.Report]:
+    return db.execute(reports_by_user_statement(user_id, cursor, limit, status, report_type)).scalars().all()
+
+def report_statement(report_id: int, user_id: int):
+    return select(models.Report).where(models.Report.id == report_id, models.Report.user_id == user_id)
+
+# 기간별 훈련 통계 (GET /stats)
+# runs 대신 run_daily_stats를 날짜 시리즈에 붙여서 윈도 함수로 계산하므로 행 수가 기록 수가 아닌 일수에 비례함
+TRAINING_STATS_ROLLING_DAYS = (7, 28)
+
+def training_stats_statement(user_id: int, start_date: date, end_date: date):
+    """start_date~end_date 하루 한 행
+    롤링 합이 기간 첫날에도 맞도록 start_date 이전 27일까지 계산한 뒤 결과에서 제외함
+    연속 달린 일수는 기간 이전 기록부터 이어지도록 run_daily_stats 전체에서 계산 (gaps-and-islands)"""
+    stats = models.RunDailyStat
+    lookback = max(TRAINING_STATS_ROLLING_DAYS) - 1
+
+    days = select(
+        cast(func.generate_series(start_date - timedelta(days=lookback), end_date, timedelta(days=1)), DATE).label("day")
+    ).subquery("days")
+
+    # 연속으로 달린 날들은 day - row_number()가 같음
+    ran = select(
+        stats.day,
+        (stats.day - cast(func.row_number().over(order_by=stats.day), Integer)).label("streak_group")
+    ).where(stats.user_id == user_id, stats.day <= end_date, stats.run_count > 0).subquery("ran")
+    streaks = select(
+        ran.c.day,
+        func.row_number().over(partition_by=ran.c.streak_group, order_by=ran.c.day).label("streak_days")
+    ).subquery("streaks")
+
+    distance = func.coalesce(stats.total_distance_km, 0)
+    duration = func.coalesce(stats.total_duration_seconds, 0)
+    daily = select(
+        days.c.day,
+        func.coalesce(stats.run_count, 0).label("run_count"),
+        distance.label("distance_km"),
+        duration.label("duration_seconds"),
+        stats.longest_run_km,
+        (duration / func.nullif(distance, 0)).label("pace_seconds_per_km"),
+        func.coalesce(streaks.c.streak_days, 0).label("streak_days"),
+    ).select_from(days).outerjoin(
+        stats, and_(stats.user_id == user_id, stats.day == days.c.day)
+    ).outerjoin(streaks, streaks.c.day == days.c.day).subquery("daily")
+
+    def rolling(column, days_count):
+        return func.sum(column).over(order_by=daily.c.day, rows=(-(days_count - 1), 0))
+
+    windowed = select(
+        daily,
+        *[rolling(daily.c.distance_km, n).label(f"rolling_{n}d_km") for n in TRAINING_STATS_ROLLING_DAYS],
+        (rolling(daily.c.duration_seconds, 7) / func.nullif(rolling(daily.c.distance_km, 7), 0)).label("rolling_7d_pace_seconds_per_km"),
+    ).subquery("windowed")
+
+    # 페이스 추세: 기간 안에서 달린 날의 페이스를 날짜에 대해 회귀한 기울기 (초/km, 주당 변화량, 음수면 빨라지는 중)
+    day_number = cast(windowed.c.day - start_date, Integer)
+    return select(
+        windowed.c.day,
+        windowed.c.run_count,
+        windowed.c.distance_km,
+        windowed.c.duration_seconds,
+        windowed.c.longest_run_km,
+        windowed.c.pace_seconds_per_km,
+        *[windowed.c[f"rolling_{n}d_km"] for n in TRAINING_STATS_ROLLING_DAYS],
+        windowed.c.rolling_7d_pace_seconds_per_km,
+        windowed.c.streak_days,
+        (func.regr_slope(windowed.c.pace_seconds_per_km, day_number).over() * 7).label("pace_trend_seconds_per_km_per_week"),
+    ).where(windowed.c.day >= start_date).order_by(windowed.c.day)
+
+def get_training_stats_rows(db: Session, user_id: int, start_date: date, end_date: date):
+    return db.execute(training_stats_statement(user_id, start_date, end_date)).all()
+
+# 개인 최고 기록 / 주간 거리 리더보드
+# 기록이 추가될 때 같은 트랜잭션에서 personal_bests, weekly_distance, leaderboard_buckets를 갱신함
+# 상위 N명은 인덱스 순서대로, 내 순위는 구간별 인원 수(leaderboard_buckets)로 계산하므로 runs를 정렬하지 않음
+PERSONAL_BEST_DISTANCES = {"5k": 5.0, "10k": 10.0, "half": 21.0975, "full": 42.195}
+# 구간 하나의 인원 수를 나눠 세는 행 수, 다른 사용자의 기록 저장끼리는 대부분 다른 행을 갱신함
+# 값을 바꿔도 합은 맞지만 행별 값이 재계산 결과와 달라지므로 python -m app.leaderboards check --repair를 실행
+LEADERBOARD_BUCKET_SHARDS = 16
+
+def personal_best_board(distance: str) -> str:
+    return f"pb:{distance}"
+
+def weekly_board(week_start: date) -> str:
+    return f"weekly:{week_start.isoformat()}"
+
+def week_start_of(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+# 페이스 리더보드는 1초/km, 주간 거리 리더보드는 1km 단위 구간
+def _pace_bucket(pace):
+    return cast(func.floor(pace), Integer)
+
+def _distance_bucket(distance_km):
+    return cast(func.floor(distance_km), Integer)
+
+def _bucket_shard(user_id):
+    # GROUP BY에서 SELECT와 같은 식으로 인식되도록 상수로 씀
+    return cast(user_id % literal_column(str(LEADERBOARD_BUCKET_SHARDS)), Integer)
+
+def _decimal(value, places: str) -> Decimal:
+    # PostgreSQL NUMERIC과 같이 반올림(.5는 0에서 먼 쪽)
+    return Decimal(str(value)).quantize(Decimal(places), ROUND_HALF_UP)
+
+def personal_best_rows(runs: Iterable[models.Run]) -> List[dict]:
+    """새 Run들 중 (user_id, distance)별로 가장 빠른 기록, 해당 거리 이상을 달린 기록만 후보가 됨
+    페이스와 환산 기록은 expected_personal_bests_statement(DECIMAL 연산)와 같은 값이 나오도록 Decimal로 계산"""
+    rows = {}
+    for run in runs:
+        # runs.distance_km은 DECIMAL(10, 2)이므로 저장되는 값으로 맞춘 뒤 계산
+        distance = _decimal(run.distance_km, "0.01")
+        if distance <= 0:
+            continue
+        pace = (Decimal(run.duration_seconds) / distance).quantize(Decimal("0.01"), ROUND_HALF_UP)
+        for name, km in PERSONAL_BEST_DISTANCES.items():
+            key = (run.user_id, name)
+            if distance < Decimal(str(km)) or (key in rows and rows[key]["pace_seconds_per_km"] <= pace):
+                continue
+            rows[key] = {
+                "user_id": run.user_id,
+                "distance": name,
+                "pace_seconds_per_km": pace,
+                "duration_seconds": int(_decimal(pace * Decimal(str(km)), "1")),
+                "run_id": run.id,
+                "run_date": run.run_date,
+            }
+    # 키 순서로 정렬해서 동시에 저장하는 트랜잭션끼리 같은 순서로 잠금
+    return [rows[key] for key in sorted(rows)]
+
+def weekly_distance_rows(runs: Iterable[models.Run]) -> List[dict]:
+    """새 Run들을 (user_id, 주 시작일)별 증분 값으로 묶음"""
+    rows = {}
+    for run in runs:
+        key = (run.user_id, week_start_of(run_day_of(run.run_date)))
+        row = rows.setdefault(key, {"user_id": key[0], "week_start": key[1], "total_distance_km": 0.0, "run_count": 0})
+        row["total_distance_km"] += float(run.distance_km)
+        row["run_count"] += 1
+    return [rows[key] for key in sorted(rows)]
+
+def _bucket_delta_statement(old, upserted, keys, board, bucket):
+    """upsert 전후 값으로 leaderboard_buckets를 갱신하는 쿼리
+    old는 upsert 전 값(FOR UPDATE로 잠근 행), upserted는 실제로 바뀐 행의 새 값"""
+    buckets = models.LeaderboardBucket
+    added = select(
+        board(upserted.c), bucket(upserted.c).label("bucket"), _bucket_shard(upserted.c.user_id).label("shard"), literal(1).label("delta")
+    )
+    removed = select(
+        board(old.c), bucket(old.c).label("bucket"), _bucket_shard(old.c.user_id).label("shard"), literal(-1).label("delta")
+    ).join(
+        upserted, and_(*[old.c[key] == upserted.c[key] for key in keys])
+    )
+    deltas = union_all(added, removed).subquery("deltas")
+    stmt = insert(buckets).from_select(
+        ["board", "bucket", "shard", "entries"],
+        select(deltas.c.board, deltas.c.bucket, deltas.c.shard, func.sum(deltas.c.delta))
+        .group_by(deltas.c.board, deltas.c.bucket, deltas.c.shard)
+        .having(func.sum(deltas.c.delta) != 0)
+        .order_by(deltas.c.board, deltas.c.bucket, deltas.c.shard)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[buckets.board, buckets.bucket, buckets.shard],
+        set_={"entries": buckets.entries + stmt.excluded.entries}
+    )
+    return stmt.add_cte(old, upserted)
+
+def personal_best_upsert_statement(rows: List[dict]):
+    """더 빠른 기록일 때만 personal_bests를 바꾸고, 바뀐 만큼 구간 인원 수도 옮김"""
+    table = models.PersonalBest
+    old = select(table.user_id, table.distance, table.pace_seconds_per_km).where(
+        tuple_(table.user_id, table.distance).in_([(row["user_id"], row["distance"]) for row in rows])
+    ).with_for_update().cte("old")
+    upsert = insert(table).values(rows)
+    upserted = upsert.on_conflict_do_update(
+        index_elements=[table.user_id, table.distance],
+        set_={
+            **{name: upsert.excluded[name] for name in ("pace_seconds_per_km", "duration_seconds", "run_id", "run_date")},
+            "updated_at": func.now(),
+        },
+        where=upsert.excluded.pace_seconds_per_km < table.pace_seconds_per_km
+    ).returning(table.user_id, table.distance, table.pace_seconds_per_km).cte("upserted")
+    return _bucket_delta_statement(
+        old, upserted, ["user_id", "distance"],
+        board=lambda c: (literal("pb:") + c.distance).label("board"),
+        bucket=lambda c: _pace_bucket(c.pace_seconds_per_km),
+    )
+
+def weekly_distance_upsert_statement(rows: List[dict]):
+    """주간 거리에 증분을 더하고, 구간 인원 수도 옮김"""
+    table = models.WeeklyDistance
+    old = select(table.user_id, table.week_start, table.total_distance_km).where(
+        tuple_(table.user_id, table.week_start).in_([(row["user_id"], row["week_start"]) for row in rows])
+    ).with_for_update().cte("old")
+    upsert = insert(table).values(rows)
+    upserted = upsert.on_conflict_do_update(
+        index_elements=[table.user_id, table.week_start],
+        set_={
+            "total_distance_km": table.total_distance_km + upsert.excluded.total_distance_km,
+            "run_count": table.run_count + upsert.excluded.run_count,
+            "updated_at": func.now(),
+        }
+    ).returning(table.user_id, table.week_start, table.total_distance_km).cte("upserted")
+    return _bucket_delta_statement(
+        old, upserted, ["user_id", "week_start"],
+        board=lambda c: (literal("weekly:") + func.to_char(c.week_start, "YYYY-MM-DD")).label("board"),
+        bucket=lambda c: _distance_bucket(c.total_distance_km),
+    )
+
+def runs_inserted_statements(runs: List[models.Run]):
+    """새로 저장한 Run들(id가 있어야 함)과 같은 트랜잭션에서 실행할 쿼리
+    일별 집계, 개인 최고 기록, 주간 거리, 목록 버전 순서로 실행"""
+    statements = [
+        run_daily_stats_upsert_statement(daily_stats_rows(runs)),
+        weekly_distance_upsert_statement(weekly_distance_rows(runs)),
+    ]
+    personal_bests = personal_best_rows(runs)
+    if personal_bests:
+        statements.insert(1, personal_best_upsert_statement(personal_bests))
+    statements.append(bump_runs_version_statement(run.user_id for run in runs))
+    return statements
+
+def personal_best_top_statement(distance: str, limit: int):
+    table = models.PersonalBest
+    return select(
+        table.user_id, models.User.username, table.pace_seconds_per_km, table.duration_seconds, table.run_date
+    ).join(models.User, models.User.id == table.user_id).where(
+        table.distance == distance
+    ).order_by(table.pace_seconds_per_km, table.user_id).limit(limit)
+
+def personal_best_rank_statement(distance: str, pace):
+    """나보다 빠른 구간의 인원 합 + 같은 구간에서 나보다 빠른 인원 수 + 1 (같은 기록은 같은 순위)"""
+    table, buckets = models.PersonalBest, models.LeaderboardBucket
+    bucket = math.floor(pace)
+    faster_buckets = select(func.coalesce(func.sum(buckets.entries), 0)).where(
+        buckets.board == personal_best_board(distance), buckets.bucket < bucket
+    ).scalar_subquery()
+    faster_in_bucket = select(func.count()).select_from(table).where(
+        table.distance == distance, table.pace_seconds_per_km >= bucket, table.pace_seconds_per_km < pace
+    ).scalar_subquery()
+    return select(1 + faster_buckets + faster_in_bucket)
+
+def personal_bests_by_user_statement(user_id: int):
+    return select(models.PersonalBest).where(models.PersonalBest.user_id == user_id)
+
+def weekly_distance_top_statement(week_start: date, limit: int):
+    table = models.WeeklyDistance
+    return select(
+        table.user_id, models.User.username, table.total_distance_km, table.run_count
+    ).join(models.User, models.User.id == table.user_id).where(
+        table.week_start == week_start
+    ).order_by(table.total_distance_km.desc(), table.user_id).limit(limit)
+
+def weekly_distance_rank_statement(week_start: date, total_distance_km):
+    """나보다 먼 구간의 인원 합 + 같은 구간에서 나보다 많이 달린 인원 수 + 1"""
+    table, buckets = models.WeeklyDistance, models.LeaderboardBucket
+    bucket = math.floor(total_distance_km)
+    farther_buckets = select(func.coalesce(func.sum(buckets.entries), 0)).where(
+        buckets.board == weekly_board(week_start), buckets.bucket > bucket
+    ).scalar_subquery()
+    farther_in_bucket = select(func.count()).select_from(table).where(
+        table.week_start == week_start, table.total_distance_km < bucket + 1, table.total_distance_km > total_distance_km
+    ).scalar_subquery()
+    return select(1 + farther_buckets + farther_in_bucket)
+
+def weekly_distance_statement(user_id: int, week_start: date):
+    return select(models.WeeklyDistance).where(
+        models.WeeklyDistance.user_id == user_id, models.WeeklyDistance.week_start == week_start
+    )
+
+# 리더보드 재계산 / 정합성 검사 (python -m app.leaderboards)
+# 증분 갱신이 동시성이나 장애로 어긋났을 때 원본(runs, run_daily_stats)에서 다시 계산함
+def expected_personal_bests_statement(distance: str, first_user_id: int, last_user_id: int):
+    """runs에서 계산한 user_id 범위의 distance 개인 최고 기록 (personal_bests 컬럼 순서)"""
+    # float 파라미터는 double precision 연산이 되므로 km도 NUMERIC으로 넘겨 personal_best_rows와 같은 값을 만듦
+    km = literal(Decimal(str(PERSONAL_BEST_DISTANCES[distance])), DECIMAL(10, 4))
+    pace = cast(models.Run.duration_seconds / models.Run.distance_km, DECIMAL(10, 2))
+    return select(
+        models.Run.user_id,
+        literal(distance).label("distance"),
+        pace.label("pace_seconds_per_km"),
+        cast(func.round(pace * km), Integer).label("duration_seconds"),
+        models.Run.id.label("run_id"),
+        models.Run.run_date,
+    ).distinct(models.Run.user_id).where(
+        models.Run.user_id >= first_user_id,
+        models.Run.user_id <= last_user_id,
+        models.Run.distance_km >= km,
+    ).order_by(models.Run.user_id, pace, models.Run.run_date, models.Run.id)
+
+def expected_weekly_distance_statement(first_user_id: int, last_user_id: int):
+    """run_daily_stats에서 계산한 user_id 범위의 주간 거리 (weekly_distance 컬럼 순서)"""
+    stats = models.RunDailyStat
+    week_start = cast(func.date_trunc("week", stats.day), DATE)
+    return select(
+        stats.user_id,
+        week_start.label("week_start"),
+        func.sum(stats.total_distance_km).label("total_distance_km"),
+        cast(func.sum(stats.run_count), Integer).label("run_count"),
+    ).where(
+        stats.user_id >= first_user_id, stats.user_id <= last_user_id
+    ).group_by(stats.user_id, week_start)
+
+def expected_leaderboard_buckets_statement():
+    pb, weekly = models.PersonalBest, models.WeeklyDistance
+    pace_bucket = _pace_bucket(pb.pace_seconds_per_km)
+    distance_bucket = _distance_bucket(weekly.total_distance_km)
+    pb_shard, weekly_shard = _bucket_shard(pb.user_id), _bucket_shard(weekly.user_id)
+    return union_all(
+        select(
+            (literal("pb:") + pb.distance).label("board"),
+            pace_bucket.label("bucket"),
+            pb_shard.label("shard"),
+            cast(func.count(), Integer).label("entries"),
+        ).group_by(pb.distance, pace_bucket, pb_shard),
+        select(
+            (literal("weekly:") + func.to_char(weekly.week_start, "YYYY-MM-DD")).label("board"),
+            distance_bucket.label("bucket"),
+            weekly_shard.label("shard"),
+            cast(func.count(), Integer).label("entries"),
+        ).group_by(weekly.week_start, distance_bucket, weekly_shard),
+    )
+
+def rebuild_leaderboards(db: Session, first_user_id: int, last_user_id: int):
+    """user_id 범위의 personal_bests, weekly_distance를 다시 계산 (커밋은 호출하는 쪽에서)
+    구간 인원 수는 전체를 대상으로 하므로 rebuild_leaderboard_buckets로 따로 다시 계산"""
+    for table in (models.PersonalBest, models.WeeklyDistance):
+        db.execute(delete(table).where(table.user_id >= first_user_id, table.user_id <= last_user_id))
+    columns = ["user_id", "distance", "pace_seconds_per_km", "duration_seconds", "run_id", "run_date"]
+    for distance in PERSONAL_BEST_DISTANCES:
+        db.execute(insert(models.PersonalBest).from_select(columns, expected_personal_bests_statement(distance, first_user_id, last_user_id)))
+    db.execute(insert(models.WeeklyDistance).from_select(
+        ["user_id", "week_start", "total_distance_km", "run_count"], expected_weekly_distance_statement(first_user_id, last_user_id)
+    ))
+
+def rebuild_leaderboard_buckets(db: Session):
+    """leaderboard_buckets 전체를 personal_bests, weekly_distance에서 다시 계산 (커밋은 호출하는 쪽에서)"""
+    db.execute(delete(models.LeaderboardBucket))
+    db.execute(insert(models.LeaderboardBucket).from_select(["board", "bucket", "shard", "entries"], expected_leaderboard_buckets_statement()))
+
+def _count_differences(db: Session, stored, expected) -> int:
+    """두 쿼리 결과의 대칭 차집합 크기"""
+    stored, expected = stored.subquery(), expected.subquery()
+    missing = select(func.count()).select_from(except_(select(expected), select(stored)).subquery())
+    extra = select(func.count()).select_from(except_(select(stored), select(expected)).subquery())
+    return db.execute(missing).scalar() + db.execute(extra).scalar()
+
+def count_leaderboard_mismatches(db: Session, first_user_id: int, last_user_id: int) -> int:
+    """user_id 범위에서 personal_bests, weekly_distance가 원본과 다른 행 수"""
+    pb, weekly = models.PersonalBest, models.WeeklyDistance
+    mismatches = 0
+    for distance in PERSONAL_BEST_DISTANCES:
+        expected = expected_personal_bests_statement(distance, first_user_id, last_user_id).subquery()
+        mismatches += _count_differences(
+            db,
+            select(pb.user_id, pb.pace_seconds_per_km).where(
+                pb.distance == distance, pb.user_id >= first_user_id, pb.user_id <= last_user_id
+            ),
+            select(expected.c.user_id, expected.c.pace_seconds_per_km),
+        )
+    mismatches += _count_differences(
+        db,
+        select(weekly.user_id, weekly.week_start, weekly.total_distance_km, weekly.run_count).where(
+            weekly.user_id >= first_user_id, weekly.user_id <= last_user_id
+        ),
+        expected_weekly_distance_statement(first_user_id, last_user_id),
+    )
+    return mismatches
+
+def count_leaderboard_bucket_mismatches(db: Session) -> int:
+    buckets = models.LeaderboardBucket
+    return _count_differences(
+        db,
+        select(buckets.board, buckets.bucket, buckets.shard, buckets.entries).where(buckets.entries != 0),
+        expected_leaderboard_buckets_statement(),
+    )
@@ -0,0 +1,31 @@
+# app/fast_json.py
+# 큰 목록 응답용 직렬화
+# ORM 객체를 pydantic 모델로 검증한 뒤 직렬화하는 대신, 필요한 컬럼만 조회한 행을 orjson으로 바로 인코딩
+# 응답 형식은 response_model(schemas.RunPage 등)과 같게 유지함
+
+from decimal import Decimal
+from typing import Iterable, Optional
+import orjson
+from fastapi import Response
+from sqlalchemy.engine import Row
+
+
+def _default(value):
+    # DECIMAL 컬럼은 스키마에서 float
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    # pydantic과 같이 UTC 시각은 "Z"로 표시, 트랙 샘플(numpy 배열)은 변환 없이 직렬화
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def page_response(rows: Iterable[Row], next_cursor: Optional[str], response: Optional[Response] = None) -> Response:
+    """{"items": [...], "next_cursor": ...} 응답
+    Response를 직접 반환하면 FastAPI가 주입한 response의 헤더(ETag 등)를 합치지 않으므로 여기서 복사함"""
+    headers = dict(response.headers) if response is not None else {}
+    headers.pop("content-length", None)
+    content = dumps({"items": [row._asdict() for row in rows], "next_cursor": next_cursor})
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -1,17 +1,83 @@
 # app/hashing.py
 
+import asyncio
+import os
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
 from passlib.context import CryptContext
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# bcrypt cost, 값을 바꾸면 기존 해시는 다음 로그인 때 새 cost로 다시 해싱됨
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# 해싱 전용 프로세스 수와, 실행 중인 작업 외에 대기할 수 있는 요청 수
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", "2"))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "32"))
+HASH_RETRY_AFTER_SECONDS = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+
+log = logging.getLogger("hashing")
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class HashingBusy(Exception):
+    """대기열이 가득 차서 해싱 요청을 받을 수 없음"""
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class Hasher:
     @staticmethod
     def verify_password(plain_password, hashed_password):
-        print(f"--- Verifying password of length: {len(plain_password)} ---")
         return pwd_context.verify(plain_password, hashed_password)
 
+    @staticmethod
+    def verify_and_update(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+        """비밀번호가 맞고 해시의 cost가 설정과 다르면 새 해시도 같이 반환"""
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+
     @staticmethod
     def get_password_hash(password):
-        print(f"--- Hashing password of length: {len(password)} ---")
-        print(f"--- Password value (first 10 chars): '{password[:10]}' ---")
-        return pwd_context.hash(password)
\ No newline at end of file
+        return pwd_context.hash(password)
+
+
+# bcrypt는 CPU를 오래 쓰므로 API 프로세스의 스레드풀/이벤트 루프가 아닌 별도 프로세스에서 실행
+# 로그인이 몰려도 인증 요청끼리만 기다리고 다른 엔드포인트는 영향을 받지 않음
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_admission = threading.BoundedSemaphore(HASH_POOL_SIZE + HASH_QUEUE_SIZE)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=HASH_POOL_SIZE)
+        return _pool
+
+
+async def _run(fn, *args):
+    if not _admission.acquire(blocking=False):
+        log.warning(f"Hashing queue is full: pool_size={HASH_POOL_SIZE}, queue_size={HASH_QUEUE_SIZE}")
+        raise HashingBusy()
+    try:
+        return await asyncio.wrap_future(_get_pool().submit(fn, *args))
+    finally:
+        _admission.release()
+
+
+async def hash_password(password: str) -> str:
+    return await _run(Hasher.get_password_hash, password)
+
+
+async def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await _run(Hasher.verify_and_update, plain_password, hashed_password)
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
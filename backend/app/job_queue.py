@@ -0,0 +1,345 @@
+# app/job_queue.py
+
+import os
+import select
+import threading
+import time
+import uuid
+import logging
+from collections import namedtuple
+from typing import List, Optional, Tuple
+import boto3
+from dotenv import load_dotenv
+from sqlalchemy import text
+from .database import engine
+
+load_dotenv()
+
+# "sqs" (운영 기본값), "postgres", "memory" (테스트/로컬용, 같은 프로세스 안에서만 공유)
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqs")
+SQS_QUEUE_URL = os.getenv("SQS_QUEUE_URL")
+AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2")
+# LISTEN/NOTIFY 채널 이름
+PG_QUEUE_CHANNEL = "job_queue"
+# postgres 백엔드에서 작업을 이 횟수만큼 가져갔는데도 ack되지 않으면 job_queue_dead_letters로 옮김
+# (SQS는 큐의 redrive policy가 같은 역할을 함)
+JOB_QUEUE_MAX_ATTEMPTS = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", "5"))
+
+log = logging.getLogger("job_queue")
+
+# body는 메시지 본문 문자열, receipt는 ack/extend에 넘기는 값
+# attributes는 메시지 속성(문자열 dict), 속성을 지원하지 않는 백엔드에서는 None
+Job = namedtuple("Job", ["id", "body", "receipt", "attributes"], defaults=(None,))
+
+
+class JobQueue:
+    """리포트 작업 큐 인터페이스
+    - send_batch: [(entry_id, body)] 또는 [(entry_id, body, attributes)]를 보내고 성공한 entry_id 목록을 반환
+      attributes(문자열 dict)는 SQS 메시지 속성으로 전달되며, 다른 백엔드에서는 무시됨
+    - receive: 최대 max_messages개를 가져오고, 없으면 wait_seconds까지 기다림
+      가져간 작업은 visibility_timeout 동안 다른 컨슈머에게 보이지 않음
+    - ack: 처리가 끝난 작업 삭제
+    - extend: 처리 중인 작업의 visibility timeout 연장
+    - approximate_depth: 대기 중인 작업 수 (메트릭용, 알 수 없으면 None)
+    """
+
+    max_batch = 10
+
+    def send_batch(self, entries: List[Tuple[str, str]]) -> List[str]:
+        raise NotImplementedError
+
+    def receive(self, max_messages: int, wait_seconds: float, visibility_timeout: int) -> List[Job]:
+        raise NotImplementedError
+
+    def ack(self, receipts: List[str]):
+        raise NotImplementedError
+
+    def extend(self, receipts: List[str], visibility_timeout: int):
+        raise NotImplementedError
+
+    def approximate_depth(self) -> Optional[int]:
+        return None
+
+    def close(self):
+        pass
+
+
+class SQSJobQueue(JobQueue):
+    def __init__(self, queue_url: str, client=None):
+        if not queue_url:
+            raise RuntimeError("SQS_QUEUE_URL environment variable is not set.")
+        self.queue_url = queue_url
+        self.client = client or boto3.client('sqs', region_name=AWS_REGION)
+
+    def send_batch(self, entries):
+        messages = []
+        for entry in entries:
+            message = {"Id": entry[0], "MessageBody": entry[1]}
+            if len(entry) > 2 and entry[2]:
+                message["MessageAttributes"] = {
+                    name: {"DataType": "String", "StringValue": str(value)} for name, value in entry[2].items()
+                }
+            messages.append(message)
+        response = self.client.send_message_batch(QueueUrl=self.queue_url, Entries=messages)
+        for failed in response.get("Failed", []):
+            log.error(f"Failed to send message {failed['Id']}: {failed.get('Message')}")
+        return [sent["Id"] for sent in response.get("Successful", [])]
+
+    def receive(self, max_messages, wait_seconds, visibility_timeout):
+        response = self.client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=max_messages,
+            WaitTimeSeconds=int(wait_seconds),
+            VisibilityTimeout=visibility_timeout,
+            MessageAttributeNames=["All"]
+        )
+        return [
+            Job(
+                message["MessageId"], message["Body"], message["ReceiptHandle"],
+                {name: value.get("StringValue") for name, value in message.get("MessageAttributes", {}).items()}
+            )
+            for message in response.get("Messages", [])
+        ]
+
+    def ack(self, receipts):
+        if not receipts:
+            return
+        entries = [{"Id": str(i), "ReceiptHandle": receipt} for i, receipt in enumerate(receipts)]
+        response = self.client.delete_message_batch(QueueUrl=self.queue_url, Entries=entries)
+        for failed in response.get("Failed", []):
+            log.error(f"Failed to delete message {failed['Id']}: {failed.get('Message')}")
+
+    def extend(self, receipts, visibility_timeout):
+        if not receipts:
+            return
+        entries = [
+            {"Id": str(i), "ReceiptHandle": receipt, "VisibilityTimeout": visibility_timeout}
+            for i, receipt in enumerate(receipts)
+        ]
+        self.client.change_message_visibility_batch(QueueUrl=self.queue_url, Entries=entries)
+
+    def approximate_depth(self):
+        response = self.client.get_queue_attributes(
+            QueueUrl=self.queue_url, AttributeNames=["ApproximateNumberOfMessages"]
+        )
+        return int(response["Attributes"]["ApproximateNumberOfMessages"])
+
+
+class InMemoryJobQueue(JobQueue):
+    """같은 프로세스 안에서 API와 워커가 공유하는 메모리 큐 (테스트/로컬 개발용)"""
+
+    def __init__(self):
+        self._jobs = {}  # job_id -> [body, receipt, visible_at]
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def send_batch(self, entries):
+        with self._cond:
+            for entry in entries:
+                self._jobs[str(uuid.uuid4())] = [entry[1], None, 0.0]
+            self._cond.notify_all()
+        return [entry[0] for entry in entries]
+
+    def receive(self, max_messages, wait_seconds, visibility_timeout):
+        deadline = time.monotonic() + wait_seconds
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                received = []
+                for job_id, job in self._jobs.items():
+                    if job[2] <= now:
+                        job[1] = str(uuid.uuid4())
+                        job[2] = now + visibility_timeout
+                        received.append(Job(job_id, job[0], job[1]))
+                        if len(received) >= max_messages:
+                            break
+                if received or self._closed or now >= deadline:
+                    return received
+                # 가장 먼저 다시 보이게 될 작업이나 새 작업이 들어올 때까지 대기
+                invisible = [job[2] for job in self._jobs.values() if job[2] > now]
+                self._cond.wait(min([deadline] + invisible) - now)
+
+    def ack(self, receipts):
+        receipts = set(receipts)
+        with self._cond:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job[1] in receipts]:
+                del self._jobs[job_id]
+
+    def extend(self, receipts, visibility_timeout):
+        receipts = set(receipts)
+        with self._cond:
+            for job in self._jobs.values():
+                if job[1] in receipts:
+                    job[2] = time.monotonic() + visibility_timeout
+
+    def approximate_depth(self):
+        now = time.monotonic()
+        with self._cond:
+            return sum(1 for job in self._jobs.values() if job[2] <= now)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._jobs)
+
+
+class PostgresJobQueue(JobQueue):
+    """job_queue 테이블을 큐로 사용하는 백엔드
+    FOR UPDATE SKIP LOCKED로 작업을 나눠 가지고, 비어 있을 때는 LISTEN으로 대기하다
+    send_batch의 NOTIFY를 받으면 바로 깨어남
+    max_attempts번 가져가고도 ack되지 않은 작업은 job_queue_dead_letters로 옮겨서 더 이상 재전달하지 않음"""
+
+    def __init__(self, bind=engine, max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS):
+        self.engine = bind
+        self.max_attempts = max_attempts
+        self._listen_conn = None
+        self._listen_lock = threading.Lock()
+
+    def send_batch(self, entries):
+        if not entries:
+            return []
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("INSERT INTO job_queue (body) VALUES (:body)"),
+                [{"body": entry[1]} for entry in entries]
+            )
+            # NOTIFY는 커밋 시점에 전달됨
+            conn.execute(text("SELECT pg_notify(:channel, '')"), {"channel": PG_QUEUE_CHANNEL})
+        return [entry[0] for entry in entries]
+
+    def _claim(self, max_messages, visibility_timeout):
+        with self.engine.begin() as conn:
+            # 다시 보이게 된 작업 중 시도 횟수를 다 쓴 것은 계속 재전달되지 않도록 dead letter로 옮김
+            dead = conn.execute(text("""
+                WITH dead AS (
+                    DELETE FROM job_queue
+                    WHERE id IN (
+                        SELECT id FROM job_queue
+                        WHERE visible_at <= now() AND attempts >= :max_attempts
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, body, attempts, created_at
+                )
+                INSERT INTO job_queue_dead_letters (id, body, attempts, created_at)
+                SELECT id, body, attempts, created_at FROM dead
+                RETURNING id
+            """), {"max_attempts": self.max_attempts}).scalars().all()
+            if dead:
+                log.error(f"Moved {len(dead)} jobs to job_queue_dead_letters after {self.max_attempts} attempts: ids={sorted(dead)}")
+            rows = conn.execute(text("""
+                UPDATE job_queue
+                SET visible_at = now() + make_interval(secs => :visibility_timeout),
+                    attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM job_queue
+                    WHERE visible_at <= now() AND attempts < :max_attempts
+                    ORDER BY id
+                    LIMIT :max_messages
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, body, attempts
+            """), {
+                "visibility_timeout": visibility_timeout, "max_messages": max_messages, "max_attempts": self.max_attempts
+            }).all()
+        # receipt에 attempts를 넣어, visibility timeout이 지나 다른 컨슈머가 다시 가져간 작업은 ack되지 않게 함
+        return [Job(str(row.id), row.body, f"{row.id}:{row.attempts}") for row in sorted(rows, key=lambda r: r.id)]
+
+    def _listen_connection(self):
+        if self._listen_conn is None:
+            raw = self.engine.raw_connection()
+            # LISTEN 전용 연결은 풀에 돌려주지 않음
+            raw.detach()
+            conn = raw.dbapi_connection
+            conn.autocommit = True
+            conn.cursor().execute(f"LISTEN {PG_QUEUE_CHANNEL}")
+            self._listen_conn = conn
+        return self._listen_conn
+
+    def _wait_for_notify(self, timeout):
+        with self._listen_lock:
+            conn = self._listen_connection()
+            try:
+                if select.select([conn], [], [], timeout) != ([], [], []):
+                    conn.poll()
+                    conn.notifies.clear()
+            except Exception as e:
+                # 연결이 끊어졌으면 다음 대기 때 다시 LISTEN
+                log.error(f"LISTEN connection error: {e}")
+                conn.close()
+                self._listen_conn = None
+
+    def receive(self, max_messages, wait_seconds, visibility_timeout):
+        deadline = time.monotonic() + wait_seconds
+        # 먼저 LISTEN을 걸어 두어야 claim과 대기 사이에 들어온 NOTIFY를 놓치지 않음
+        if wait_seconds > 0:
+            with self._listen_lock:
+                self._listen_connection()
+        while True:
+            jobs = self._claim(max_messages, visibility_timeout)
+            remaining = deadline - time.monotonic()
+            if jobs or remaining <= 0:
+                return jobs
+            # visibility timeout이 끝난 작업은 NOTIFY가 없으므로 최대 1초 간격으로 다시 확인
+            self._wait_for_notify(min(remaining, 1.0))
+
+    def _receipt_params(self, receipts):
+        return [{"id": int(job_id), "attempts": int(attempts)} for job_id, attempts in (r.split(":") for r in receipts)]
+
+    def ack(self, receipts):
+        if not receipts:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM job_queue WHERE id = :id AND attempts = :attempts"),
+                self._receipt_params(receipts)
+            )
+
+    def extend(self, receipts, visibility_timeout):
+        if not receipts:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("""
+                    UPDATE job_queue SET visible_at = now() + make_interval(secs => :visibility_timeout)
+                    WHERE id = :id AND attempts = :attempts
+                """),
+                [{**params, "visibility_timeout": visibility_timeout} for params in self._receipt_params(receipts)]
+            )
+
+    def approximate_depth(self):
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT count(*) FROM job_queue WHERE visible_at <= now()")).scalar()
+
+    def close(self):
+        with self._listen_lock:
+            if self._listen_conn is not None:
+                self._listen_conn.close()
+                self._listen_conn = None
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def create_job_queue(backend: str = JOB_QUEUE_BACKEND) -> JobQueue:
+    if backend == "sqs":
+        return SQSJobQueue(SQS_QUEUE_URL)
+    if backend == "postgres":
+        return PostgresJobQueue()
+    if backend == "memory":
+        return InMemoryJobQueue()
+    raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {backend}")
+
+
+def get_job_queue() -> JobQueue:
+    """프로세스 전체에서 공유하는 큐 (API의 outbox publisher와 같은 프로세스의 워커가 함께 사용)"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = create_job_queue()
+        return _queue
+
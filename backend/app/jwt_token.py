@@ -25,6 +25,12 @@ def verify_token(token: str, credentials_exception):
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        return schemas.TokenData(email=email)
+        # uid/username 클레임은 이전에 발급된 토큰에는 없을 수 있음
+        return schemas.TokenData(
+            email=email,
+            user_id=payload.get("uid"),
+            username=payload.get("username"),
+            expires_at=datetime.utcfromtimestamp(payload["exp"]) if "exp" in payload else None
+        )
     except JWTError:
         raise credentials_exception
\ No newline at end of file
@@ -0,0 +1,103 @@
+# app/leaderboards.py
+"""개인 최고 기록 / 주간 거리 리더보드 재계산과 정합성 검사 명령
+
+    python -m app.leaderboards rebuild --chunk-size 1000
+    python -m app.leaderboards check --repair
+
+리더보드는 기록이 추가될 때마다 증분으로 갱신되므로(crud.runs_inserted_statements),
+이 명령은 처음 도입할 때의 백필과 주기적인 검사(k8s/leaderboard-cronjob.yaml)에 사용함.
+rebuild는 user_id 순서로 chunk-size명씩 personal_bests, weekly_distance를 다시 계산하고 청크마다 커밋한 뒤
+마지막에 leaderboard_buckets 전체를 다시 계산함.
+check는 같은 단위로 원본과 비교해서 다른 행 수를 출력하고, --repair를 주면 어긋난 청크만 다시 계산함.
+어긋난 곳이 남아 있으면 종료 코드 1.
+"""
+
+import argparse
+import logging
+import sys
+
+from . import crud, models
+from .database import SessionLocal
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log = logging.getLogger("leaderboards")
+
+
+def _user_id_chunks(db, chunk_size: int, start_user_id: int):
+    last_user_id = start_user_id - 1
+    while True:
+        user_ids = [
+            user_id for (user_id,) in db.query(models.User.id)
+            .filter(models.User.id > last_user_id)
+            .order_by(models.User.id)
+            .limit(chunk_size)
+        ]
+        if not user_ids:
+            return
+        yield user_ids[0], user_ids[-1]
+        last_user_id = user_ids[-1]
+
+
+def rebuild(chunk_size: int, start_user_id: int = 0):
+    db = SessionLocal()
+    try:
+        for first_user_id, last_user_id in _user_id_chunks(db, chunk_size, start_user_id):
+            crud.rebuild_leaderboards(db, first_user_id, last_user_id)
+            db.commit()
+            log.info(f"Rebuilt leaderboards for user_id {first_user_id}..{last_user_id}")
+        crud.rebuild_leaderboard_buckets(db)
+        db.commit()
+    finally:
+        db.close()
+    log.info("Leaderboard rebuild finished.")
+
+
+def check(chunk_size: int, repair: bool = False) -> int:
+    """남아 있는 불일치 행 수를 반환"""
+    db = SessionLocal()
+    remaining = 0
+    try:
+        repaired = False
+        for first_user_id, last_user_id in _user_id_chunks(db, chunk_size, 0):
+            mismatches = crud.count_leaderboard_mismatches(db, first_user_id, last_user_id)
+            db.rollback()
+            if not mismatches:
+                continue
+            log.warning(f"{mismatches} leaderboard rows differ for user_id {first_user_id}..{last_user_id}")
+            if repair:
+                crud.rebuild_leaderboards(db, first_user_id, last_user_id)
+                db.commit()
+                repaired = True
+            else:
+                remaining += mismatches
+
+        bucket_mismatches = crud.count_leaderboard_bucket_mismatches(db)
+        db.rollback()
+        if bucket_mismatches:
+            log.warning(f"{bucket_mismatches} leaderboard buckets differ")
+        if repair and (repaired or bucket_mismatches):
+            crud.rebuild_leaderboard_buckets(db)
+            db.commit()
+        elif bucket_mismatches:
+            remaining += bucket_mismatches
+    finally:
+        db.close()
+    log.info(f"Leaderboard check finished: {remaining} mismatches remaining.")
+    return remaining
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or check leaderboard tables")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="Recompute leaderboards from runs")
+    rebuild_parser.add_argument("--chunk-size", type=int, default=1000)
+    rebuild_parser.add_argument("--start-user-id", type=int, default=0)
+    check_parser = subparsers.add_parser("check", help="Compare leaderboards with runs")
+    check_parser.add_argument("--chunk-size", type=int, default=1000)
+    check_parser.add_argument("--repair", action="store_true", help="Rebuild chunks that differ")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rebuild(args.chunk_size, args.start_user_id)
+    elif check(args.chunk_size, args.repair):
+        sys.exit(1)
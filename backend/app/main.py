@@ -1,17 +1,66 @@
 # app/main.py
 
+import time
 import logging
-from fastapi import FastAPI
-from .routers import auth, runs, reports
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from . import outbox, hashing, run_batcher, report_events, metrics, partitions
+from .routers import auth, runs, reports, stats, leaderboards
 
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI()
+log = logging.getLogger("main")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 다음 달 이후의 runs 파티션이 없으면 미리 만듦 (실패해도 runs_default가 받으므로 시작은 계속)
+    try:
+        created = await run_in_threadpool(partitions.ensure_partitions)
+        if created:
+            log.info(f"Created runs partitions: {created}")
+    except Exception as e:
+        log.error(f"Failed to ensure runs partitions: {e}")
+    if outbox.OUTBOX_PUBLISHER_ENABLED:
+        outbox.publisher.start()
+    yield
+    await run_batcher.batcher.drain()
+    await report_events.hub.stop()
+    outbox.publisher.stop()
+    hashing.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    token = metrics.start_request_tracking()
+    began = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - began
+        query_count, query_seconds = metrics.stop_request_tracking(token)
+        # 경로 변수 값마다 라벨이 늘어나지 않도록 실제 경로 대신 라우트 템플릿을 사용
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.HTTP_REQUEST_SECONDS.labels(request.method, path, str(status_code)).observe(elapsed)
+        metrics.HTTP_REQUEST_DB_QUERIES.labels(request.method, path).observe(query_count)
+        metrics.HTTP_REQUEST_DB_SECONDS.labels(request.method, path).observe(query_seconds)
 
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(runs.router, prefix="/api/v1")
 app.include_router(reports.router, prefix="/api/v1")
+app.include_router(stats.router, prefix="/api/v1")
+app.include_router(leaderboards.router, prefix="/api/v1")
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the TrackFit API"}
\ No newline at end of file
+    return {"message": "Welcome to the TrackFit API"}
@@ -0,0 +1,120 @@
+# app/metrics.py
+# API와 워커가 함께 쓰는 Prometheus 메트릭
+# API는 GET /metrics, 워커는 WORKER_METRICS_PORT의 HTTP 서버로 노출
+
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+
+# 요청/쿼리 지연 구간 (초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+REPORT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+log = logging.getLogger("metrics")
+
+# --- API ---
+HTTP_REQUEST_SECONDS = Histogram(
+    "trackfit_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "trackfit_http_request_db_queries", "DB queries executed per HTTP request",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "trackfit_http_request_db_seconds", "Total DB query time per HTTP request",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+
+# --- DB (API, 워커 공통) ---
+DB_QUERY_SECONDS = Histogram(
+    "trackfit_db_query_duration_seconds", "DB query latency", ["engine"], buckets=LATENCY_BUCKETS
+)
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "trackfit_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+    ["engine"], buckets=LATENCY_BUCKETS
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "trackfit_db_pool_checked_out_connections", "Connections currently checked out of the pool", ["engine"]
+)
+
+# --- 워커 ---
+REPORT_RECEIVE_TO_COMPLETE_SECONDS = Histogram(
+    "trackfit_report_receive_to_complete_seconds", "Time from receiving a report job to acking it",
+    ["report_type"], buckets=REPORT_BUCKETS
+)
+REPORT_PROCESSING_SECONDS = Histogram(
+    "trackfit_report_processing_seconds", "Time spent generating and saving one report",
+    ["report_type"], buckets=REPORT_BUCKETS
+)
+REPORT_FAILURES = Counter(
+    "trackfit_report_failures_total", "Report jobs that failed and were left on the queue", ["report_type"]
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "trackfit_job_queue_depth", "Approximate number of report jobs waiting in the queue"
+)
+
+
+# 요청 하나 동안 실행된 쿼리 수와 시간, 요청 밖(워커 등)에서는 None
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+def start_request_tracking():
+    """현재 요청의 쿼리 집계를 시작하고, stop_request_tracking에 넘길 토큰을 반환"""
+    return _request_queries.set([0, 0.0])
+
+
+def stop_request_tracking(token):
+    """(쿼리 수, 쿼리 시간 합) 반환"""
+    count, seconds = _request_queries.get()
+    _request_queries.reset(token)
+    return count, seconds
+
+
+def instrument_engine(engine, name: str):
+    """sync Engine에 쿼리 시간/풀 대기 시간 측정을 붙임 (AsyncEngine은 .sync_engine을 넘김)"""
+    query_seconds = DB_QUERY_SECONDS.labels(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        query_seconds.observe(elapsed)
+        stats = _request_queries.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    # 풀에서 연결을 기다린 시간은 공개 이벤트가 없으므로 풀의 _do_get을 감싸서 측정
+    # (checkout/connect 이벤트는 연결을 받은 뒤에만 불려 대기 시작 시점을 알 수 없음)
+    # _do_get은 SQLAlchemy 2.0 풀의 내부 메서드라 requirements.txt에서 2.0.x로 고정함
+    pool = engine.pool
+    do_get = getattr(pool, "_do_get", None)
+    if do_get is None:
+        log.warning(f"{type(pool).__name__} has no _do_get, skipping pool checkout wait metrics for {name}")
+    else:
+        checkout_wait = DB_POOL_CHECKOUT_WAIT_SECONDS.labels(name)
+
+        def timed_do_get():
+            began = time.perf_counter()
+            try:
+                return do_get()
+            finally:
+                checkout_wait.observe(time.perf_counter() - began)
+
+        pool._do_get = timed_do_get
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CHECKED_OUT.labels(name).set_function(pool.checkedout)
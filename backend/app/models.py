@@ -10,6 +10,10 @@ from sqlalchemy import (
     DECIMAL,
     DATE,
     JSON,
+    Index,
+    LargeBinary,
+    Sequence,
+    Text,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -23,6 +27,9 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
     username = Column(String, nullable=False)
+    # 러닝 기록/리포트 목록이 바뀔 때마다 1씩 증가, 목록 응답의 ETag로 사용
+    runs_version = Column(BigInteger, nullable=False, server_default="0")
+    reports_version = Column(BigInteger, nullable=False, server_default="0")
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(
         TIMESTAMP(timezone=True), default=func.now(), onupdate=func.now()
@@ -32,12 +39,14 @@ class User(Base):
     reports = relationship("Report", back_populates="owner")
 
 
+# run_date 기준 월별 RANGE 파티션 테이블 (파티션 관리는 app.partitions)
+# 파티션 테이블의 기본 키에는 파티션 키가 포함되어야 하므로 (id, run_date), id는 시퀀스로 계속 유일함
 class Run(Base):
     __tablename__ = "runs"
 
-    id = Column(BigInteger, primary_key=True, index=True)
+    id = Column(BigInteger, Sequence("runs_id_seq"), primary_key=True, index=True)
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
-    run_date = Column(TIMESTAMP(timezone=True), nullable=False)
+    run_date = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
     distance_km = Column(DECIMAL(10, 2), nullable=False)
     duration_seconds = Column(Integer, nullable=False)
     avg_pace_seconds_per_km = Column(Integer)
@@ -50,14 +59,22 @@ class Run(Base):
 
     owner = relationship("User", back_populates="runs")
 
+    # 사용자별 기록 목록을 최신순으로 페이지네이션할 때 사용
+    # 인덱스는 파티션마다 따로 만들어지므로 기간 조건이 있으면 해당 월의 인덱스만 읽음
+    __table_args__ = (
+        Index("ix_runs_user_id_run_date_id", user_id, run_date.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (run_date)"},
+    )
+
 
 class Report(Base):
     __tablename__ = "reports"
 
     id = Column(BigInteger, primary_key=True, index=True)
     user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False)
-    report_type = Column(String(10), nullable=False)  # "daily", "weekly"
+    report_type = Column(String(10), nullable=False)  # "daily", "weekly", "monthly", "range"
     target_date = Column(DATE, nullable=False)
+    start_date = Column(DATE)  # "range" 리포트의 시작일
     status = Column(
         String(20), nullable=False, default="PENDING"
     )  # PENDING, COMPLETED, FAILED
@@ -65,4 +82,144 @@ class Report(Base):
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     completed_at = Column(TIMESTAMP(timezone=True))
 
-    owner = relationship("User", back_populates="reports")
\ No newline at end of file
+    owner = relationship("User", back_populates="reports")
+
+    # 같은 조건의 리포트 요청을 찾아 재사용할 때 사용
+    __table_args__ = (
+        Index("ix_reports_user_id_report_type_target_date", user_id, report_type, target_date),
+        # 사용자별 리포트 목록을 최신순으로 페이지네이션할 때 사용
+        Index("ix_reports_user_id_target_date_id", user_id, target_date.desc(), id.desc()),
+    )
+
+# (user_id, day)별 달리기 집계
+# crud.create_run에서 같은 트랜잭션으로 갱신되고, 리포트는 runs 대신 이 테이블을 읽음
+# day는 run_date의 UTC 기준 날짜 (crud.run_day_of)
+class RunDailyStat(Base):
+    __tablename__ = "run_daily_stats"
+
+    user_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    day = Column(DATE, primary_key=True)
+    run_count = Column(Integer, nullable=False)
+    total_distance_km = Column(DECIMAL(12, 2), nullable=False)
+    total_duration_seconds = Column(BigInteger, nullable=False)
+    best_pace_seconds_per_km = Column(DECIMAL(10, 2))
+    slowest_pace_seconds_per_km = Column(DECIMAL(10, 2))
+    longest_run_km = Column(DECIMAL(10, 2))
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# 리포트 생성과 같은 트랜잭션에서 기록되는 큐 전송 대기 메시지
+# 전송에 성공하면 삭제됨
+class ReportOutbox(Base):
+    __tablename__ = "report_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    report_id = Column(BigInteger, ForeignKey("reports.id"), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+# JOB_QUEUE_BACKEND=postgres일 때 사용하는 작업 큐 (app.job_queue.PostgresJobQueue)
+# visible_at 이전에는 다른 컨슈머가 가져가지 못함
+class QueueJob(Base):
+    __tablename__ = "job_queue"
+
+    id = Column(BigInteger, primary_key=True)
+    body = Column(Text, nullable=False)
+    visible_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), index=True)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+
+# JOB_QUEUE_MAX_ATTEMPTS번 가져가고도 처리되지 않은 job_queue 작업 (SQS의 dead-letter queue에 해당)
+# 원인을 고친 뒤 body를 job_queue에 다시 넣으면 재처리됨
+class QueueDeadLetter(Base):
+    __tablename__ = "job_queue_dead_letters"
+
+    id = Column(BigInteger, primary_key=True)  # 원래 job_queue.id
+    body = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True))
+    dead_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+
+
+# POST /runs/bulk 업로드 한 건의 진행 상태와 행별 오류
+class RunImport(Base):
+    __tablename__ = "run_imports"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False, index=True)
+    format = Column(String(10), nullable=False)  # "csv", "ndjson", "gpx"
+    status = Column(
+        String(20), nullable=False, default="PENDING"
+    )  # PENDING, PROCESSING, COMPLETED, FAILED
+    total_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    failed_rows = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON)  # [{"row": 행 번호, "error": 메시지}], 최대 RUN_IMPORT_MAX_ERRORS개
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    completed_at = Column(TIMESTAMP(timezone=True))
+
+
+# 거리별 개인 최고 기록 (해당 거리 이상을 달린 기록 중 평균 페이스가 가장 빠른 것)
+# crud.runs_inserted_statements에서 기록 추가와 같은 트랜잭션으로 갱신
+# runs는 파티션 등으로 키가 바뀔 수 있어 run_id에 외래 키를 두지 않음
+class PersonalBest(Base):
+    __tablename__ = "personal_bests"
+
+    user_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    distance = Column(String(10), primary_key=True)  # crud.PERSONAL_BEST_DISTANCES의 키
+    pace_seconds_per_km = Column(DECIMAL(10, 2), nullable=False)
+    duration_seconds = Column(Integer, nullable=False)  # 평균 페이스로 환산한 해당 거리 기록
+    run_id = Column(BigInteger, nullable=False)
+    run_date = Column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # 거리별 상위 N명과 같은 버킷 안의 순위 계산에 사용
+    __table_args__ = (
+        Index("ix_personal_bests_distance_pace_user_id", distance, pace_seconds_per_km, user_id),
+    )
+
+
+# (user_id, 주 시작일(월요일))별 누적 거리
+class WeeklyDistance(Base):
+    __tablename__ = "weekly_distance"
+
+    user_id = Column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    week_start = Column(DATE, primary_key=True)
+    total_distance_km = Column(DECIMAL(12, 2), nullable=False)
+    run_count = Column(Integer, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_weekly_distance_week_start_total_user_id", week_start, total_distance_km.desc(), user_id),
+    )
+
+
+# 리더보드별 값 구간(bucket)마다의 인원 수
+# 내 순위 = 나보다 좋은 구간들의 인원 합 + 같은 구간 안에서 나보다 좋은 인원 수
+# 구간 수가 정해져 있으므로 전체 인원 수와 관계없이 순위를 계산할 수 있음
+# 기록을 저장하는 트랜잭션들이 같은 행을 잠그지 않도록 구간마다 user_id % crud.LEADERBOARD_BUCKET_SHARDS개 행으로 나눠 세고, 읽을 때 합산함
+class LeaderboardBucket(Base):
+    __tablename__ = "leaderboard_buckets"
+
+    board = Column(String(30), primary_key=True)  # "pb:5k", "weekly:2025-11-03"
+    bucket = Column(Integer, primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    entries = Column(Integer, nullable=False)
+
+
+# GPS 트랙 샘플 (app.tracks)
+# 샘플을 행으로 두지 않고 채널별 차분 정수 배열을 np.savez_compressed로 묶어 data 한 칸에 저장, 트랙 하나는 한 행만 읽음
+# summary는 저장할 때 계산한 거리/이동 시간/상승 고도/심박과 1km 구간 기록
+# PersonalBest와 같이 runs의 파티션 키 때문에 run_id에 외래 키를 두지 않음
+class RunTrack(Base):
+    __tablename__ = "run_tracks"
+
+    run_id = Column(BigInteger, primary_key=True)
+    user_id = Column(BigInteger, ForeignKey("users.id"), nullable=False, index=True)
+    run_date = Column(TIMESTAMP(timezone=True), nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    summary = Column(JSON, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
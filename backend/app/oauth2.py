@@ -1,8 +1,8 @@
 # app/oauth2.py
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from . import jwt_token, crud, models, database
+from datetime import datetime
+from . import jwt_token, async_crud, database, schemas, cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -13,14 +13,45 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_async_db():
+    async with database.AsyncSessionLocal() as db:
+        yield db
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> schemas.CurrentUser:
+    cached = cache.token_cache.get(token)
+    if cached is not None:
+        return cached
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     token_data = jwt_token.verify_token(token, credentials_exception)
-    user = crud.get_user_by_email(db, email=token_data.email)
-    if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+    if token_data.user_id is not None and token_data.username is not None:
+        user = schemas.CurrentUser(id=token_data.user_id, username=token_data.username, email=token_data.email)
+    else:
+        user = await _get_user_by_email(token_data.email)
+        if user is None:
+            raise credentials_exception
+
+    # 토큰이 만료된 뒤에는 캐시에서도 쓰이지 않도록 남은 유효 시간까지만 저장
+    ttl = None
+    if token_data.expires_at is not None:
+        ttl = (token_data.expires_at - datetime.utcnow()).total_seconds()
+    cache.token_cache.set(token, user, ttl_seconds=ttl)
+    return user
+
+async def _get_user_by_email(email: str):
+    """uid 클레임이 없는 이전 토큰용 조회"""
+    user = cache.user_cache.get(email)
+    if user is not None:
+        return user
+    # 요청 전체 동안 커넥션을 잡고 있지 않도록 조회가 끝나면 바로 세션을 닫음
+    async with database.AsyncSessionLocal() as db:
+        db_user = await async_crud.get_user_by_email(db, email=email)
+    if db_user is None:
+        return None
+    user = schemas.CurrentUser.model_validate(db_user)
+    cache.user_cache.set(email, user)
+    return user
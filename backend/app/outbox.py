@@ -0,0 +1,122 @@
+# app/outbox.py
+
+import os
+import json
+import logging
+import threading
+import time
+from dotenv import load_dotenv
+from . import crud, job_queue, tracing
+from .database import SessionLocal
+
+load_dotenv()
+
+OUTBOX_PUBLISHER_ENABLED = os.getenv("OUTBOX_PUBLISHER_ENABLED", "true").lower() == "true"
+# 깨우는 신호가 없을 때 outbox를 다시 확인하는 주기 (다른 파드가 남긴 행이나 실패한 전송을 재시도)
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "2"))
+# 큐에 한 번에 보내는 최대 메시지 수 (SQS send_message_batch 한도)
+OUTBOX_BATCH_SIZE = job_queue.JobQueue.max_batch
+
+log = logging.getLogger("outbox")
+
+
+def _record_publish_spans(entries, sent_ids, send_started_ns: int, send_finished_ns: int):
+    """trace가 있는 메시지마다 outbox에서 기다린 시간과 큐 전송 시간을 span으로 기록"""
+    sent = set(sent_ids)
+    for entry in entries:
+        trace_id = entry.payload.get("trace_id")
+        if not trace_id:
+            continue
+        parent = entry.payload.get("parent_span_id")
+        if entry.created_at is not None:
+            tracing.record_span("report.outbox_wait", trace_id, int(entry.created_at.timestamp() * 1e9),
+                                send_started_ns, parent, report_id=entry.report_id)
+        tracing.record_span("report.enqueue", trace_id, send_started_ns, send_finished_ns, parent,
+                            status="OK" if entry.id in sent else "ERROR", report_id=entry.report_id)
+
+
+class OutboxPublisher:
+    """report_outbox를 비우며 작업 큐에 배치로 전송하는 백그라운드 스레드
+    큐 클라이언트는 job_queue.get_job_queue()의 것을 계속 재사용"""
+
+    def __init__(self, poll_interval: float = OUTBOX_POLL_INTERVAL, queue: job_queue.JobQueue = None):
+        self.poll_interval = poll_interval
+        self._queue = queue
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def queue(self) -> job_queue.JobQueue:
+        if self._queue is None:
+            self._queue = job_queue.get_job_queue()
+        return self._queue
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-publisher", daemon=True)
+        self._thread.start()
+        log.info("Outbox publisher started.")
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        log.info("Outbox publisher stopped.")
+
+    def notify(self):
+        """새 outbox 행이 커밋되었음을 알려 바로 전송하게 함"""
+        self._wakeup.set()
+
+    def publish_pending(self) -> int:
+        """outbox에서 최대 10개를 꺼내 한 번에 전송하고, 가져온 행 수를 반환"""
+        db = SessionLocal()
+        try:
+            entries = crud.claim_outbox_batch(db, OUTBOX_BATCH_SIZE)
+            if not entries:
+                db.rollback()
+                return 0
+
+            # 워커가 큐 대기 시간을 계산할 수 있도록 전송 시각을 본문에 추가하고,
+            # trace_id는 본문과 메시지 속성 양쪽에 실어 보냄
+            published_at = time.time()
+            messages = []
+            for entry in entries:
+                body = {**entry.payload, "published_at": published_at}
+                attributes = {"trace_id": body["trace_id"]} if body.get("trace_id") else None
+                messages.append((str(entry.id), json.dumps(body), attributes))
+
+            # 전송에 실패한 행은 남겨 두고 다음 주기에 다시 전송
+            send_started_ns = time.time_ns()
+            sent_ids = [int(entry_id) for entry_id in self.queue.send_batch(messages)]
+            send_finished_ns = time.time_ns()
+            _record_publish_spans(entries, sent_ids, send_started_ns, send_finished_ns)
+
+            crud.delete_outbox_entries(db, sent_ids)
+            db.commit()
+            log.info(f"Published {len(sent_ids)} report jobs: outbox_ids={sent_ids}")
+            return len(entries)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.publish_pending()
+            except Exception as e:
+                log.error(f"Error publishing outbox: {e}", exc_info=True)
+                claimed = 0
+            # 한 배치를 꽉 채웠으면 남은 행이 있을 수 있으므로 바로 다음 배치를 처리
+            if claimed < OUTBOX_BATCH_SIZE:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+publisher = OutboxPublisher()
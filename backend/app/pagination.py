@@ -0,0 +1,48 @@
+# app/pagination.py
+
+import base64
+import json
+from datetime import date, datetime
+
+
+# 커서는 (정렬 키, id) 쌍을 base64로 감싼 불투명한 문자열
+# 클라이언트는 내용을 해석하지 않고 다음 요청에 그대로 넘겨주기만 하면 됨
+def encode_cursor(sort_key: str, row_id: int) -> str:
+    raw = json.dumps([sort_key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """잘못된 커서는 ValueError로 알림"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(sort_key, str) or not isinstance(row_id, int):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return sort_key, row_id
+
+
+def encode_run_cursor(run_date: datetime, run_id: int) -> str:
+    return encode_cursor(run_date.isoformat(), run_id)
+
+
+def decode_run_cursor(cursor: str):
+    run_date, run_id = decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(run_date), run_id
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_report_cursor(target_date: date, report_id: int) -> str:
+    return encode_cursor(target_date.isoformat(), report_id)
+
+
+def decode_report_cursor(cursor: str):
+    target_date, report_id = decode_cursor(cursor)
+    try:
+        return date.fromisoformat(target_date), report_id
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
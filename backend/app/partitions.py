@@ -0,0 +1,167 @@
+# app/partitions.py
+"""runs 테이블의 월별 파티션 관리 명령
+
+    python -m app.partitions ensure --months-ahead 3
+    python -m app.partitions list
+    python -m app.partitions archive --before 2024-01 [--drop]
+
+runs는 run_date 기준 월별 RANGE 파티션(runs_YYYYMM, UTC 기준 월)과, 파티션이 없는 달의 기록을 받는 runs_default로 나뉨.
+파티션을 만들면 부모 테이블의 인덱스가 자동으로 같이 만들어짐.
+
+ensure는 이번 달부터 months-ahead개월 뒤까지 빠진 파티션을 만듦.
+API가 시작할 때와 k8s/partition-cronjob.yaml에서 실행하고, 여러 곳에서 동시에 실행해도 advisory lock으로 한 곳에서만 진행됨.
+runs_default에 이미 그 달의 기록이 있으면 새 파티션으로 옮긴 뒤 붙임.
+
+archive는 before보다 이전 달의 파티션을 runs에서 떼어내서 RUNS_ARCHIVE_SCHEMA 스키마로 옮기고, --drop이면 삭제함.
+run_daily_stats는 그대로 남으므로 일별/기간 리포트는 계속 나오지만,
+떼어낸 기록은 리더보드 재계산(app.leaderboards)의 원본에서도 빠짐.
+"""
+
+import argparse
+import logging
+import os
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from . import crud
+from .database import engine
+
+load_dotenv()
+
+log = logging.getLogger("partitions")
+
+RUNS_PARTITION_MONTHS_AHEAD = int(os.getenv("RUNS_PARTITION_MONTHS_AHEAD", "3"))
+RUNS_ARCHIVE_SCHEMA = os.getenv("RUNS_ARCHIVE_SCHEMA", "archive")
+RUNS_DEFAULT_PARTITION = "runs_default"
+# 파티션 DDL을 한 번에 하나만 실행하는 pg_advisory_xact_lock(namespace, key)의 키
+PARTITION_LOCK_KEY = 0
+
+_PARTITION_NAME = re.compile(r"^runs_(\d{4})(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"runs_{month:%Y%m}"
+
+
+def _bounds(month: date) -> Tuple[str, str]:
+    return f"{month.isoformat()} 00:00:00+00", f"{add_months(month, 1).isoformat()} 00:00:00+00"
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, Optional[date]]]:
+    """(파티션 이름, 월) 목록, 월 순서, runs_default는 월이 None"""
+    names = conn.execute(text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'runs'::regclass
+    """)).scalars().all()
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1) if match else None))
+    return sorted(partitions, key=lambda partition: (partition[1] is None, partition[1] or date.min))
+
+
+def create_partition(conn: Connection, month: date):
+    """month의 파티션을 만듦, runs_default에 그 달의 기록이 있으면 옮겨서 붙임"""
+    name = partition_name(month)
+    lower, upper = _bounds(month)
+    bounds = {"lower": lower, "upper": upper}
+    in_default = conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {RUNS_DEFAULT_PARTITION} WHERE run_date >= :lower AND run_date < :upper)"
+    ), bounds).scalar()
+    if not in_default:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF runs FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+        log.info(f"Created partition {name}")
+        return
+
+    # 겹치는 행이 default에 남아 있으면 ATTACH가 실패하므로 먼저 옮김
+    conn.execute(text(f"CREATE TABLE {name} (LIKE runs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {RUNS_DEFAULT_PARTITION} WHERE run_date >= :lower AND run_date < :upper RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds).rowcount
+    conn.execute(text(f"ALTER TABLE runs ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    log.info(f"Created partition {name} with {moved} rows moved from {RUNS_DEFAULT_PARTITION}")
+
+
+def ensure_partitions(months_ahead: int = RUNS_PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """이번 달부터 months_ahead개월 뒤까지 빠진 파티션을 만들고, 만든 파티션 이름을 반환"""
+    this_month = (today or crud.utc_today()).replace(day=1)
+    created = []
+    with engine.begin() as conn:
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, :key)"),
+            {"namespace": crud.PARTITION_LOCK_NAMESPACE, "key": PARTITION_LOCK_KEY},
+        )
+        existing = {month for _, month in list_partitions(conn)}
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            if month not in existing:
+                create_partition(conn, month)
+                created.append(partition_name(month))
+    return created
+
+
+def archive_partitions(before: date, drop: bool = False, today: Optional[date] = None) -> List[str]:
+    """before가 속한 달 이전의 월별 파티션을 떼어냄 (이번 달 이후는 떼어내지 않음)"""
+    before = min(before.replace(day=1), (today or crud.utc_today()).replace(day=1))
+    archived = []
+    with engine.begin() as conn:
+        conn.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, :key)"),
+            {"namespace": crud.PARTITION_LOCK_NAMESPACE, "key": PARTITION_LOCK_KEY},
+        )
+        if not drop:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {RUNS_ARCHIVE_SCHEMA}"))
+        for name, month in list_partitions(conn):
+            if month is None or month >= before:
+                continue
+            # DETACH ... CONCURRENTLY는 default 파티션이 있으면 쓸 수 없으므로 짧은 ACCESS EXCLUSIVE 잠금으로 떼어냄
+            conn.execute(text(f"ALTER TABLE runs DETACH PARTITION {name}"))
+            if drop:
+                conn.execute(text(f"DROP TABLE {name}"))
+                log.info(f"Dropped partition {name}")
+            else:
+                conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {RUNS_ARCHIVE_SCHEMA}"))
+                log.info(f"Archived partition {name} to schema {RUNS_ARCHIVE_SCHEMA}")
+            archived.append(name)
+    return archived
+
+
+def _month(value: str) -> date:
+    return date.fromisoformat(f"{value}-01")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Manage monthly partitions of the runs table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    ensure_parser = subparsers.add_parser("ensure", help="Create missing partitions up to N months ahead")
+    ensure_parser.add_argument("--months-ahead", type=int, default=RUNS_PARTITION_MONTHS_AHEAD)
+    subparsers.add_parser("list", help="List partitions")
+    archive_parser = subparsers.add_parser("archive", help="Detach partitions older than a month")
+    archive_parser.add_argument("--before", type=_month, required=True, help="YYYY-MM, partitions before this month are detached")
+    archive_parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of moving them to the archive schema")
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        ensure_partitions(args.months_ahead)
+    elif args.command == "list":
+        with engine.connect() as conn:
+            for name, month in list_partitions(conn):
+                rows = conn.execute(text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"), {"name": name}).scalar()
+                print(f"{name}\t{month or 'DEFAULT'}\t~{rows} rows")
+    else:
+        archive_partitions(args.before, args.drop)
@@ -0,0 +1,95 @@
+# app/report_events.py
+# 워커가 crud.update_report_content에서 보내는 NOTIFY(report_events 채널)를 받아
+# 같은 API 프로세스에 연결된 사용자별 SSE 구독자에게 나눠 주는 허브
+# 프로세스마다 LISTEN 연결 하나만 사용하고, 구독자 수와 관계없이 DB 조회는 없음
+
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Optional, Set
+import asyncpg
+from dotenv import load_dotenv
+from . import crud
+from .database import SQLALCHEMY_DATABASE_URL
+
+load_dotenv()
+
+# 구독자 한 명당 보내지 못하고 쌓아 둘 수 있는 최대 이벤트 수, 넘치면 오래된 것부터 버림
+REPORT_EVENTS_QUEUE_SIZE = int(os.getenv("REPORT_EVENTS_QUEUE_SIZE", "100"))
+# LISTEN 연결이 끊어졌을 때 다시 연결하기까지 기다리는 시간
+REPORT_EVENTS_RECONNECT_SECONDS = float(os.getenv("REPORT_EVENTS_RECONNECT_SECONDS", "1"))
+
+log = logging.getLogger("report_events")
+
+
+class ReportEventHub:
+    """이벤트 루프 안에서만 사용, 첫 구독 때 LISTEN 연결을 염"""
+
+    def __init__(self, dsn: str = SQLALCHEMY_DATABASE_URL, channel: str = crud.REPORT_EVENTS_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=REPORT_EVENTS_QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def publish(self, event: dict):
+        for queue in self._subscribers.get(event.get("user_id"), ()):
+            if queue.full():
+                # 읽지 않는 구독자 때문에 메모리가 늘지 않도록 오래된 이벤트를 버림
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self.publish(json.loads(payload))
+        except ValueError:
+            log.error(f"Invalid report event payload: {payload}")
+
+    async def _listen(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                log.info(f"Listening for report events on '{self.channel}'.")
+                await closed.wait()
+                log.error("Report event connection closed, reconnecting.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Report event listener error: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            # 끊어진 사이의 이벤트는 놓치므로 클라이언트는 다시 연결할 때 목록을 한 번 조회해야 함
+            await asyncio.sleep(REPORT_EVENTS_RECONNECT_SECONDS)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+hub = ReportEventHub()
@@ -2,34 +2,46 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm # 이 부분을 다시 사용합니다.
-from sqlalchemy.orm import Session
-from .. import database, schemas, jwt_token, crud, hashing
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import schemas, jwt_token, async_crud, hashing, oauth2
 
 router = APIRouter(
     tags=["Authentication"],
     prefix="/auth"
 )
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def hashing_busy_exception():
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                         detail="Too many authentication requests. Please retry shortly.",
+                         headers={"Retry-After": str(hashing.HASH_RETRY_AFTER_SECONDS)})
 
 @router.post("/signup", response_model=schemas.UserDisplay)
-def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def signup(user: schemas.UserCreate, db: AsyncSession = Depends(oauth2.get_async_db)):
+    db_user = await async_crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await hashing.hash_password(user.password)
+    except hashing.HashingBusy:
+        raise hashing_busy_exception()
+    return await async_crud.create_user(db=db, user=user, hashed_password=hashed_password)
 
 @router.post("/login", response_model=schemas.Token)
-def login(request: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=request.username) 
-    if not user or not hashing.Hasher.verify_password(request.password, user.password):
+async def login(request: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(oauth2.get_async_db)):
+    user = await async_crud.get_user_by_email(db, email=request.username)
+    if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid Credentials")
-    
-    access_token = jwt_token.create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    try:
+        verified, new_hash = await hashing.verify_and_update(request.password, user.password)
+    except hashing.HashingBusy:
+        raise hashing_busy_exception()
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid Credentials")
+    # BCRYPT_ROUNDS가 바뀌었으면 로그인에 성공한 김에 새 cost로 저장
+    if new_hash is not None:
+        await async_crud.update_user_password(db, user, new_hash)
+
+    # 인증이 필요한 요청에서 사용자를 다시 조회하지 않도록 id와 표시용 필드를 클레임에 넣음
+    access_token = jwt_token.create_access_token(data={"sub": user.email, "uid": user.id, "username": user.username})
+    return {"access_token": access_token, "token_type": "bearer"}
@@ -0,0 +1,79 @@
+# app/routers/leaderboards.py
+
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from .. import schemas, oauth2, async_crud, crud
+
+router = APIRouter(
+    tags=["Leaderboards"],
+    prefix="/leaderboards"
+)
+
+
+def _ranked_entries(rows, value_of) -> List[schemas.LeaderboardEntry]:
+    """상위 N명은 순위 순서로 조회했으므로 앞 사람과 값이 같으면 같은 순위"""
+    entries = []
+    for position, row in enumerate(rows, start=1):
+        value = float(value_of(row))
+        rank = entries[-1].rank if entries and entries[-1].value == value else position
+        entries.append(schemas.LeaderboardEntry(rank=rank, user_id=row.user_id, username=row.username, value=value))
+    return entries
+
+
+@router.get("/personal-bests", response_model=List[schemas.PersonalBestDisplay])
+async def get_my_personal_bests(
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    return await async_crud.get_personal_bests(db, current_user.id)
+
+
+@router.get("/personal-bests/{distance}", response_model=schemas.Leaderboard)
+async def get_personal_best_leaderboard(
+    distance: str,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    if distance not in crud.PERSONAL_BEST_DISTANCES:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown distance")
+
+    rows = await async_crud.get_personal_best_top(db, distance, limit)
+    me = None
+    mine = await async_crud.get_personal_best(db, current_user.id, distance)
+    if mine is not None:
+        rank = await async_crud.get_personal_best_rank(db, distance, mine.pace_seconds_per_km)
+        me = schemas.LeaderboardEntry(
+            rank=rank, user_id=current_user.id, username=current_user.username, value=float(mine.pace_seconds_per_km)
+        )
+    return schemas.Leaderboard(
+        board=crud.personal_best_board(distance),
+        entries=_ranked_entries(rows, lambda row: row.pace_seconds_per_km),
+        me=me
+    )
+
+
+@router.get("/weekly-distance", response_model=schemas.Leaderboard)
+async def get_weekly_distance_leaderboard(
+    week_start: Optional[date] = Query(None, description="해당 주의 아무 날짜 (생략하면 이번 주)"),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    week_start = crud.week_start_of(week_start or crud.utc_today())
+
+    rows = await async_crud.get_weekly_distance_top(db, week_start, limit)
+    me = None
+    mine = await async_crud.get_weekly_distance(db, current_user.id, week_start)
+    if mine is not None:
+        rank = await async_crud.get_weekly_distance_rank(db, week_start, mine.total_distance_km)
+        me = schemas.LeaderboardEntry(
+            rank=rank, user_id=current_user.id, username=current_user.username, value=float(mine.total_distance_km)
+        )
+    return schemas.Leaderboard(
+        board=crud.weekly_board(week_start),
+        entries=_ranked_entries(rows, lambda row: row.total_distance_km),
+        me=me
+    )
@@ -1,69 +1,122 @@
 # app/routers/reports.py
 
-import os
-import boto3
+import asyncio
 import json
 import logging
-from dotenv import load_dotenv
-from sqlalchemy.orm import Session
-from fastapi import APIRouter, Depends, status
-from .. import schemas, models, oauth2, crud
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from .. import schemas, oauth2, async_crud, outbox, pagination, conditional, report_events, fast_json, tracing
+from typing import Literal, Optional
 
-load_dotenv()
-
-SQS_QUEUE_URL = os.getenv("SQS_QUEUE_URL")
-AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2")
 log = logging.getLogger("reports")
 
+REPORT_EVENTS_HEARTBEAT_SECONDS = 15
+
 router = APIRouter(
     tags=["Reports"],
     prefix="/reports"
 )
 
 @router.post("/", status_code=status.HTTP_202_ACCEPTED)
-def request_report(
+async def request_report(
     report_request: schemas.ReportCreate,
-    db: Session = Depends(oauth2.get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    response: Response,
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
 ):
-    log.info(f"crud.create_report_request start")
-    # DB에 리포트 요청 기록 생성 -> PENDING으로 기록
-    report_db = crud.create_report_request(db, report=report_request, user_id=current_user.id)
-    log.info(f"crud.create_report_request end")
-    log.info(f"Report request: {report_request}")
-    log.info(f"Report request created: report_id={report_db.id}, user_id={current_user.id}, type={report_request.report_type}, date={report_request.target_date.isoformat()}")
-    # SQS에 보낼 메시지 생성
-    message_body = {
-        "report_id": report_db.id,
-        "user_id": current_user.id,
-        "report_type": report_request.report_type,
-        "target_date": report_request.target_date.isoformat()
-    }
+    # 이 요청에서 시작한 trace는 outbox 메시지를 통해 워커의 처리 span까지 이어짐
+    with tracing.span("report.request", user_id=current_user.id, report_type=report_request.report_type) as attributes:
+        response.headers["X-Trace-Id"] = tracing.current()[0]
+        log.info(f"async_crud.get_or_create_report_request start")
+        # 같은 조건의 리포트가 처리 중이거나 이미 유효하게 완료되었으면 재사용, 아니면 PENDING으로 기록
+        with tracing.span("report.db_insert"):
+            report_db, created = await async_crud.get_or_create_report_request(db, report=report_request, user_id=current_user.id)
+        log.info(f"async_crud.get_or_create_report_request end")
+        attributes.update(report_id=report_db.id, created=created)
 
-    # SQS 큐에 메시지 전송
-    log.info(
-        f"Queueing report request: report_id={report_db.id}, user_id={current_user.id}, "
-        f"type={report_request.report_type}, date={report_request.target_date.isoformat()}"
-    )
+        if not created:
+            log.info(f"Reusing report: report_id={report_db.id}, user_id={current_user.id}, status={report_db.status}")
+            if report_db.status == "COMPLETED":
+                response.status_code = status.HTTP_200_OK
+                return {"message": "Report is already available.", "report_id": report_db.id, "status": report_db.status}
+            return {"message": "Report generation is already in progress.", "report_id": report_db.id, "status": report_db.status}
 
-    sqs_client = boto3.client('sqs', region_name=AWS_REGION)
+        log.info(f"Report request: {report_request}")
+        log.info(f"Report request created: report_id={report_db.id}, user_id={current_user.id}, type={report_request.report_type}, date={report_request.target_date.isoformat()}")
+        # 큐 메시지는 리포트와 같은 트랜잭션에서 outbox에 기록됨, publisher를 깨워 바로 전송
+        outbox.publisher.notify()
 
-    response = sqs_client.send_message(
-        QueueUrl=SQS_QUEUE_URL,
-        MessageBody=json.dumps(message_body)
-    )
+        return {"message": "Report generation has been requested and is being processed.", "report_id": report_db.id, "status": report_db.status}
+
+@router.get("/", response_model=schemas.ReportPage)
+async def get_user_reports(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    status_filter: Optional[Literal["PENDING", "COMPLETED", "FAILED"]] = Query(None, alias="status"),
+    report_type: Optional[Literal["daily", "weekly", "monthly", "range"]] = None
+):
+    try:
+        after = pagination.decode_report_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
-    message_id = response.get("MessageId")
-    log.info(
-        f"Enqueued to SQS: message_id={message_id}, report_id={report_db.id}, queue_url={SQS_QUEUE_URL}"
+    # 버전을 목록보다 먼저 읽어야 사이에 바뀐 리포트가 이전 ETag로 캐시되지 않음
+    _, reports_version = await async_crud.get_list_versions(db, current_user.id)
+    unchanged = conditional.not_modified(request, response, conditional.make_etag("reports", current_user.id, reports_version, request))
+    if unchanged is not None:
+        return unchanged
+
+    # 한 건 더 조회해서 다음 페이지 존재 여부를 판단
+    reports = await async_crud.get_report_rows_by_user(
+        db, user_id=current_user.id, cursor=after, limit=limit + 1, status=status_filter, report_type=report_type
     )
+    next_cursor = None
+    if len(reports) > limit:
+        reports = reports[:limit]
+        next_cursor = pagination.encode_report_cursor(reports[-1].target_date, reports[-1].id)
+    return fast_json.page_response(reports, next_cursor, response)
+
+@router.get("/events")
+async def stream_report_events(
+    request: Request,
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    """리포트 상태가 바뀔 때마다 Server-Sent Events로 알림 (event: report, data: JSON)
+    구독을 연 뒤 목록을 한 번 조회하면 그 사이에 끝난 리포트도 놓치지 않음"""
+    queue = report_events.hub.subscribe(current_user.id)
 
-    return {"message": "Report generation has been requested and is being processed."}
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=REPORT_EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # 프록시가 유휴 연결을 끊지 않도록 주기적으로 주석 줄을 보냄
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: report\nid: {event['report_id']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            report_events.hub.unsubscribe(current_user.id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-@router.get("/", response_model=List[schemas.ReportDisplay])
-def get_user_reports(
-    db: Session = Depends(oauth2.get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+@router.get("/{report_id}", response_model=schemas.ReportDisplay)
+async def get_user_report(
+    report_id: int,
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
 ):
-    return crud.get_reports_by_user(db, user_id=current_user.id)
\ No newline at end of file
+    report = await async_crud.get_report(db, report_id=report_id, user_id=current_user.id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
+    return report
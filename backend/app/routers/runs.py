@@ -1,9 +1,14 @@
 # app/routers/runs.py
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
-from typing import List
-from .. import schemas, models, oauth2, crud
+import shutil
+import tempfile
+from datetime import date
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+from .. import schemas, oauth2, crud, async_crud, pagination, run_import, run_export, run_batcher, conditional, fast_json, tracks
 
 router = APIRouter(
     tags=["Runs"],
@@ -11,18 +16,141 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.RunDisplay, status_code=status.HTTP_201_CREATED)
-def create_new_run(
+async def create_new_run(
     run: schemas.RunCreate,
-    db: Session = Depends(oauth2.get_db),
-    current_user: models.User = Depends(oauth2.get_current_user)
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
 ):
-    return crud.create_run(db=db, run=run, user_id=current_user.id)
-
-@router.get("/", response_model=List[schemas.RunDisplay])
-def get_all_runs_for_user(
-    db: Session = Depends(oauth2.get_db),
-    current_user: models.User = Depends(oauth2.get_current_user),
-    skip: int = 0,
-    limit: int = 100
+    if run_batcher.RUN_GROUP_COMMIT_ENABLED:
+        return await run_batcher.batcher.submit(run, user_id=current_user.id)
+    return await async_crud.create_run(db=db, run=run, user_id=current_user.id)
+
+@router.get("/", response_model=schemas.RunPage)
+async def get_all_runs_for_user(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000, description="페이지 크기 (최대 1000, 넘으면 422)")
+):
+    try:
+        after = pagination.decode_run_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # 버전을 목록보다 먼저 읽어야 사이에 추가된 기록이 이전 ETag로 캐시되지 않음
+    runs_version, _ = await async_crud.get_list_versions(db, current_user.id)
+    unchanged = conditional.not_modified(request, response, conditional.make_etag("runs", current_user.id, runs_version, request))
+    if unchanged is not None:
+        return unchanged
+
+    # 한 건 더 조회해서 다음 페이지 존재 여부를 판단
+    # 큰 페이지에서도 빠르도록 RunDisplay 검증 없이 필요한 컬럼만 읽어 바로 인코딩
+    runs = await async_crud.get_run_rows_by_user(db, user_id=current_user.id, cursor=after, limit=limit + 1)
+    next_cursor = None
+    if len(runs) > limit:
+        runs = runs[:limit]
+        next_cursor = pagination.encode_run_cursor(runs[-1].run_date, runs[-1].id)
+    return fast_json.page_response(runs, next_cursor, response)
+
+@router.get("/export")
+async def export_runs(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    # 기록 전체를 한 번에 읽지 않고 서버 측 커서에서 청크 단위로 읽어서 바로 전송
+    if format == "parquet" and not run_export.parquet_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export is not available on this server")
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must not be after end_date")
+
+    filename = f"runs-{date.today():%Y%m%d}.{format}"
+    return StreamingResponse(
+        run_export.export_runs(current_user.id, format, start_date, end_date),
+        media_type=run_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/bulk", response_model=schemas.RunImportDisplay, status_code=status.HTTP_202_ACCEPTED)
+async def import_runs(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv, ndjson, gpx (생략하면 파일 확장자로 판단)"),
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    import_format = run_import.detect_format(file.filename, format)
+    if import_format is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported import format. Use csv, ndjson or gpx.")
+
+    db_import = await async_crud.create_run_import(db, user_id=current_user.id, format=import_format)
+
+    if file.size is not None and file.size <= run_import.RUN_IMPORT_INLINE_MAX_BYTES:
+        # 작은 파일은 요청 안에서 처리하고 결과를 바로 반환
+        await run_in_threadpool(run_import.import_runs_from_file, db_import.id, current_user.id, file.file, import_format)
+        await db.refresh(db_import)
+        response.status_code = status.HTTP_200_OK
+        return db_import
+
+    # 응답 후에는 UploadFile이 닫히므로 임시 파일로 옮겨 두고 백그라운드에서 처리
+    # 진행 상황은 GET /runs/imports/{import_id}로 확인
+    def spool_to_disk():
+        with tempfile.NamedTemporaryFile(prefix="run-import-", suffix=f".{import_format}", delete=False) as tmp:
+            shutil.copyfileobj(file.file, tmp)
+            return tmp.name
+
+    path = await run_in_threadpool(spool_to_disk)
+    background_tasks.add_task(run_import.import_runs_from_path, db_import.id, current_user.id, path, import_format)
+    return db_import
+
+@router.get("/imports/{import_id}", response_model=schemas.RunImportDisplay)
+async def get_run_import(
+    import_id: int,
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    db_import = await async_crud.get_run_import(db, import_id=import_id, user_id=current_user.id)
+    if db_import is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    return db_import
+
+@router.post("/tracks", response_model=schemas.RunDisplay, status_code=status.HTTP_201_CREATED)
+async def upload_run_track(
+    file: UploadFile = File(..., description="GPX (시각, 위도/경도, 고도, 심박)"),
+    notes: Optional[str] = Form(None),
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    # 거리, 시간, 평균 페이스, 칼로리는 트랙에서 계산해서 채움
+    def build():
+        return crud.new_track_run(current_user.id, tracks.parse_gpx(file.file), notes)
+
+    try:
+        db_run, db_track = await run_in_threadpool(build)
+    except tracks.TrackError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await async_crud.create_track_run(db, db_run, db_track)
+
+@router.get("/{run_id}/track", response_model=schemas.RunTrackDisplay)
+async def get_run_track(
+    run_id: int,
+    samples: bool = False,
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
 ):
-    return crud.get_runs_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
\ No newline at end of file
+    # 구간 기록은 저장할 때 계산해 둔 summary를 쓰고, 샘플은 samples=true일 때만 blob을 읽어 복원
+    db_track = await async_crud.get_run_track(db, run_id=run_id, user_id=current_user.id, with_samples=samples)
+    if db_track is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Track not found")
+    content = {
+        "run_id": db_track.run_id,
+        "run_date": db_track.run_date,
+        "sample_count": db_track.sample_count,
+        "summary": db_track.summary,
+        "samples": await run_in_threadpool(lambda: tracks.samples(tracks.decode(db_track.data))) if samples else None,
+    }
+    return Response(content=fast_json.dumps(content), media_type="application/json")
@@ -0,0 +1,84 @@
+# app/routers/stats.py
+
+import os
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import Optional
+from .. import schemas, oauth2, crud, async_crud, conditional, fast_json
+from ..cache import stats_cache
+
+# 한 번에 조회할 수 있는 최대 기간
+STATS_MAX_RANGE_DAYS = int(os.getenv("STATS_MAX_RANGE_DAYS", "731"))
+STATS_DEFAULT_RANGE_DAYS = 28
+
+router = APIRouter(
+    tags=["Stats"],
+    prefix="/stats"
+)
+
+
+def _summarize(rows, start_date: date, end_date: date) -> dict:
+    """crud.training_stats_statement의 일별 행으로 응답을 만듦 (행 수는 기간의 일수)"""
+    days = [row._asdict() for row in rows]
+    trend = days[0].pop("pace_trend_seconds_per_km_per_week") if days else None
+    for day in days[1:]:
+        del day["pace_trend_seconds_per_km_per_week"]
+
+    run_count = sum(day["run_count"] for day in days)
+    total_distance_km = sum(day["distance_km"] for day in days)
+    total_duration_seconds = sum(day["duration_seconds"] for day in days)
+    longest = max((day for day in days if day["longest_run_km"] is not None), key=lambda day: day["longest_run_km"], default=None)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "run_count": run_count,
+        "total_distance_km": total_distance_km,
+        "total_duration_seconds": total_duration_seconds,
+        "avg_pace_seconds_per_km": total_duration_seconds / total_distance_km if total_distance_km else None,
+        "longest_run_km": longest["longest_run_km"] if longest else None,
+        "longest_run_date": longest["day"] if longest else None,
+        "current_streak_days": days[-1]["streak_days"] if days else 0,
+        "longest_streak_days": max((day["streak_days"] for day in days), default=0),
+        "pace_trend_seconds_per_km_per_week": trend,
+        "days": days,
+    }
+
+
+@router.get("/", response_model=schemas.TrainingStats)
+async def get_training_stats(
+    request: Request,
+    response: Response,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: AsyncSession = Depends(oauth2.get_async_db),
+    current_user: schemas.CurrentUser = Depends(oauth2.get_current_user)
+):
+    # 기본값은 오늘까지 최근 28일
+    end_date = end_date or crud.utc_today()
+    start_date = start_date or end_date - timedelta(days=STATS_DEFAULT_RANGE_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must not be after end_date")
+    if (end_date - start_date).days >= STATS_MAX_RANGE_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Date range must be at most {STATS_MAX_RANGE_DAYS} days")
+
+    # 기록이 추가될 때마다 runs_version이 바뀌므로, 버전이 같으면 ETag와 캐시된 응답을 그대로 사용
+    # 기본 기간은 날짜가 바뀌면 달라지므로 ETag에 실제 기간도 포함
+    runs_version, _ = await async_crud.get_list_versions(db, current_user.id)
+    etag = conditional.make_etag(f"stats-{start_date}-{end_date}", current_user.id, runs_version, request)
+    unchanged = conditional.not_modified(request, response, etag)
+    if unchanged is not None:
+        return unchanged
+
+    key = (current_user.id, start_date, end_date)
+    cached = stats_cache.get(key)
+    if cached is not None and cached[0] == runs_version:
+        content = cached[1]
+    else:
+        rows = await async_crud.get_training_stats_rows(db, current_user.id, start_date, end_date)
+        content = fast_json.dumps(_summarize(rows, start_date, end_date))
+        stats_cache.set(key, (runs_version, content))
+
+    headers = dict(response.headers)
+    headers.pop("content-length", None)
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,96 @@
+# app/run_batcher.py
+# POST /runs 요청을 짧은 시간 동안 모아서 한 트랜잭션(multi-row INSERT ... RETURNING)으로 저장하는 group commit
+# 동시에 많은 요청이 들어올 때 요청마다 커밋(WAL flush)하던 것을 배치마다 한 번으로 줄임
+
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+from . import crud, models, schemas
+from .database import AsyncSessionLocal
+
+load_dotenv()
+
+RUN_GROUP_COMMIT_ENABLED = os.getenv("RUN_GROUP_COMMIT_ENABLED", "false").lower() == "true"
+# 첫 요청이 들어온 뒤 이 시간만큼 기다렸다가 모인 요청을 저장
+RUN_GROUP_COMMIT_WINDOW_MS = float(os.getenv("RUN_GROUP_COMMIT_WINDOW_MS", "5"))
+# 이 개수가 모이면 기다리지 않고 바로 저장
+RUN_GROUP_COMMIT_MAX_BATCH = int(os.getenv("RUN_GROUP_COMMIT_MAX_BATCH", "100"))
+
+log = logging.getLogger("run_batcher")
+
+
+class RunInsertBatcher:
+    """이벤트 루프 안에서만 사용 (스레드 안전하지 않음)"""
+
+    def __init__(self, window_ms: float = RUN_GROUP_COMMIT_WINDOW_MS, max_batch: int = RUN_GROUP_COMMIT_MAX_BATCH,
+                 session_factory=AsyncSessionLocal):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.session_factory = session_factory
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()
+
+    async def submit(self, run: schemas.RunCreate, user_id: int) -> models.Run:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((crud.new_run_values(run, user_id), future))
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush)
+        return await future
+
+    def _start_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _insert(self, values: List[dict]) -> List[models.Run]:
+        async with self.session_factory() as db:
+            runs = (await db.scalars(crud.insert_runs_returning_statement(), values)).all()
+            for stmt in crud.runs_inserted_statements(runs):
+                await db.execute(stmt)
+            await db.commit()
+            return runs
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]):
+        try:
+            runs = await self._insert([values for values, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], exception=e)
+                return
+            # 한 행 때문에 배치 전체가 실패하지 않도록 하나씩 다시 저장
+            log.error(f"Group commit of {len(batch)} runs failed, retrying one by one: {e}")
+            await asyncio.gather(*(self._flush([item]) for item in batch))
+            return
+        for (_, future), run in zip(batch, runs):
+            self._resolve(future, result=run)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result=None, exception=None):
+        # 기다리던 요청이 이미 취소된 경우
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    async def drain(self):
+        """종료 전에 모여 있는 요청까지 저장"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+batcher = RunInsertBatcher()
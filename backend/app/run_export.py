@@ -0,0 +1,132 @@
+# app/run_export.py
+# GET /runs/export 응답을 서버 측 커서로 읽으면서 청크 단위로 인코딩
+# 전체 기록을 메모리에 올리지 않으므로 사용량은 기록 수가 아니라 청크 크기에 비례하고, 첫 청크부터 바로 전송됨
+
+import csv
+import io
+import os
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Row
+from . import crud, fast_json
+from .database import AsyncSessionLocal
+
+load_dotenv()
+
+# 커서에서 한 번에 가져오는 행 수, CSV/NDJSON은 이 단위로 전송
+RUN_EXPORT_CHUNK_ROWS = int(os.getenv("RUN_EXPORT_CHUNK_ROWS", "2000"))
+# Parquet row group 크기, 너무 작으면 파일이 커지고 읽기도 느려지므로 여러 청크를 모아서 씀
+RUN_EXPORT_PARQUET_ROW_GROUP_ROWS = int(os.getenv("RUN_EXPORT_PARQUET_ROW_GROUP_ROWS", "50000"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNS = [column.key for column in crud.RUN_EXPORT_COLUMNS]
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def _chunks(user_id: int, start_date: Optional[date], end_date: Optional[date]) -> AsyncIterator[List[Row]]:
+    """서버 측 커서(asyncpg)로 RUN_EXPORT_CHUNK_ROWS행씩 읽음
+    응답을 보내는 동안 커서가 열려 있어야 하므로 요청의 세션 대신 여기서 세션을 엶"""
+    stmt = crud.run_export_statement(user_id, start_date, end_date).execution_options(yield_per=RUN_EXPORT_CHUNK_ROWS)
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            yield rows
+
+
+async def _csv(chunks) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    async for rows in chunks:
+        # 시각은 ISO 8601로 써서 POST /runs/bulk로 다시 가져올 수 있게 함
+        writer.writerows([value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # 기록이 없을 때도 헤더는 보냄
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _ndjson(chunks) -> AsyncIterator[bytes]:
+    async for rows in chunks:
+        yield b"".join(fast_json.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter가 쓴 바이트를 모아 두었다가 꺼내 가는 파일 객체"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _parquet(chunks) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("run_date", pa.timestamp("us", tz="UTC")),
+        ("distance_km", pa.decimal128(10, 2)),
+        ("duration_seconds", pa.int32()),
+        ("avg_pace_seconds_per_km", pa.int32()),
+        ("calories_burned", pa.int32()),
+        ("notes", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    pending = []
+
+    def write_row_group(rows):
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+
+    # row group 변환과 zstd 압축은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    yield sink.drain()  # 파일 헤더("PAR1")
+    async for rows in chunks:
+        pending.extend(rows)
+        if len(pending) >= RUN_EXPORT_PARQUET_ROW_GROUP_ROWS:
+            rows, pending = pending, []
+            await run_in_threadpool(write_row_group, rows)
+            yield sink.drain()
+    if pending:
+        await run_in_threadpool(write_row_group, pending)
+    await run_in_threadpool(writer.close)
+    yield sink.drain()
+
+
+def export_runs(user_id: int, format: str, start_date: Optional[date] = None, end_date: Optional[date] = None) -> AsyncIterator[bytes]:
+    """format("csv", "ndjson", "parquet")으로 인코딩한 바이트 청크"""
+    encoders = {"csv": _csv, "ndjson": _ndjson, "parquet": _parquet}
+    return encoders[format](_chunks(user_id, start_date, end_date))
@@ -0,0 +1,185 @@
+# app/run_import.py
+# POST /runs/bulk 업로드를 스트리밍으로 파싱해서 청크 단위로 검증/저장
+# 파일 전체를 메모리에 올리지 않으므로 사용량은 파일 크기가 아니라 청크 크기에 비례함
+
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Iterator, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy import func
+from . import crud, schemas, tracks
+from .database import SessionLocal
+
+load_dotenv()
+
+RUN_IMPORT_CHUNK_SIZE = int(os.getenv("RUN_IMPORT_CHUNK_SIZE", "1000"))
+# 응답/DB에 남기는 행별 오류 최대 개수, 나머지는 failed_rows로만 셈
+RUN_IMPORT_MAX_ERRORS = int(os.getenv("RUN_IMPORT_MAX_ERRORS", "100"))
+# 이 크기 이하의 업로드는 요청 안에서 바로 처리하고, 큰 파일은 백그라운드 작업으로 처리
+RUN_IMPORT_INLINE_MAX_BYTES = int(os.getenv("RUN_IMPORT_INLINE_MAX_BYTES", str(1024 * 1024)))
+
+FORMATS = ("csv", "ndjson", "gpx")
+EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".gpx": "gpx"}
+# GPX 거리를 이 개수의 trkpt마다 모아서 한 번에 계산
+GPX_DISTANCE_BATCH_POINTS = 1024
+
+log = logging.getLogger("run_import")
+
+# (행 번호, 파싱된 행) 또는 파싱 자체에 실패한 행은 (행 번호, 오류 메시지 문자열)
+ParsedRow = Tuple[int, object]
+
+
+def detect_format(filename: Optional[str], format: Optional[str] = None) -> Optional[str]:
+    if format:
+        return format if format in FORMATS else None
+    return EXTENSIONS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def iter_csv(fileobj: BinaryIO) -> Iterator[ParsedRow]:
+    """헤더: run_date, distance_km, duration_seconds, notes (그 외 열은 무시)"""
+    reader = csv.DictReader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+    for row in reader:
+        # 빈 칸은 값이 없는 것으로 처리
+        yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def iter_ndjson(fileobj: BinaryIO) -> Iterator[ParsedRow]:
+    for line_no, line in enumerate(io.TextIOWrapper(fileobj, encoding="utf-8-sig"), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, f"Invalid JSON: {e}"
+
+
+def _path_km(points) -> float:
+    points = np.array(points)
+    return float(tracks.haversine_m(points[:-1, 0], points[:-1, 1], points[1:, 0], points[1:, 1]).sum()) / 1000
+
+
+def iter_gpx(fileobj: BinaryIO) -> Iterator[ParsedRow]:
+    """<trk> 하나를 달리기 한 건으로 보고, 거리는 trkpt 사이의 거리 합, 시간은 첫/마지막 trkpt 시각 차이
+    처리가 끝난 요소는 tracks.iterparse_gpx가 바로 떼어내고, 좌표도 GPX_DISTANCE_BATCH_POINTS개씩만 모아 두므로
+    트랙 길이나 파일 크기와 관계없이 메모리를 일정하게 유지"""
+    track_no = 0
+    name = None
+    first_time = last_time = None
+    points = []  # 아직 거리에 더하지 않은 좌표, 앞 묶음의 마지막 좌표로 시작
+    distance = 0.0
+    for event, elem in tracks.iterparse_gpx(fileobj):
+        tag = tracks.local_name(elem.tag)
+        if event == "start":
+            if tag == "trk":
+                track_no += 1
+                name = None
+                first_time = last_time = None
+                points = []
+                distance = 0.0
+            continue
+        if tag == "trkpt":
+            points.append((float(elem.get("lat")), float(elem.get("lon"))))
+            if len(points) > GPX_DISTANCE_BATCH_POINTS:
+                distance += _path_km(points)
+                points = points[-1:]
+            time_elem = next((child for child in elem if tracks.local_name(child.tag) == "time"), None)
+            if time_elem is not None and time_elem.text:
+                last_time = datetime.fromisoformat(time_elem.text.strip().replace("Z", "+00:00"))
+                first_time = first_time or last_time
+        elif tag == "name" and track_no and name is None:
+            name = (elem.text or "").strip() or None
+        elif tag == "trk":
+            if len(points) > 1:
+                distance += _path_km(points)
+            if first_time is None:
+                yield track_no, "Track has no timestamps"
+            else:
+                yield track_no, {
+                    "run_date": first_time,
+                    "distance_km": round(distance, 2),
+                    "duration_seconds": int((last_time - first_time).total_seconds()),
+                    "notes": name,
+                }
+
+
+PARSERS = {"csv": iter_csv, "ndjson": iter_ndjson, "gpx": iter_gpx}
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in error.errors())
+
+
+def import_runs(db, import_id: int, user_id: int, fileobj: BinaryIO, format: str):
+    """청크마다 검증 -> multi-row INSERT -> 일별 집계 갱신 -> 진행 상황 기록 후 커밋
+    잘못된 행은 건너뛰고 오류만 기록하며, 이미 커밋된 청크는 이후 실패와 관계없이 유지됨"""
+    total = imported = failed = 0
+    errors = []
+    crud.update_run_import(db, import_id, status="PROCESSING")
+    db.commit()
+
+    rows = PARSERS[format](fileobj)
+    try:
+        while True:
+            chunk = list(islice(rows, RUN_IMPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            valid = []
+            for row_no, raw in chunk:
+                try:
+                    if isinstance(raw, str):
+                        raise ValueError(raw)
+                    if not isinstance(raw, dict):
+                        raise ValueError("Row must be an object")
+                    run = schemas.RunImportRow.model_validate(raw)
+                    valid.append({
+                        **run.model_dump(),
+                        "run_date": crud.as_utc(run.run_date),
+                        **tracks.derived_run_values(run.distance_km, run.duration_seconds),
+                        "user_id": user_id,
+                    })
+                except (ValidationError, ValueError) as e:
+                    failed += 1
+                    if len(errors) < RUN_IMPORT_MAX_ERRORS:
+                        message = _validation_message(e) if isinstance(e, ValidationError) else str(e)
+                        errors.append({"row": row_no, "error": message})
+            crud.insert_runs(db, valid)
+            total += len(chunk)
+            imported += len(valid)
+            crud.update_run_import(db, import_id, total_rows=total, imported_rows=imported, failed_rows=failed, errors=errors)
+            db.commit()
+    except Exception as e:
+        # 파일 형식 자체가 깨진 경우(XML 파싱 오류, 인코딩 오류 등)
+        db.rollback()
+        log.error(f"Run import failed: import_id={import_id}, error={e}")
+        errors = (errors + [{"row": total + 1, "error": f"Import aborted: {e}"}])[-RUN_IMPORT_MAX_ERRORS:]
+        crud.update_run_import(db, import_id, status="FAILED", errors=errors, completed_at=func.now())
+        db.commit()
+        return
+
+    crud.update_run_import(db, import_id, status="COMPLETED", completed_at=func.now())
+    db.commit()
+    log.info(f"Run import completed: import_id={import_id}, total={total}, imported={imported}, failed={failed}")
+
+
+def import_runs_from_file(import_id: int, user_id: int, fileobj: BinaryIO, format: str):
+    db = SessionLocal()
+    try:
+        import_runs(db, import_id, user_id, fileobj, format)
+    finally:
+        db.close()
+
+
+def import_runs_from_path(import_id: int, user_id: int, path: str, format: str):
+    """백그라운드 작업용, 처리가 끝나면 임시 파일을 지움"""
+    try:
+        with open(path, "rb") as fileobj:
+            import_runs_from_file(import_id, user_id, fileobj, format)
+    finally:
+        os.remove(path)
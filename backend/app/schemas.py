@@ -1,7 +1,7 @@
 # app/schemas.py
 
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import List, Literal, Optional
 from datetime import datetime, date
 
 # User 관련 스키마
@@ -24,6 +24,18 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    expires_at: Optional[datetime] = None
+
+# 인증된 요청의 사용자, 토큰 클레임만으로 만들 수 있어 DB 조회가 필요 없음
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    email: EmailStr
+
+    class Config:
+        from_attributes = True
 
 class UserLogin(BaseModel):
     email: EmailStr
@@ -42,18 +54,83 @@ class RunDisplay(RunBase):
     id: int
     user_id: int
     run_date: datetime
+    avg_pace_seconds_per_km: Optional[int] = None
+    calories_burned: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+# 커서 기반 페이지 응답
+# next_cursor가 None이면 마지막 페이지
+class RunPage(BaseModel):
+    items: List[RunDisplay]
+    next_cursor: Optional[str] = None
+
+# 대량 가져오기(POST /runs/bulk)의 한 행
+# 다른 앱의 기록을 옮겨 오는 것이므로 run_date를 직접 받음
+class RunImportRow(RunBase):
+    run_date: datetime
+    distance_km: float = Field(gt=0)
+    duration_seconds: int = Field(gt=0)
+
+class RunImportError(BaseModel):
+    row: int
+    error: str
+
+class RunImportDisplay(BaseModel):
+    id: int
+    format: str
+    status: str
+    total_rows: int
+    imported_rows: int
+    failed_rows: int
+    errors: List[RunImportError] = []
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @field_validator("errors", mode="before")
+    @classmethod
+    def default_errors(cls, value):
+        return value or []
 
     class Config:
         from_attributes = True
 
 # Report의 기본 필드
+# weekly는 target_date가 속한 주(월~일), monthly는 해당 월,
+# range는 start_date ~ target_date 기간을 집계
 class ReportBase(BaseModel):
     report_type: str
     target_date: date
+    start_date: Optional[date] = None
 
 # Report 생성을 요청할 때 받을 데이터
 class ReportCreate(ReportBase):
-    pass
+    report_type: Literal["daily", "weekly", "monthly", "range"]
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.report_type == "range":
+            if self.start_date is None or self.start_date > self.target_date:
+                raise ValueError("range 리포트는 target_date 이전의 start_date가 필요합니다.")
+        else:
+            self.start_date = None
+        return self
+
+# 리포트 목록에서 사용할 데이터 (content 제외)
+class ReportSummary(ReportBase):
+    id: int
+    user_id: int
+    status: str
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ReportPage(BaseModel):
+    items: List[ReportSummary]
+    next_cursor: Optional[str] = None
 
 # API 응답으로 리포트 정보를 보여줄 때 사용할 데이터
 class ReportDisplay(ReportBase):
@@ -63,4 +140,93 @@ class ReportDisplay(ReportBase):
     content: Optional[dict] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# 훈련 통계 (GET /stats)
+# 하루 한 항목, 기록이 없는 날도 포함
+class TrainingDay(BaseModel):
+    day: date
+    run_count: int
+    distance_km: float
+    duration_seconds: int
+    longest_run_km: Optional[float] = None
+    pace_seconds_per_km: Optional[float] = None
+    rolling_7d_km: float
+    rolling_28d_km: float
+    rolling_7d_pace_seconds_per_km: Optional[float] = None
+    streak_days: int  # 그날까지 연속으로 달린 일수 (안 달린 날은 0)
+
+class TrainingStats(BaseModel):
+    start_date: date
+    end_date: date
+    run_count: int
+    total_distance_km: float
+    total_duration_seconds: int
+    avg_pace_seconds_per_km: Optional[float] = None
+    longest_run_km: Optional[float] = None
+    longest_run_date: Optional[date] = None
+    current_streak_days: int  # end_date까지 이어진 연속 일수
+    longest_streak_days: int  # 기간 안에서 가장 긴 연속 일수 (기간 이전부터 이어진 날 포함)
+    pace_trend_seconds_per_km_per_week: Optional[float] = None  # 음수면 빨라지는 중
+    days: List[TrainingDay]
+
+# 거리별 개인 최고 기록
+class PersonalBestDisplay(BaseModel):
+    distance: str  # "5k", "10k", "half", "full"
+    pace_seconds_per_km: float
+    duration_seconds: int
+    run_id: int
+    run_date: datetime
+
+    class Config:
+        from_attributes = True
+
+# 리더보드 한 줄, value는 페이스(초/km) 또는 주간 거리(km)
+# 같은 값이면 같은 순위
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    username: str
+    value: float
+
+class Leaderboard(BaseModel):
+    board: str
+    entries: List[LeaderboardEntry]
+    me: Optional[LeaderboardEntry] = None  # 기록이 없으면 None
+
+# GPS 트랙의 1km 구간 기록, 마지막 구간은 1km보다 짧을 수 있음
+# 페이스는 멈춘 시간을 뺀 이동 시간 기준
+class TrackSplit(BaseModel):
+    km: int
+    distance_m: float
+    moving_seconds: float
+    pace_seconds_per_km: Optional[float] = None
+    elevation_change_m: Optional[float] = None
+    avg_heart_rate: Optional[int] = None
+
+class TrackSummary(BaseModel):
+    distance_m: float
+    elapsed_seconds: float
+    moving_seconds: float
+    moving_pace_seconds_per_km: Optional[float] = None
+    elevation_gain_m: Optional[float] = None
+    elevation_loss_m: Optional[float] = None
+    avg_heart_rate: Optional[int] = None
+    max_heart_rate: Optional[int] = None
+    splits: List[TrackSplit]
+
+# 샘플 배열 (같은 인덱스가 같은 샘플), seconds는 run_date부터의 경과 시간
+class TrackSamples(BaseModel):
+    seconds: List[float]
+    lat: List[float]
+    lon: List[float]
+    elevation: Optional[List[float]] = None
+    heart_rate: Optional[List[Optional[int]]] = None
+    pace_seconds_per_km: List[Optional[float]]
+
+class RunTrackDisplay(BaseModel):
+    run_id: int
+    run_date: datetime
+    sample_count: int
+    summary: TrackSummary
+    samples: Optional[TrackSamples] = None  # samples=true일 때만
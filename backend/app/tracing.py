@@ -0,0 +1,85 @@
+# app/tracing.py
+# 리포트 작업의 API 요청 -> outbox -> 큐 -> 워커 처리를 하나의 trace로 잇는 span 기록
+# span은 OpenTelemetry span과 같은 필드(trace_id, span_id, parent_span_id, 시작/종료 시각, attributes)를
+# 한 줄짜리 JSON 로그("trace" 로거)로 남기므로, 로그 수집기에서 trace_id로 모아 볼 수 있음
+
+import json
+import logging
+import os
+import secrets
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+
+log = logging.getLogger("trace")
+if not log.handlers:
+    # 다른 로그와 달리 JSON 한 줄만 출력
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+# 현재 실행 중인 span의 (trace_id, span_id)
+_current: ContextVar[Optional[Tuple[str, str]]] = ContextVar("current_span", default=None)
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def current() -> Optional[Tuple[str, str]]:
+    """현재 span의 (trace_id, span_id), 없으면 None"""
+    return _current.get()
+
+
+def record_span(name: str, trace_id: str, start_ns: int, end_ns: int, parent_span_id: Optional[str] = None,
+                span_id: Optional[str] = None, status: str = "OK", **attributes) -> str:
+    """이미 끝난 구간을 span으로 기록 (큐 대기 시간처럼 시작/종료 시각을 따로 아는 경우), span_id를 반환"""
+    span_id = span_id or new_span_id()
+    if TRACING_ENABLED:
+        log.info(json.dumps({
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_span_id": parent_span_id,
+            "name": name,
+            "start_time_unix_nano": start_ns,
+            "end_time_unix_nano": end_ns,
+            "duration_ms": round((end_ns - start_ns) / 1e6, 3),
+            "status": status,
+            "attributes": attributes,
+        }, default=str))
+    return span_id
+
+
+@contextmanager
+def span(name: str, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None, **attributes):
+    """블록 실행 시간을 span으로 기록
+    trace_id를 주지 않으면 현재 span의 trace를 이어가고, 현재 span도 없으면 새 trace를 시작함
+    블록 안에서 attributes에 값을 추가할 수 있도록 dict를 넘겨줌"""
+    parent = _current.get()
+    if trace_id is None:
+        trace_id, parent_span_id = parent if parent is not None else (new_trace_id(), None)
+    span_id = new_span_id()
+    token = _current.set((trace_id, span_id))
+    start_ns = time.time_ns()
+    status = "OK"
+    try:
+        yield attributes
+    except BaseException:
+        status = "ERROR"
+        raise
+    finally:
+        _current.reset(token)
+        record_span(name, trace_id, start_ns, time.time_ns(), parent_span_id, span_id, status, **attributes)
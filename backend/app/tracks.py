@@ -0,0 +1,311 @@
+# app/tracks.py
+# GPS 트랙(시각, 위도/경도, 고도, 심박) 저장과 구간 기록 계산
+# 샘플을 행으로 저장하지 않고 채널별 정수 배열의 차분(delta)을 np.savez_compressed로 묶어 run_tracks.data(bytea) 한 칸에 저장함
+# 트랙 하나를 읽을 때 blob 한 번만 가져오고, 거리/구간/페이스 계산은 numpy 벡터 연산으로 함
+
+import io
+import os
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 한 트랙의 최대 샘플 수 (1초 간격이면 약 55시간)
+TRACK_MAX_SAMPLES = int(os.getenv("TRACK_MAX_SAMPLES", "200000"))
+# 이보다 느리거나, 샘플 사이가 이보다 길게 비면 멈춘 것으로 보고 이동 시간에서 제외
+TRACK_STOP_SPEED_MPS = float(os.getenv("TRACK_STOP_SPEED_MPS", "0.5"))
+TRACK_MAX_GAP_SECONDS = float(os.getenv("TRACK_MAX_GAP_SECONDS", "30"))
+# 고도 노이즈가 상승 고도로 쌓이지 않도록 이 개수만큼 이동 평균한 뒤 계산
+TRACK_ELEVATION_SMOOTHING_SAMPLES = int(os.getenv("TRACK_ELEVATION_SMOOTHING_SAMPLES", "5"))
+# 샘플별 페이스(GET /runs/{id}/track)를 계산하는 구간 길이
+TRACK_PACE_WINDOW_SECONDS = float(os.getenv("TRACK_PACE_WINDOW_SECONDS", "30"))
+# 소모 칼로리 추정: 체중(kg) x 거리(km) x 1kcal, 사용자 체중 정보가 없으므로 기본 체중 사용
+RUN_CALORIES_WEIGHT_KG = float(os.getenv("RUN_CALORIES_WEIGHT_KG", "70"))
+
+EARTH_RADIUS_M = 6371008.8
+ENCODING_VERSION = 1
+# 위도/경도는 1e-7도(약 1cm), 고도는 0.1m, 시각은 ms 단위 정수로 저장
+COORDINATE_SCALE = 1e7
+ELEVATION_SCALE = 10
+NO_HEART_RATE = -1
+
+# seconds는 start부터의 경과 시간(초), elevation/heart_rate는 기록이 없으면 None
+# elevation은 일부 샘플에만 없으면 보간한 값으로 채워져 있음
+# heart_rate 배열 안에서 값이 없는 샘플은 NO_HEART_RATE
+Track = namedtuple("Track", ["start", "seconds", "lat", "lon", "elevation", "heart_rate"])
+
+
+class TrackError(ValueError):
+    """트랙 파일을 해석할 수 없을 때"""
+
+
+def derived_run_values(distance_km, duration_seconds: int) -> dict:
+    """거리와 시간만 있는 기록에도 채우는 값 (평균 페이스, 추정 칼로리)"""
+    distance_km = float(distance_km)
+    return {
+        "avg_pace_seconds_per_km": round(duration_seconds / distance_km) if distance_km > 0 else None,
+        "calories_burned": round(RUN_CALORIES_WEIGHT_KG * distance_km),
+    }
+
+
+def local_name(tag: str) -> str:
+    # GPX 1.0/1.1 네임스페이스와 관계없이 태그 이름만 비교
+    return tag.rsplit("}", 1)[-1]
+
+
+# 처리가 끝나면 부모에서 떼어내는 GPX 요소 (점과 점을 담는 요소)
+_DETACHED_GPX_TAGS = {"wpt", "rte", "rtept", "trk", "trkseg", "trkpt"}
+
+
+def iterparse_gpx(fileobj: BinaryIO):
+    """ET.iterparse(events=("start", "end"))와 같지만, 점(trkpt 등)과 트랙 요소는 end 이벤트를 처리한 뒤 부모에서 떼어냄
+    elem.clear()만 하면 빈 요소가 부모(trkseg, trk)의 자식 목록에 계속 쌓이므로 파일 크기와 관계없이 메모리를 일정하게 유지하려면 떼어내야 함
+    점 안의 time, ele 등은 점을 떼어낼 때 같이 버려지므로 점의 end 이벤트에서 읽을 수 있음"""
+    parents = []
+    for event, elem in ET.iterparse(fileobj, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            yield event, elem
+            continue
+        parents.pop()
+        yield event, elem
+        if parents and local_name(elem.tag) in _DETACHED_GPX_TAGS:
+            parents[-1].remove(elem)
+
+
+def parse_gpx(fileobj: BinaryIO) -> Track:
+    """GPX의 모든 trkpt(여러 trkseg는 이어 붙임)를 하나의 트랙으로 읽음
+    심박은 Garmin TrackPointExtension 등 확장 안의 <hr> 태그에서 읽음"""
+    times, lats, lons, elevations, heart_rates = [], [], [], [], []
+    try:
+        for event, elem in iterparse_gpx(fileobj):
+            if event != "end" or local_name(elem.tag) != "trkpt":
+                continue
+            values = {local_name(child.tag): (child.text or "").strip() for child in elem.iter()}
+            if values.get("time"):
+                sampled_at = datetime.fromisoformat(values["time"].replace("Z", "+00:00"))
+                # GPX 시각은 UTC가 기본
+                times.append(sampled_at if sampled_at.tzinfo else sampled_at.replace(tzinfo=timezone.utc))
+                lats.append(float(elem.get("lat")))
+                lons.append(float(elem.get("lon")))
+                elevations.append(float(values["ele"]) if values.get("ele") else np.nan)
+                heart_rates.append(int(float(values["hr"])) if values.get("hr") else NO_HEART_RATE)
+                if len(times) > TRACK_MAX_SAMPLES:
+                    raise TrackError(f"Track has more than {TRACK_MAX_SAMPLES} samples")
+    except (ET.ParseError, TypeError, ValueError) as e:
+        if isinstance(e, TrackError):
+            raise
+        raise TrackError(f"Invalid GPX: {e}") from e
+    if len(times) < 2:
+        raise TrackError("Track needs at least two timestamped points")
+
+    start = times[0]
+    seconds = np.array([(time - start).total_seconds() for time in times])
+    if np.any(np.diff(seconds) < 0):
+        raise TrackError("Track points are not in time order")
+    elevation = np.array(elevations)
+    missing = np.isnan(elevation)
+    if missing.any() and not missing.all():
+        # 일부 샘플에만 고도가 없으면 시간 기준으로 보간(앞뒤 끝은 가장 가까운 값)해서
+        # summarize와 encode가 같은 값을 쓰게 함
+        elevation[missing] = np.interp(seconds[missing], seconds[~missing], elevation[~missing])
+    heart_rate = np.array(heart_rates, dtype=np.int16)
+    return Track(
+        start=start,
+        seconds=seconds,
+        lat=np.array(lats),
+        lon=np.array(lons),
+        elevation=None if np.isnan(elevation).all() else elevation,
+        heart_rate=None if (heart_rate == NO_HEART_RATE).all() else heart_rate,
+    )
+
+
+def _delta(values: np.ndarray) -> np.ndarray:
+    """차분을 값 범위에 맞는 가장 작은 정수 타입으로 (GPS 샘플은 대부분 int16 안에 들어감)"""
+    delta = np.diff(values.astype(np.int64), prepend=0)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if delta.min() >= info.min and delta.max() <= info.max:
+            return delta.astype(dtype)
+    return delta
+
+
+def encode(track: Track) -> bytes:
+    channels = {
+        "version": np.array([ENCODING_VERSION]),
+        "start_ms": np.array([int(track.start.timestamp() * 1000)], dtype=np.int64),
+        "utc_offset_seconds": np.array([int(track.start.utcoffset().total_seconds()) if track.start.utcoffset() else 0]),
+        "time": _delta(np.round(track.seconds * 1000)),
+        "lat": _delta(np.round(track.lat * COORDINATE_SCALE)),
+        "lon": _delta(np.round(track.lon * COORDINATE_SCALE)),
+    }
+    if track.elevation is not None:
+        # 빠진 고도는 parse_gpx에서 보간해 두었으므로 NaN이 없음
+        channels["elevation"] = _delta(np.round(track.elevation * ELEVATION_SCALE))
+    if track.heart_rate is not None:
+        channels["heart_rate"] = _delta(track.heart_rate)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **channels)
+    return buffer.getvalue()
+
+
+def decode(data: bytes) -> Track:
+    with np.load(io.BytesIO(data)) as channels:
+        if int(channels["version"][0]) != ENCODING_VERSION:
+            raise TrackError(f"Unsupported track encoding version: {int(channels['version'][0])}")
+        offset = timezone(timedelta(seconds=int(channels["utc_offset_seconds"][0])))
+        start = datetime.fromtimestamp(int(channels["start_ms"][0]) / 1000, tz=offset)
+
+        def restore(name: str) -> np.ndarray:
+            return np.cumsum(channels[name], dtype=np.int64)
+
+        return Track(
+            start=start,
+            seconds=restore("time") / 1000,
+            lat=restore("lat") / COORDINATE_SCALE,
+            lon=restore("lon") / COORDINATE_SCALE,
+            elevation=restore("elevation") / ELEVATION_SCALE if "elevation" in channels else None,
+            heart_rate=restore("heart_rate").astype(np.int16) if "heart_rate" in channels else None,
+        )
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """두 지점(도 단위) 사이의 거리(m), 배열을 주면 원소별로 계산"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def segment_distances(track: Track) -> np.ndarray:
+    """인접한 샘플 사이의 거리(m)"""
+    return haversine_m(track.lat[:-1], track.lon[:-1], track.lat[1:], track.lon[1:])
+
+
+def _moving_segments(track: Track, distances: np.ndarray) -> np.ndarray:
+    dt = np.diff(track.seconds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(dt > 0, distances / dt, 0)
+    return (dt > 0) & (dt <= TRACK_MAX_GAP_SECONDS) & (speed >= TRACK_STOP_SPEED_MPS)
+
+
+def _smoothed_elevation(elevation: np.ndarray) -> np.ndarray:
+    window = min(TRACK_ELEVATION_SMOOTHING_SAMPLES, len(elevation))
+    if window <= 1:
+        return elevation
+    padded = np.pad(elevation, (window // 2, window - 1 - window // 2), mode="edge")
+    return np.convolve(padded, np.ones(window) / window, mode="valid")
+
+
+def _pace(seconds: float, meters: float) -> Optional[float]:
+    return round(seconds / (meters / 1000), 1) if meters > 0 else None
+
+
+def summarize(track: Track) -> dict:
+    """트랙 전체 기록과 1km 구간(split)별 기록
+    마지막 구간은 1km가 안 될 수 있고, 페이스는 멈춘 시간을 뺀 이동 시간 기준"""
+    distances = segment_distances(track)
+    moving = _moving_segments(track, distances)
+    dt = np.diff(track.seconds)
+    cumulative_distance = np.concatenate(([0.0], np.cumsum(distances)))
+    cumulative_moving = np.concatenate(([0.0], np.cumsum(np.where(moving, dt, 0.0))))
+    total_distance = float(cumulative_distance[-1])
+    moving_seconds = float(cumulative_moving[-1])
+
+    # 각 km 지점을 지난 시각(이동 시간 기준)과 고도를 선형 보간
+    marks = np.append(np.arange(1000.0, total_distance, 1000.0), total_distance)
+    marks = np.concatenate(([0.0], marks))
+    split_moving = np.diff(np.interp(marks, cumulative_distance, cumulative_moving))
+    split_distance = np.diff(marks)
+
+    elevation_gain = elevation_loss = None
+    split_elevation = [None] * len(split_distance)
+    if track.elevation is not None:
+        elevation = _smoothed_elevation(track.elevation)
+        climb = np.diff(elevation)
+        elevation_gain = round(float(climb[climb > 0].sum()), 1)
+        elevation_loss = round(abs(float(climb[climb < 0].sum())), 1)
+        # + 0.0으로 -0.0을 0.0으로 바꿈
+        split_elevation = (np.round(np.diff(np.interp(marks, cumulative_distance, elevation)), 1) + 0.0).tolist()
+
+    avg_heart_rate = max_heart_rate = None
+    split_heart_rate = [None] * len(split_distance)
+    if track.heart_rate is not None:
+        measured = track.heart_rate != NO_HEART_RATE
+        avg_heart_rate = round(float(track.heart_rate[measured].mean()))
+        max_heart_rate = int(track.heart_rate[measured].max())
+        # 샘플이 속한 구간별 평균 심박
+        split_index = np.minimum(np.searchsorted(marks, cumulative_distance, side="right") - 1, len(split_distance) - 1)
+        split_index = np.maximum(split_index, 0)
+        totals = np.bincount(split_index[measured], weights=track.heart_rate[measured], minlength=len(split_distance))
+        counts = np.bincount(split_index[measured], minlength=len(split_distance))
+        split_heart_rate = [round(total / count) if count else None for total, count in zip(totals, counts)]
+
+    splits = [
+        {
+            "km": index + 1,
+            "distance_m": round(float(distance), 1),
+            "moving_seconds": round(float(seconds), 1),
+            "pace_seconds_per_km": _pace(float(seconds), float(distance)),
+            "elevation_change_m": split_elevation[index],
+            "avg_heart_rate": split_heart_rate[index],
+        }
+        for index, (distance, seconds) in enumerate(zip(split_distance, split_moving))
+        if distance > 0
+    ]
+    return {
+        "distance_m": round(total_distance, 1),
+        "elapsed_seconds": round(float(track.seconds[-1] - track.seconds[0]), 1),
+        "moving_seconds": round(moving_seconds, 1),
+        "moving_pace_seconds_per_km": _pace(moving_seconds, total_distance),
+        "elevation_gain_m": elevation_gain,
+        "elevation_loss_m": elevation_loss,
+        "avg_heart_rate": avg_heart_rate,
+        "max_heart_rate": max_heart_rate,
+        "splits": splits,
+    }
+
+
+def run_values(track: Track, summary: dict) -> dict:
+    """트랙에서 채우는 Run 컬럼 (duration_seconds는 멈춘 시간을 포함한 전체 시간, 평균 페이스는 이동 시간 기준)"""
+    distance_km = round(summary["distance_m"] / 1000, 2)
+    duration_seconds = round(summary["elapsed_seconds"])
+    # POST /runs/bulk(schemas.RunImportRow)와 같이 거리와 시간이 0인 기록은 받지 않음
+    if distance_km <= 0:
+        raise TrackError("Track has no distance")
+    if duration_seconds <= 0:
+        raise TrackError("Track has no duration")
+    return {
+        "run_date": track.start,
+        "distance_km": distance_km,
+        "duration_seconds": duration_seconds,
+        **derived_run_values(distance_km, duration_seconds),
+        "avg_pace_seconds_per_km": round(summary["moving_pace_seconds_per_km"]) if summary["moving_pace_seconds_per_km"] else None,
+    }
+
+
+def sample_pace(track: Track) -> np.ndarray:
+    """샘플별로 직전 TRACK_PACE_WINDOW_SECONDS초 동안의 페이스(초/km), 움직이지 않았으면 NaN"""
+    cumulative_distance = np.concatenate(([0.0], np.cumsum(segment_distances(track))))
+    window_start = np.searchsorted(track.seconds, track.seconds - TRACK_PACE_WINDOW_SECONDS)
+    seconds = track.seconds - track.seconds[window_start]
+    meters = cumulative_distance - cumulative_distance[window_start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pace = np.where(meters / np.maximum(seconds, 1e-9) >= TRACK_STOP_SPEED_MPS, seconds / (meters / 1000), np.nan)
+    return np.round(pace, 1)
+
+
+def samples(track: Track) -> dict:
+    """GET /runs/{id}/track?samples=true 응답용 컬럼 배열 (orjson이 numpy 배열을 바로 직렬화)"""
+    pace = sample_pace(track)
+    return {
+        "seconds": track.seconds,
+        "lat": track.lat,
+        "lon": track.lon,
+        "elevation": track.elevation,
+        "heart_rate": None if track.heart_rate is None else np.where(track.heart_rate == NO_HEART_RATE, None, track.heart_rate).tolist(),
+        "pace_seconds_per_km": np.where(np.isnan(pace), None, pace).tolist(),
+    }
@@ -0,0 +1,110 @@
+# benchmarks/bench_async_db.py
+"""sync(스레드풀) crud와 async crud의 동시 요청 처리량/지연 비교 벤치마크
+
+라우터가 하는 조회(사용자 조회 + 러닝 기록 첫 페이지)를 데이터 접근 계층에서 직접 호출함.
+sync 쪽은 Starlette가 sync 엔드포인트를 돌리는 기본 스레드풀 크기(40)에서 실행하고,
+async 쪽은 하나의 이벤트 루프에서 --clients개의 코루틴으로 실행함.
+실제 Postgres가 필요하며 접속 정보와 풀 크기는 app.database와 같은 환경 변수를 사용함.
+
+    cd backend && python -m benchmarks.bench_async_db --clients 500 --requests 5000 --email runner@example.com
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import async_crud, crud, database
+
+STARLETTE_THREADPOOL_SIZE = 40
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def report(name, timings, elapsed):
+    print(
+        f"{name:<6} requests={len(timings)} throughput={len(timings) / elapsed:.0f}/s "
+        f"p50={statistics.median(timings):.1f}ms p99={percentile(timings, 0.99):.1f}ms"
+    )
+
+
+def sync_request(email):
+    db = database.SessionLocal()
+    try:
+        user = crud.get_user_by_email(db, email)
+        crud.get_runs_by_user(db, user_id=user.id, limit=101)
+    finally:
+        db.close()
+
+
+def run_sync(args):
+    # --clients개의 클라이언트가 STARLETTE_THREADPOOL_SIZE개의 스레드를 나눠 쓰는 상황을 재현
+    # 지연에는 스레드를 기다린 시간도 포함됨
+    timings = []
+    remaining = iter(range(args.requests))
+    remaining_lock = threading.Lock()
+    threadpool = threading.Semaphore(STARLETTE_THREADPOOL_SIZE)
+
+    def client():
+        while True:
+            with remaining_lock:
+                if next(remaining, None) is None:
+                    return
+            began = time.perf_counter()
+            with threadpool:
+                sync_request(args.email)
+            timings.append((time.perf_counter() - began) * 1000)
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        for _ in range(args.clients):
+            executor.submit(client)
+    elapsed = time.perf_counter() - began
+    database.engine.dispose()
+    return timings, elapsed
+
+
+async def async_request(email):
+    async with database.AsyncSessionLocal() as db:
+        user = await async_crud.get_user_by_email(db, email)
+        await async_crud.get_runs_by_user(db, user_id=user.id, limit=101)
+
+
+async def run_async(args):
+    timings = []
+    remaining = iter(range(args.requests))
+
+    async def client():
+        for _ in remaining:
+            began = time.perf_counter()
+            await async_request(args.email)
+            timings.append((time.perf_counter() - began) * 1000)
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    elapsed = time.perf_counter() - began
+    await database.async_engine.dispose()
+    return timings, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--email", required=True, help="러닝 기록이 있는 사용자 이메일")
+    args = parser.parse_args()
+
+    print(f"clients={args.clients} pool_size={database.DB_POOL_SIZE} max_overflow={database.DB_MAX_OVERFLOW}")
+    timings, elapsed = run_sync(args)
+    report("sync", timings, elapsed)
+    timings, elapsed = asyncio.run(run_async(args))
+    report("async", timings, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_list_serialization.py
+"""GET /runs 목록 응답의 조회 + 직렬화 시간 비교 벤치마크
+
+- orm: ORM 객체를 조회해서 schemas.RunPage로 검증(from_attributes)한 뒤 JSON으로 직렬화 (response_model 경로)
+- rows: 필요한 컬럼만 행으로 조회해서 fast_json.page_response로 인코딩 (현재 라우터 경로)
+Postgres 대신 메모리 SQLite를 사용하므로 DB 시간은 상대 비교용.
+두 경로의 JSON 결과가 같은지도 확인함.
+
+    cd backend && python -m benchmarks.bench_list_serialization --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import statistics
+import time
+import warnings
+from datetime import datetime, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import BigInteger, create_engine, insert
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from app import crud, fast_json, models, schemas
+
+
+# SQLite에서 BigInteger 기본 키가 자동 증가하도록 INTEGER로 생성
+@compiles(BigInteger, "sqlite")
+def _sqlite_bigint(type_, compiler, **kw):
+    return "INTEGER"
+
+
+def make_session(size: int) -> Session:
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=[models.User.__table__, models.Run.__table__])
+    start = datetime(2020, 1, 1, 6, 30)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"id": 1, "email": "runner@example.com", "password": "x", "username": "runner"}])
+        conn.execute(insert(models.Run), [
+            {
+                "id": i + 1,
+                "user_id": 1,
+                "run_date": start + timedelta(hours=i * 7),
+                "distance_km": round(3 + (i % 200) / 10, 2),
+                "duration_seconds": 1200 + i % 3600,
+                "notes": "easy run" if i % 3 else None,
+            }
+            for i in range(size)
+        ])
+    return Session(engine)
+
+
+def time_it(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - began) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # SQLite의 DECIMAL 경고는 무시
+    warnings.filterwarnings("ignore", message=".*Decimal objects natively.*")
+    page_adapter = TypeAdapter(schemas.RunPage)
+
+    for size in args.sizes:
+        db = make_session(size)
+
+        def orm_path():
+            runs = db.execute(crud.runs_by_user_statement(1, limit=size)).scalars().all()
+            db.expunge_all()
+            page = page_adapter.validate_python({"items": runs, "next_cursor": None}, from_attributes=True)
+            return page_adapter.dump_json(page)
+
+        def rows_path():
+            rows = db.execute(crud.runs_by_user_statement(1, limit=size, columns=crud.RUN_LIST_COLUMNS)).all()
+            return fast_json.page_response(rows, None).body
+
+        orm_ms, orm_body = time_it(orm_path, args.repeat)
+        rows_ms, rows_body = time_it(rows_path, args.repeat)
+        assert json.loads(orm_body) == json.loads(rows_body), "response bodies differ"
+        print(f"rows={size:>7} orm={orm_ms:8.1f}ms rows={rows_ms:8.1f}ms speedup={orm_ms / rows_ms:4.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
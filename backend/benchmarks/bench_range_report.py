@@ -0,0 +1,63 @@
+# benchmarks/bench_range_report.py
+"""365일 range 리포트 계산 시간이 예산 안에 드는지 확인하는 벤치마크
+
+DB 조회를 제외한 계산 부분(worker._summarize_range)만 측정함.
+기간 전체를 한 번의 쿼리로 읽으므로 DB 비용은 기간 길이와 무관하게 왕복 한 번.
+중앙값이 --budget-ms를 넘으면 종료 코드 1로 끝남.
+
+    cd backend && python -m benchmarks.bench_range_report --days 365 --budget-ms 100
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import worker
+
+
+def make_frame(start: date, end: date, runs_per_day: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start, end, freq="D")
+    count = int(len(days) * runs_per_day)
+    distance = rng.uniform(1, 25, count).round(2)
+    return pd.DataFrame({
+        "run_day": rng.choice(days, count),
+        "distance_km": distance,
+        "duration_seconds": (distance * rng.uniform(240, 420, count)).astype("int64"),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--runs-per-day", type=float, default=1.5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    end = date.today()
+    start = end - timedelta(days=args.days - 1)
+    # 워커와 같이 직전 주 비교용 기간까지 포함
+    frame = make_frame(start - timedelta(days=start.weekday() + 7), end, args.runs_per_day)
+
+    timings = []
+    for _ in range(args.repeat):
+        began = time.perf_counter()
+        worker._summarize_range(frame, start, end, "range")
+        timings.append((time.perf_counter() - began) * 1000)
+
+    median = statistics.median(timings)
+    print(f"days={args.days} runs={len(frame)} repeat={args.repeat}")
+    print(f"median={median:.2f}ms min={min(timings):.2f}ms max={max(timings):.2f}ms budget={args.budget_ms:.0f}ms")
+    if median > args.budget_ms:
+        print("FAILED: over latency budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
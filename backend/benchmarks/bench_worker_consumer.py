@@ -0,0 +1,176 @@
+# benchmarks/bench_worker_consumer.py
+"""원래의 serial 루프(메시지 5개 수신 후 매번 1초 대기), 현재 serial 루프, concurrent 컨슈머의
+처리량(messages/sec)을 비교하는 벤치마크
+
+SQS 대신 메모리 기반 LocalSQS를 사용하고, DB 작업은 --db-latency-ms 만큼의
+대기 시간으로 대신함. AWS나 Postgres 없이 실행 가능.
+
+    cd backend && python -m benchmarks.bench_worker_consumer --messages 100
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import date
+
+import worker
+from app import job_queue
+
+
+class LocalSQS:
+    """boto3 SQS 클라이언트 중 워커가 사용하는 메서드만 흉내 낸 메모리 큐"""
+
+    def __init__(self, api_latency: float = 0.0):
+        self.api_latency = api_latency
+        self._messages = {}  # message_id -> [body, receipt_handle, visible_at]
+        self._cond = threading.Condition()
+        self._closed = False
+        self.deleted = 0
+
+    def _call(self):
+        if self.api_latency:
+            time.sleep(self.api_latency)
+
+    def send_message_batch(self, QueueUrl=None, Entries=()):
+        for entry in Entries:
+            self.send_message(MessageBody=entry["MessageBody"])
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+    def send_message(self, QueueUrl=None, MessageBody=None, **kwargs):
+        message_id = str(uuid.uuid4())
+        with self._cond:
+            self._messages[message_id] = [MessageBody, None, 0.0]
+            self._cond.notify_all()
+        return {"MessageId": message_id}
+
+    def receive_message(self, QueueUrl=None, MaxNumberOfMessages=1, WaitTimeSeconds=0, VisibilityTimeout=30, **kwargs):
+        self._call()
+        deadline = time.monotonic() + WaitTimeSeconds
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                received = []
+                for message_id, message in self._messages.items():
+                    if message[2] <= now:
+                        message[1] = str(uuid.uuid4())
+                        message[2] = now + VisibilityTimeout
+                        received.append({"MessageId": message_id, "ReceiptHandle": message[1], "Body": message[0]})
+                        if len(received) >= MaxNumberOfMessages:
+                            break
+                if received or self._closed or now >= deadline:
+                    return {"Messages": received} if received else {}
+                self._cond.wait(deadline - now)
+
+    def _delete(self, receipt_handle):
+        for message_id, message in list(self._messages.items()):
+            if message[1] == receipt_handle:
+                del self._messages[message_id]
+                self.deleted += 1
+                return True
+        return False
+
+    def delete_message(self, QueueUrl=None, ReceiptHandle=None):
+        self._call()
+        with self._cond:
+            self._delete(ReceiptHandle)
+
+    def delete_message_batch(self, QueueUrl=None, Entries=()):
+        self._call()
+        with self._cond:
+            failed = [{"Id": e["Id"], "Message": "not found"} for e in Entries if not self._delete(e["ReceiptHandle"])]
+        return {"Successful": [], "Failed": failed}
+
+    def change_message_visibility_batch(self, QueueUrl=None, Entries=()):
+        self._call()
+        with self._cond:
+            handles = {e["ReceiptHandle"]: e["VisibilityTimeout"] for e in Entries}
+            for message in self._messages.values():
+                if message[1] in handles:
+                    message[2] = time.monotonic() + handles[message[1]]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class _SimulatedSession:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _patch_database(db_latency: float):
+    """DB 왕복 한 번을 db_latency 만큼의 대기로 대신함"""
+    def generate_one(db, user_id, target_date):
+        time.sleep(db_latency)
+        return {"date": target_date.isoformat(), "total_runs": 0}
+
+    def generate_many(db, keys):
+        time.sleep(db_latency)
+        return {(user_id, target_date): {"date": target_date.isoformat(), "total_runs": 0} for user_id, target_date in keys}
+
+    def update_report_content(db, report_id, content, status):
+        time.sleep(db_latency)
+
+    worker.SessionLocal = _SimulatedSession
+    worker._thread_sessions = _SimulatedSession
+    worker._generate_report_content = generate_one
+    worker._generate_report_contents = generate_many
+    worker.crud.update_report_content = update_report_content
+
+
+def _legacy_loop(queue, stop_event):
+    """큐 추상화 이전의 워커 루프: 수신 결과와 상관없이 매번 1초 대기"""
+    while not stop_event.is_set():
+        worker.process_messages(queue)
+        stop_event.wait(1)
+
+
+def run_mode(mode: str, messages: int, api_latency: float):
+    sqs = LocalSQS(api_latency=api_latency)
+    queue = job_queue.SQSJobQueue("local", client=sqs)
+    for i in range(messages):
+        sqs.send_message(MessageBody=json.dumps({
+            "report_id": i, "user_id": i % 50, "report_type": "daily", "target_date": date.today().isoformat()
+        }))
+
+    stop_event = threading.Event()
+    if mode == "legacy":
+        thread = threading.Thread(target=_legacy_loop, args=(queue, stop_event), daemon=True)
+    else:
+        thread = threading.Thread(target=worker.run_worker, args=(queue, mode, stop_event), daemon=True)
+    start = time.perf_counter()
+    thread.start()
+    while sqs.deleted < messages:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    stop_event.set()
+    sqs.close()
+    thread.join()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--api-latency-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    worker.log.disabled = True
+    _patch_database(args.db_latency_ms / 1000)
+
+    print(f"messages={args.messages} db_latency={args.db_latency_ms}ms sqs_latency={args.api_latency_ms}ms "
+          f"concurrency={worker.WORKER_CONCURRENCY}")
+    for mode in ("legacy", "serial", "concurrent"):
+        elapsed = run_mode(mode, args.messages, args.api_latency_ms / 1000)
+        print(f"{mode:>10}: {elapsed:7.2f}s  {args.messages / elapsed:8.1f} messages/sec")
+
+
+if __name__ == "__main__":
+    main()
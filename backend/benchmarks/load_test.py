@@ -0,0 +1,260 @@
+# benchmarks/load_test.py
+"""API + 워커 전체를 대상으로 하는 부하 테스트
+
+앱(uvicorn)과 리포트 워커를 같은 프로세스에서 띄우고, 큐는 메모리 큐(JOB_QUEUE_BACKEND=memory)를 사용해
+SQS 없이 outbox -> 큐 -> 워커 -> 리포트 완료까지 전체 흐름을 실행함.
+DB는 로컬 Postgres가 필요함 (app.database와 같은 DB_* 환경 변수, --migrate로 alembic upgrade head 실행).
+
+가상 사용자마다 회원가입 -> 로그인 후 --duration 동안 아래 비율로 요청을 보냄
+    기록 추가 40%, 기록 목록 35%, 리포트 요청 15%, 리포트 목록 10%
+엔드포인트별 처리량과 p50/p95/p99, 리포트 요청부터 완료까지 걸린 시간을 출력하고
+커밋 간 비교를 위해 --output에 JSON으로 저장함.
+
+    cd backend && BCRYPT_ROUNDS=4 python -m benchmarks.load_test --users 50 --duration 60 --migrate --output load.json
+"""
+
+import os
+
+# 앱 모듈은 import 시점에 환경 변수를 읽으므로 가장 먼저 설정
+os.environ.setdefault("JOB_QUEUE_BACKEND", "memory")
+os.environ.setdefault("OUTBOX_PUBLISHER_ENABLED", "true")
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import uvicorn
+from sqlalchemy import text
+
+import worker
+from app import job_queue
+from app.database import SessionLocal
+from app.main import app
+
+MIX = [
+    ("create_run", 40),
+    ("list_runs", 35),
+    ("request_report", 15),
+    ("list_reports", 10),
+]
+
+
+class Stats:
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name: str, began: float, ok: bool):
+        self.timings[name].append((time.perf_counter() - began) * 1000)
+        if not ok:
+            self.errors[name] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        result = {}
+        for name, timings in sorted(self.timings.items()):
+            result[name] = {
+                "count": len(timings),
+                "errors": self.errors[name],
+                "throughput_per_sec": round(len(timings) / elapsed, 2),
+                "p50_ms": round(percentile(timings, 0.50), 2),
+                "p95_ms": round(percentile(timings, 0.95), 2),
+                "p99_ms": round(percentile(timings, 0.99), 2),
+            }
+        return result
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def migrate():
+    from alembic import command
+    from alembic.config import Config
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(here, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(here, "alembic"))
+    command.upgrade(config, "head")
+
+
+def start_server(port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="api", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("API server failed to start.")
+        time.sleep(0.05)
+    return server, thread
+
+
+async def call(client: httpx.AsyncClient, stats: Stats, name: str, method: str, url: str, **kwargs):
+    began = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        stats.record(name, began, ok=False)
+        return None
+    stats.record(name, began, ok=response.status_code < 400)
+    return response
+
+
+async def virtual_user(client: httpx.AsyncClient, stats: Stats, email: str, deadline: float, rng: random.Random):
+    password = "load-test-password"
+    await call(client, stats, "signup", "POST", "/api/v1/auth/signup",
+               json={"username": email.split("@")[0], "email": email, "password": password})
+    response = await call(client, stats, "login", "POST", "/api/v1/auth/login",
+                          data={"username": email, "password": password})
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    names = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    while time.perf_counter() < deadline:
+        action = rng.choices(names, weights)[0]
+        if action == "create_run":
+            distance = round(rng.uniform(2, 21), 2)
+            await call(client, stats, action, "POST", "/api/v1/runs/", headers=headers, json={
+                "distance_km": distance, "duration_seconds": int(distance * rng.uniform(270, 400)), "notes": "load test"
+            })
+        elif action == "list_runs":
+            await call(client, stats, action, "GET", "/api/v1/runs/", headers=headers, params={"limit": 50})
+        elif action == "request_report":
+            target = date.today() - timedelta(days=rng.randint(0, 30))
+            await call(client, stats, action, "POST", "/api/v1/reports/", headers=headers, json={
+                "report_type": rng.choice(["daily", "weekly", "monthly"]), "target_date": target.isoformat()
+            })
+        else:
+            await call(client, stats, action, "GET", "/api/v1/reports/", headers=headers)
+
+
+async def drive(base_url: str, args, run_id: str, stats: Stats) -> float:
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        began = time.perf_counter()
+        deadline = began + args.duration
+        await asyncio.gather(*(
+            virtual_user(client, stats, f"load-{run_id}-{i}@example.com", deadline, random.Random(args.seed + i))
+            for i in range(args.users)
+        ))
+        return time.perf_counter() - began
+
+
+def report_latency(run_id: str, drain_seconds: float) -> dict:
+    """이번 실행에서 요청한 리포트가 완료될 때까지 기다린 뒤 요청 -> 완료 시간 분포를 계산"""
+    pattern = f"load-{run_id}-%"
+    deadline = time.monotonic() + drain_seconds
+    with SessionLocal() as db:
+        while True:
+            pending = db.execute(text("""
+                SELECT count(*) FROM reports r JOIN users u ON u.id = r.user_id
+                WHERE u.email LIKE :pattern AND r.status = 'PENDING'
+            """), {"pattern": pattern}).scalar()
+            if pending == 0 or time.monotonic() > deadline:
+                break
+            time.sleep(0.5)
+        rows = db.execute(text("""
+            SELECT EXTRACT(EPOCH FROM (r.completed_at - r.created_at)) * 1000
+            FROM reports r JOIN users u ON u.id = r.user_id
+            WHERE u.email LIKE :pattern AND r.status = 'COMPLETED'
+        """), {"pattern": pattern}).scalars().all()
+    latencies = [float(value) for value in rows]
+    return {
+        "completed": len(latencies),
+        "pending": pending,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60, help="부하를 주는 시간(초), 회원가입/로그인 포함")
+    parser.add_argument("--drain", type=float, default=30, help="부하가 끝난 뒤 남은 리포트를 기다리는 최대 시간(초)")
+    parser.add_argument("--worker-mode", choices=["serial", "concurrent"], default=worker.WORKER_MODE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--migrate", action="store_true", help="시작 전에 alembic upgrade head 실행")
+    parser.add_argument("--output", help="결과 JSON을 저장할 경로")
+    args = parser.parse_args()
+
+    if args.migrate:
+        migrate()
+
+    run_id = uuid.uuid4().hex[:8]
+    queue = job_queue.get_job_queue()
+    stop_worker = threading.Event()
+    worker_thread = threading.Thread(
+        target=worker.run_worker, args=(queue, args.worker_mode, stop_worker), name="worker", daemon=True
+    )
+    worker_thread.start()
+    server, server_thread = start_server(free_port())
+
+    stats = Stats()
+    started_at = datetime.now(timezone.utc)
+    try:
+        elapsed = asyncio.run(drive(f"http://127.0.0.1:{server.config.port}", args, run_id, stats))
+        reports = report_latency(run_id, args.drain)
+    finally:
+        server.should_exit = True
+        server_thread.join(10)
+        stop_worker.set()
+        queue.close()
+        worker_thread.join(10)
+
+    results = {
+        "commit": git_commit(),
+        "started_at": started_at.isoformat(),
+        "config": {
+            "users": args.users,
+            "duration": args.duration,
+            "worker_mode": args.worker_mode,
+            "job_queue_backend": job_queue.JOB_QUEUE_BACKEND,
+            "seed": args.seed,
+        },
+        "elapsed_seconds": round(elapsed, 2),
+        "endpoints": stats.summary(elapsed),
+        "reports": reports,
+    }
+
+    print(f"{'endpoint':<16}{'count':>8}{'errors':>8}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, row in results["endpoints"].items():
+        print(f"{name:<16}{row['count']:>8}{row['errors']:>8}{row['throughput_per_sec']:>10}"
+              f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+    print(f"reports completed={reports['completed']} pending={reports['pending']} "
+          f"p50={reports['p50_ms']}ms p95={reports['p95_ms']}ms p99={reports['p99_ms']}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
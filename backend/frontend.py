@@ -4,8 +4,10 @@ import streamlit as st
 import requests
 import pandas as pd
 import os
+import json
+import time
 import logging
-from datetime import date
+from datetime import date, timedelta
 
 # --- 백엔드 URL 설정 ---
 # 쿠버네티스 환경 변수 또는 로컬 .env 파일에서 URL을 가져옵니다.
@@ -19,6 +21,28 @@ if not log.handlers:
     log.addHandler(handler)
 log.setLevel(logging.INFO)
 
+# 리포트 완료 알림을 기다리는 최대 시간 (초)
+REPORT_WAIT_SECONDS = 60
+
+
+def wait_for_report(report_id, headers):
+    """/reports/events 스트림에서 report_id의 상태가 바뀔 때까지 기다린 뒤 상태를 반환, 시간 초과면 None"""
+    deadline = time.monotonic() + REPORT_WAIT_SECONDS
+    with requests.get(f"{BACKEND_URL}/api/v1/reports/events", headers=headers, stream=True, timeout=(5, 20)) as stream:
+        # 구독을 연 뒤에 한 번 확인해서 그 사이에 이미 끝난 경우를 놓치지 않음
+        response = requests.get(f"{BACKEND_URL}/api/v1/reports/{report_id}", headers=headers)
+        if response.status_code == 200 and response.json()["status"] != "PENDING":
+            return response.json()["status"]
+        for line in stream.iter_lines(decode_unicode=True):
+            if time.monotonic() > deadline:
+                return None
+            if line and line.startswith("data:"):
+                event = json.loads(line[len("data:"):])
+                if event["report_id"] == report_id:
+                    return event["status"]
+    return None
+
+
 # --- 페이지 기본 설정 ---
 st.set_page_config(page_title="TrackFit", page_icon="💨", layout="wide")
 st.title("TrackFit - 러닝 기록 서비스")
@@ -84,6 +108,8 @@ else:
     if st.sidebar.button("로그아웃"):
         del st.session_state['token']
         del st.session_state['user_email']
+        for key in ('runs', 'runs_etag', 'reports', 'reports_etag'):
+            st.session_state.pop(key, None)
         st.rerun()
 
     headers = {"Authorization": f"Bearer {st.session_state['token']}"}
@@ -114,21 +140,37 @@ else:
                         st.error(f"서버에 연결할 수 없습니다: {e}")
 
         # --- 리포트 생성 요청 ---
-        with st.expander("데일리 리포트 생성 요청"):
+        report_types = {"데일리": "daily", "주간": "weekly", "월간": "monthly", "기간 지정": "range"}
+        with st.expander("리포트 생성 요청"):
             with st.form("report_form", clear_on_submit=True):
-                target_date = st.date_input("분석할 날짜 선택", value=date.today())
+                report_label = st.selectbox("리포트 종류", list(report_types.keys()))
+                target_date = st.date_input("분석할 날짜 선택 (기간 지정 시 종료일)", value=date.today())
+                start_date = st.date_input("시작일 (기간 지정 리포트만 사용)", value=date.today())
                 report_submitted = st.form_submit_button("리포트 요청")
 
                 if report_submitted:
                     try:
-                        payload = {"report_type": "daily", "target_date": target_date.isoformat()}
+                        payload = {"report_type": report_types[report_label], "target_date": target_date.isoformat()}
+                        if payload["report_type"] == "range":
+                            payload["start_date"] = start_date.isoformat()
                         log.info(f"Sending report creation request: payload={payload}")
                         response = requests.post(
                             f"{BACKEND_URL}/api/v1/reports/", headers=headers, json=payload
                         )
                         log.info(f"Report creation response: status_code={response.status_code}")
-                        if response.status_code == 202:
-                            st.success(f"{target_date}의 리포트 생성이 요청되었습니다. 잠시 후 백그라운드에서 처리됩니다.")
+                        if response.status_code == 200:
+                            st.success(f"{target_date}의 {report_label} 리포트가 이미 생성되어 있습니다. 리포트 목록에서 확인하세요.")
+                        elif response.status_code == 202:
+                            st.success(f"{target_date}의 {report_label} 리포트 생성이 요청되었습니다. 잠시 후 백그라운드에서 처리됩니다.")
+                            # 새로고침을 반복하지 않고 서버가 보내는 완료 알림을 기다림
+                            with st.spinner("리포트가 완료되기를 기다리는 중입니다..."):
+                                report_status = wait_for_report(response.json()["report_id"], headers)
+                            if report_status == "COMPLETED":
+                                st.success("리포트가 완료되었습니다. 리포트 목록을 새로고침하세요.")
+                            elif report_status is not None:
+                                st.error(f"리포트 생성에 실패했습니다: {report_status}")
+                            else:
+                                st.info("리포트가 아직 처리 중입니다. 잠시 후 목록을 새로고침하세요.")
                         else:
                             log.error(f"Report creation failed: status_code={response.status_code}, body={response.text}")
                             st.error(f"리포트 요청에 실패했습니다: {response.text}")
@@ -138,15 +180,50 @@ else:
 
     # --- 오른쪽 컬럼: 기록 및 리포트 조회 ---
     with col2:
+        # --- 훈련 통계 ---
+        # 롤링 거리, 페이스 추세, 연속 기록은 서버에서 계산해서 한 번의 요청으로 받음
+        st.subheader("훈련 통계")
+        stats_start, stats_end = st.columns(2)
+        stats_start_date = stats_start.date_input("통계 시작일", value=date.today() - timedelta(days=27))
+        stats_end_date = stats_end.date_input("통계 종료일", value=date.today())
+        if st.button("통계 보기"):
+            try:
+                response = requests.get(
+                    f"{BACKEND_URL}/api/v1/stats/", headers=headers,
+                    params={"start_date": stats_start_date.isoformat(), "end_date": stats_end_date.isoformat()}
+                )
+                if response.status_code == 200:
+                    stats = response.json()
+                    m1, m2, m3 = st.columns(3)
+                    m1.metric("총 거리 (km)", f"{stats['total_distance_km']:.2f}")
+                    m2.metric("최장 거리 (km)", f"{stats['longest_run_km'] or 0:.2f}")
+                    m3.metric("연속 달린 날", f"{stats['current_streak_days']}일 (최장 {stats['longest_streak_days']}일)")
+                    if stats['pace_trend_seconds_per_km_per_week'] is not None:
+                        st.caption(f"페이스 추세: 주당 {stats['pace_trend_seconds_per_km_per_week']:+.1f}초/km (음수면 빨라지는 중)")
+                    df_stats = pd.DataFrame(stats["days"]).set_index("day")
+                    st.line_chart(df_stats[['rolling_7d_km', 'rolling_28d_km']])
+                else:
+                    st.error(f"통계를 불러오는 데 실패했습니다: {response.text}")
+            except requests.exceptions.RequestException as e:
+                st.error(f"서버에 연결할 수 없습니다: {e}")
+
         # --- 달리기 기록 조회 ---
         st.subheader("나의 달리기 기록")
         if st.button("기록 새로고침"):
             try:
-                response = requests.get(f"{BACKEND_URL}/api/v1/runs/", headers=headers)
+                # 마지막으로 받은 ETag를 보내서 바뀐 게 없으면 304와 함께 이전 목록을 그대로 사용
+                response = requests.get(
+                    f"{BACKEND_URL}/api/v1/runs/",
+                    headers={**headers, "If-None-Match": st.session_state.get('runs_etag', '')}
+                )
                 if response.status_code == 200:
-                    runs = response.json()
+                    st.session_state['runs'] = response.json()["items"]
+                    st.session_state['runs_etag'] = response.headers.get("ETag", "")
+                if response.status_code in (200, 304):
+                    runs = st.session_state['runs']
                     if runs:
-                        df_runs = pd.DataFrame(runs).sort_values(by="run_date", ascending=False)
+                        # 서버가 최신순으로 정렬해서 보냄
+                        df_runs = pd.DataFrame(runs)
                         st.dataframe(df_runs[['run_date', 'distance_km', 'duration_seconds', 'notes']])
                     else:
                         st.info("아직 달리기 기록이 없습니다.")
@@ -158,24 +235,38 @@ else:
         st.subheader("나의 리포트")
         if st.button("리포트 목록 새로고침"):
             try:
-                response = requests.get(f"{BACKEND_URL}/api/v1/reports/", headers=headers)
+                response = requests.get(
+                    f"{BACKEND_URL}/api/v1/reports/",
+                    headers={**headers, "If-None-Match": st.session_state.get('reports_etag', '')}
+                )
                 if response.status_code == 200:
-                    reports = response.json()
-                    if reports:
-                        df_reports = pd.DataFrame(reports).sort_values(by="target_date", ascending=False)
-                        st.dataframe(df_reports[['target_date', 'report_type', 'status']])
-                        
-                        # 완료된 리포트가 있으면 내용 보여주기
-                        completed_reports = [r for r in reports if r['status'] == 'COMPLETED' and r['content']]
-                        if completed_reports:
-                            st.write("---")
-                            st.write("#### 리포트 목록")
-                            for report in completed_reports:
-                                st.json(report['content'])
-                    else:
-                        st.info("아직 생성된 리포트가 없습니다.")
-                else:
+                    # 목록에는 content가 없으므로 내용은 선택한 리포트만 따로 불러옴
+                    st.session_state['reports'] = response.json()["items"]
+                    st.session_state['reports_etag'] = response.headers.get("ETag", "")
+                elif response.status_code != 304:
                     st.error("리포트 목록을 불러오는 데 실패했습니다.")
             except requests.exceptions.RequestException as e:
                 st.error(f"서버에 연결할 수 없습니다: {e}")
 
+        if 'reports' in st.session_state:
+            reports = st.session_state['reports']
+            if reports:
+                df_reports = pd.DataFrame(reports)
+                st.dataframe(df_reports[['target_date', 'report_type', 'status']])
+
+                # 완료된 리포트가 있으면 선택한 리포트의 내용 보여주기
+                completed_reports = {f"{r['target_date']} {r['report_type']} (#{r['id']})": r['id'] for r in reports if r['status'] == 'COMPLETED'}
+                if completed_reports:
+                    st.write("---")
+                    selected = st.selectbox("리포트 선택", list(completed_reports.keys()))
+                    try:
+                        response = requests.get(f"{BACKEND_URL}/api/v1/reports/{completed_reports[selected]}", headers=headers)
+                        if response.status_code == 200:
+                            st.json(response.json()['content'])
+                        else:
+                            st.error("리포트 내용을 불러오는 데 실패했습니다.")
+                    except requests.exceptions.RequestException as e:
+                        st.error(f"서버에 연결할 수 없습니다: {e}")
+            else:
+                st.info("아직 생성된 리포트가 없습니다.")
+
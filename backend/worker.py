@@ -1,113 +1,421 @@
 import time
 import json
 import os
-import boto3
+import threading
+import numpy as np
 import pandas as pd
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import date, timedelta
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, scoped_session
 from app.database import SessionLocal
-from app import crud, models
+from app import crud, job_queue, metrics, models, tracing
+from prometheus_client import start_http_server
 import logging
 
 # .env 파일 로드 (로컬 개발 환경용)
 load_dotenv()
 
 
-SQS_QUEUE_URL = os.getenv("SQS_QUEUE_URL")
-AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2")
+# 컨슈머 모드: "serial"은 기존처럼 한 건씩, "concurrent"는 스레드 풀에서 동시에 처리
+WORKER_MODE = os.getenv("WORKER_MODE", "serial")
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+# 큐에서 한 번에 받을 수 있는 최대 메시지 수 (SQS 한도)
+QUEUE_MAX_BATCH = job_queue.JobQueue.max_batch
+# 메시지가 없을 때 한 번의 receive에서 기다리는 시간 (SQS long polling 최대값)
+QUEUE_WAIT_SECONDS = 20
+QUEUE_VISIBILITY_TIMEOUT = int(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "60"))
+# 처리 시간이 이 값을 넘으면 visibility timeout을 연장해 중복 수신을 막음
+QUEUE_VISIBILITY_EXTEND_AFTER = int(os.getenv("QUEUE_VISIBILITY_EXTEND_AFTER", str(QUEUE_VISIBILITY_TIMEOUT // 2)))
+# Prometheus 메트릭을 노출하는 포트
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 log = logging.getLogger("worker")
 
-def _generate_report_content(db: Session, user_id: int, target_date: date):
-    """실제 DB에서 데이터를 조회하여 리포트 내용을 계산하는 함수"""
-    start_time = pd.to_datetime(target_date)
-    end_time = start_time + timedelta(days=1)
-
-    runs_on_date = db.query(models.Run).filter(
-        models.Run.user_id == user_id,
-        models.Run.run_date >= start_time,
-        models.Run.run_date < end_time
-    ).all()
+def _round_or_none(value, digits=1):
+    return round(float(value), digits) if value is not None else None
 
-    if not runs_on_date:
+def _build_report_content(target_date: date, row):
+    """run_daily_stats 한 행을 리포트 내용으로 변환하는 함수"""
+    if row is None or not row.run_count:
         return {
             "date": target_date.isoformat(),
             "total_runs": 0,
             "message": "해당 날짜에 달리기 기록이 없습니다."
         }
 
-    total_distance = sum(run.distance_km for run in runs_on_date)
-    total_duration_seconds = sum(run.duration_seconds for run in runs_on_date)
+    total_distance = float(row.total_distance_km)
+    total_duration_seconds = int(row.total_duration_seconds)
 
     content = {
         "date": target_date.isoformat(),
-        "total_runs": len(runs_on_date),
-        "total_distance_km": float(total_distance),
-        "total_duration_seconds": total_duration_seconds
+        "total_runs": row.run_count,
+        "total_distance_km": total_distance,
+        "total_duration_seconds": total_duration_seconds,
+        "avg_pace_seconds_per_km": _round_or_none(total_duration_seconds / total_distance) if total_distance else None,
+        "best_pace_seconds_per_km": _round_or_none(row.best_pace_seconds_per_km),
+        "slowest_pace_seconds_per_km": _round_or_none(row.slowest_pace_seconds_per_km),
+        "longest_run_km": float(row.longest_run_km),
+    }
+    return content
+
+def _generate_report_content(db: Session, user_id: int, target_date: date):
+    """실제 DB에서 데이터를 조회하여 리포트 내용을 계산하는 함수
+    runs를 스캔하지 않고 run_daily_stats에서 해당 날짜 한 행만 읽음"""
+    row = crud.get_run_daily_stats(db, user_id, target_date)
+    return _build_report_content(target_date, row)
+
+def _generate_report_contents(db: Session, keys):
+    """여러 (user_id, target_date) 쌍의 리포트를 한 번의 DB 왕복으로 계산하는 함수
+    반환값은 {(user_id, target_date): content}"""
+    keys = set(keys)
+    rows_by_key = {(row.user_id, row.day): row for row in crud.get_run_daily_stats_bulk(db, keys)}
+    return {
+        (user_id, target_date): _build_report_content(target_date, rows_by_key.get((user_id, target_date)))
+        for user_id, target_date in keys
+    }
+
+def _load_runs_frame(db: Session, user_id: int, start: date, end: date) -> pd.DataFrame:
+    """기간 내 기록을 쿼리 한 번으로 읽어 컬럼 단위 DataFrame으로 만드는 함수"""
+    # 날짜는 run_daily_stats와 같이 UTC 기준 (crud.run_day_of)
+    run_day = crud.run_day_expression()
+    rows = db.query(run_day, models.Run.distance_km, models.Run.duration_seconds).filter(
+        models.Run.user_id == user_id,
+        models.Run.run_date >= crud.day_start_utc(start),
+        models.Run.run_date < crud.day_start_utc(end + timedelta(days=1))
+    ).all()
+    frame = pd.DataFrame.from_records(rows, columns=["run_day", "distance_km", "duration_seconds"])
+    return frame.astype({"run_day": "datetime64[ns]", "distance_km": "float64", "duration_seconds": "int64"})
+
+PACE_PERCENTILES = (10, 25, 50, 75, 90)
+PACE_HISTOGRAM_BIN_SECONDS = 30
+PACE_HISTOGRAM_MAX_BINS = 20
+
+def _summarize_range(frame: pd.DataFrame, start: date, end: date, report_type: str):
+    """기간 리포트 내용을 벡터 연산으로 계산하는 함수
+    frame에는 직전 주 비교를 위해 start 이전 7일치 기록이 포함될 수 있음"""
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    # 직전 주와의 비교를 위해 start가 속한 주의 바로 앞 주 월요일부터 일별로 채움
+    baseline_start = start_ts - pd.Timedelta(days=start_ts.weekday() + 7)
+    days = pd.date_range(baseline_start, end_ts, freq="D")
+
+    per_day = frame.groupby("run_day").agg(
+        runs=("distance_km", "size"),
+        distance_km=("distance_km", "sum"),
+        duration_seconds=("duration_seconds", "sum"),
+    ).reindex(days, fill_value=0)
+
+    in_range = per_day.loc[start_ts:end_ts]
+    total_distance = float(in_range["distance_km"].sum())
+    total_duration = int(in_range["duration_seconds"].sum())
+
+    # 주별 합계와 전주 대비 증감 (주는 월요일 시작)
+    weekly = per_day.resample("W-MON", label="left", closed="left").sum()
+    weekly["distance_delta_km"] = weekly["distance_km"].diff()
+    weekly["distance_change_pct"] = weekly["distance_km"].pct_change().replace([np.inf, -np.inf], np.nan) * 100
+    weekly = weekly[weekly.index + pd.Timedelta(days=6) >= start_ts]
+
+    # 기록별 페이스 분포
+    runs_in_range = frame[(frame["run_day"] >= start_ts) & (frame["run_day"] <= end_ts)]
+    distance = runs_in_range["distance_km"].to_numpy()
+    paces = runs_in_range["duration_seconds"].to_numpy()[distance > 0] / distance[distance > 0]
+
+    content = {
+        "report_type": report_type,
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "total_runs": int(in_range["runs"].sum()),
+        "active_days": int((in_range["runs"] > 0).sum()),
+        "total_distance_km": round(total_distance, 2),
+        "total_duration_seconds": total_duration,
+        "avg_pace_seconds_per_km": round(total_duration / total_distance, 1) if total_distance else None,
+        "daily": _frame_records(in_range.round({"distance_km": 2}), "date"),
+        "weekly": _frame_records(weekly.round({"distance_km": 2, "distance_delta_km": 2, "distance_change_pct": 1}), "week_start"),
+        "pace_distribution": _pace_distribution(paces),
     }
     return content
 
-def process_messages():
-    """SQS 큐를 확인하고 메시지를 처리하는 메인 함수"""
-    sqs_client = boto3.client('sqs', region_name=AWS_REGION)
+def _frame_records(frame: pd.DataFrame, index_name: str):
+    records = frame.rename_axis(index_name).reset_index()
+    records[index_name] = records[index_name].dt.strftime("%Y-%m-%d")
+    # NaN은 JSON에서 null이 되도록 None으로 바꿈
+    return records.astype(object).where(records.notna(), None).to_dict("records")
+
+def _pace_distribution(paces: np.ndarray):
+    if paces.size == 0:
+        return None
+    percentiles = np.percentile(paces, PACE_PERCENTILES)
+    # 구간 폭은 30초 단위로 늘려서 구간 수가 PACE_HISTOGRAM_MAX_BINS를 넘지 않게 함
+    low = np.floor(paces.min() / PACE_HISTOGRAM_BIN_SECONDS) * PACE_HISTOGRAM_BIN_SECONDS
+    steps = np.ceil((paces.max() - low + 1) / PACE_HISTOGRAM_BIN_SECONDS / PACE_HISTOGRAM_MAX_BINS)
+    width = PACE_HISTOGRAM_BIN_SECONDS * max(steps, 1)
+    edges = low + width * np.arange(np.floor((paces.max() - low) / width) + 2)
+    counts, edges = np.histogram(paces, bins=edges)
+    return {
+        "min": round(float(paces.min()), 1),
+        "max": round(float(paces.max()), 1),
+        **{f"p{p}": round(float(v), 1) for p, v in zip(PACE_PERCENTILES, percentiles)},
+        "histogram": {"bin_edges": edges.round(1).tolist(), "counts": counts.tolist()},
+    }
 
+def _generate_range_report_content(db: Session, user_id: int, report_type: str, target_date: date, start_date: date = None):
+    """weekly/monthly/range 리포트 내용을 계산하는 함수
+    기간 전체(와 전주 비교용 7일)를 한 번에 읽고 일별/주별 집계는 pandas로 계산"""
+    start, end = crud.report_period(report_type, target_date, start_date)
+    baseline_start, _ = crud.report_data_period(report_type, target_date, start_date)
+    frame = _load_runs_frame(db, user_id, baseline_start, end)
+    return _summarize_range(frame, start, end, report_type)
 
-    log.info("Checking for messages in SQS queue...")
-    log.info(f"SQS_QUEUE_URL: {SQS_QUEUE_URL}")
+# received_at은 큐에서 받은 시각 (time.perf_counter), 받은 뒤 완료까지의 시간 측정용
+# trace_id/parent_span_id는 리포트를 요청한 API의 trace (app.tracing)
+ReportJob = namedtuple("ReportJob", [
+    "receipt_handle", "report_id", "user_id", "report_type", "target_date", "start_date", "received_at",
+    "trace_id", "parent_span_id"
+])
+
+def _generate_job_content(db: Session, job: ReportJob):
+    if job.report_type == "daily":
+        return _generate_report_content(db, job.user_id, job.target_date)
+    return _generate_range_report_content(db, job.user_id, job.report_type, job.target_date, job.start_date)
+
+def _parse_messages(messages):
+    """큐 메시지(job_queue.Job) 본문을 ReportJob으로 파싱하는 함수, 받은 직후에 호출"""
+    received_at = time.perf_counter()
+    received_ns = time.time_ns()
+    jobs = []
+    for message in messages:
+        try:
+            body = json.loads(message.body)
+            start_date = body.get('start_date')
+            # trace_id는 본문에 있고, SQS에서는 메시지 속성으로도 전달됨
+            trace_id = body.get('trace_id') or (message.attributes or {}).get('trace_id') or tracing.new_trace_id()
+            parent_span_id = body.get('parent_span_id')
+            if body.get('published_at'):
+                tracing.record_span("report.queue_wait", trace_id, int(body['published_at'] * 1e9), received_ns,
+                                    parent_span_id, report_id=body['report_id'])
+            jobs.append(ReportJob(
+                message.receipt,
+                body['report_id'],
+                body['user_id'],
+                body.get('report_type', 'daily'),
+                date.fromisoformat(body['target_date']),
+                date.fromisoformat(start_date) if start_date else None,
+                received_at,
+                trace_id,
+                parent_span_id
+            ))
+        except Exception as e:
+            # 잘못된 메시지는 삭제하지 않아 나중에 다시 처리됨
+            log.error(f"Error parsing message {message.id}: {e}", exc_info=True)
+    return jobs
+
+def _receive(queue: job_queue.JobQueue, max_messages: int, wait_seconds: float = QUEUE_WAIT_SECONDS):
+    """메시지를 받아오는 함수, 수신에 실패하면 None을 반환"""
     try:
-        response = sqs_client.receive_message(
-            QueueUrl=SQS_QUEUE_URL,
-            MaxNumberOfMessages=5, # 한 번에 여러 메시지 처리 가능
-            WaitTimeSeconds=20
-        )
+        return queue.receive(max_messages, wait_seconds, QUEUE_VISIBILITY_TIMEOUT)
     except Exception as e:
-        log.error(f"Failed to receive message from SQS: {e}")
-        return
+        log.error(f"Failed to receive message from queue: {e}")
+        return None
+
+def process_messages(queue: job_queue.JobQueue = None):
+    """큐를 확인하고 메시지를 처리하는 메인 함수
+    수신한 메시지 수를 반환하고, 수신에 실패하면 None을 반환"""
+    if queue is None:
+        queue = job_queue.get_job_queue()
+
+    log.info(f"Checking for messages in {type(queue).__name__}...")
+    messages = _receive(queue, 5)  # 한 번에 여러 메시지 처리 가능
+    if messages is None:
+        return None
+
+    jobs = _parse_messages(messages)
+    if not jobs:
+        return len(messages)
 
-    if "Messages" in response:
-        for message in response["Messages"]:
-            receipt_handle = message['ReceiptHandle']
-            db = None
-            body = None
+    db = SessionLocal()
+    try:
+        # 받은 배치의 daily 리포트는 한 번의 DB 왕복으로 계산
+        daily_keys = [(job.user_id, job.target_date) for job in jobs if job.report_type == "daily"]
+        batch_started_ns = time.time_ns()
+        try:
+            contents = _generate_report_contents(db, daily_keys)
+        except Exception as e:
+            log.error(f"Error generating report contents for {len(daily_keys)} messages: {e}", exc_info=True)
+            metrics.REPORT_FAILURES.labels("daily").inc(len(daily_keys))
+            return len(messages)
+        batch_finished_ns = time.time_ns()
+        # daily 리포트는 배치로 한 번에 계산하므로 각 trace에 같은 구간을 기록
+        for job in jobs:
+            if job.report_type == "daily":
+                tracing.record_span("report.generate", job.trace_id, batch_started_ns, batch_finished_ns, job.parent_span_id,
+                                    report_id=job.report_id, batch_size=len(daily_keys))
+
+        for job in jobs:
+            began = time.perf_counter()
             try:
-                body = json.loads(message['Body'])
-                report_id = body['report_id']
-                user_id = body['user_id']
-                target_date = date.fromisoformat(body['target_date'])
-                
-                log.info(f"Processing report_id: {report_id} for user_id: {user_id}")
-                
-                db = SessionLocal()
-                
-                report_content = _generate_report_content(db, user_id, target_date)
-                log.info(f"Generated report content for report_id: {report_id}")
-                crud.update_report_content(db, report_id, report_content, "COMPLETED")
-                
-                log.info(f"Report {report_id} completed successfully.")
-                
-                # 작업 성공 시 큐에서 메시지 삭제
-                sqs_client.delete_message(
-                    QueueUrl=SQS_QUEUE_URL,
-                    ReceiptHandle=receipt_handle
-                )
+                with tracing.span("report.process", trace_id=job.trace_id, parent_span_id=job.parent_span_id,
+                                  report_id=job.report_id, report_type=job.report_type):
+                    log.info(f"Processing report_id: {job.report_id} for user_id: {job.user_id}")
+
+                    if job.report_type == "daily":
+                        report_content = contents[(job.user_id, job.target_date)]
+                    else:
+                        with tracing.span("report.generate"):
+                            report_content = _generate_job_content(db, job)
+                    log.info(f"Generated report content for report_id: {job.report_id}")
+                    with tracing.span("report.save"):
+                        crud.update_report_content(db, job.report_id, report_content, "COMPLETED")
+
+                    log.info(f"Report {job.report_id} completed successfully.")
+
+                    # 작업 성공 시 큐에서 메시지 삭제
+                    with tracing.span("report.ack"):
+                        queue.ack([job.receipt_handle])
+                completed = time.perf_counter()
+                metrics.REPORT_PROCESSING_SECONDS.labels(job.report_type).observe(completed - began)
+                metrics.REPORT_RECEIVE_TO_COMPLETE_SECONDS.labels(job.report_type).observe(completed - job.received_at)
             except Exception as e:
-                report_id_str = f"report_id {body['report_id']}" if body else "Unknown report"
-                log.error(f"Error processing message for {report_id_str}: {e}", exc_info=True)
+                db.rollback()
+                metrics.REPORT_FAILURES.labels(job.report_type).inc()
+                log.error(f"Error processing message for report_id {job.report_id}: {e}", exc_info=True)
                 # 에러 발생 시 메시지를 삭제하지 않아 나중에 다시 처리됨
-            finally:
-                if db:
-                    db.close()
-                    log.info("Database session closed.")
+    finally:
+        db.close()
+        log.info("Database session closed.")
+
+    return len(messages)
+
+# concurrent 모드에서 풀 스레드마다 하나의 세션을 재사용
+# 메시지마다 SessionLocal()을 새로 열지 않음
+_thread_sessions = scoped_session(SessionLocal)
+
+def _process_job(job: ReportJob):
+    """풀 스레드에서 리포트 한 건을 계산하고 저장하는 함수, 성공 여부를 반환"""
+    db = _thread_sessions()
+    began = time.perf_counter()
+    try:
+        with tracing.span("report.process", trace_id=job.trace_id, parent_span_id=job.parent_span_id,
+                          report_id=job.report_id, report_type=job.report_type):
+            log.info(f"Processing report_id: {job.report_id} for user_id: {job.user_id}")
+            with tracing.span("report.generate"):
+                report_content = _generate_job_content(db, job)
+            with tracing.span("report.save"):
+                crud.update_report_content(db, job.report_id, report_content, "COMPLETED")
+        metrics.REPORT_PROCESSING_SECONDS.labels(job.report_type).observe(time.perf_counter() - began)
+        log.info(f"Report {job.report_id} completed successfully.")
+        return True
+    except Exception as e:
+        db.rollback()
+        metrics.REPORT_FAILURES.labels(job.report_type).inc()
+        log.error(f"Error processing message for report_id {job.report_id}: {e}", exc_info=True)
+        return False
+
+def _extend_visibility(queue: job_queue.JobQueue, receipt_handles):
+    try:
+        queue.extend(receipt_handles, QUEUE_VISIBILITY_TIMEOUT)
+        log.info(f"Extended visibility timeout for {len(receipt_handles)} messages.")
+    except Exception as e:
+        log.error(f"Failed to extend visibility timeout: {e}")
+
+def _delete_messages(queue: job_queue.JobQueue, receipt_handles):
+    if not receipt_handles:
+        return
+    try:
+        queue.ack(receipt_handles)
+    except Exception as e:
+        # 삭제에 실패한 메시지는 다시 수신되어 재처리됨
+        log.error(f"Failed to delete messages from queue: {e}")
+
+def _ack_jobs(queue: job_queue.JobQueue, jobs):
+    """성공한 작업을 한 번의 ack로 삭제하고 완료 메트릭과 ack 구간을 기록하는 함수"""
+    ack_started_ns = time.time_ns()
+    _delete_messages(queue, [job.receipt_handle for job in jobs])
+    ack_finished_ns = time.time_ns()
+    completed = time.perf_counter()
+    for job in jobs:
+        metrics.REPORT_RECEIVE_TO_COMPLETE_SECONDS.labels(job.report_type).observe(completed - job.received_at)
+        tracing.record_span("report.ack", job.trace_id, ack_started_ns, ack_finished_ns, job.parent_span_id,
+                            report_id=job.report_id, batch_size=len(jobs))
+
+def process_messages_concurrently(queue: job_queue.JobQueue, executor: ThreadPoolExecutor,
+                                  stop_event: threading.Event, capacity: int = WORKER_CONCURRENCY):
+    """stop_event가 설정될 때까지 스레드 풀에서 메시지를 동시에 처리하는 루프
+    끝난 작업은 바로 ack하고 빈 자리만큼 다시 받아 오므로, 느린 리포트 하나가 다른 스레드를 놀리지 않음
+    stop_event가 설정되면 더 받지 않고 처리 중인 작업만 마무리함"""
+    pending = {}
+    # 작업별로 마지막으로 visibility timeout을 설정(또는 연장)한 시각
+    extended_at = {}
+    while pending or not stop_event.is_set():
+        free = capacity - len(pending)
+        refilled = False
+        if free > 0 and not stop_event.is_set():
+            # 처리 중인 작업이 있으면 ack가 늦어지지 않도록 기다리지 않고 받음
+            messages = _receive(queue, min(free, QUEUE_MAX_BATCH), 0 if pending else QUEUE_WAIT_SECONDS)
+            if messages is None and not pending:
+                stop_event.wait(1)
+                continue
+            now = time.monotonic()
+            for job in _parse_messages(messages or []):
+                future = executor.submit(_process_job, job)
+                pending[future] = job
+                extended_at[future] = now
+            refilled = bool(messages)
+        if not pending:
+            continue
+
+        # 방금 받은 뒤에도 빈 자리가 남았으면 바로 다시 받고, 아니면 작업이 끝날 때까지 최대 1초 대기
+        timeout = 0 if refilled and len(pending) < capacity else 1
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        succeeded = []
+        for future in done:
+            job = pending.pop(future)
+            del extended_at[future]
+            if future.result():
+                succeeded.append(job)
+        if succeeded:
+            _ack_jobs(queue, succeeded)
+
+        now = time.monotonic()
+        stale = [future for future in pending if now - extended_at[future] >= QUEUE_VISIBILITY_EXTEND_AFTER]
+        if stale:
+            _extend_visibility(queue, [pending[future].receipt_handle for future in stale])
+            for future in stale:
+                extended_at[future] = now
+
+def _queue_depth(queue: job_queue.JobQueue) -> float:
+    """메트릭 수집 시점에 호출됨, 조회에 실패하면 NaN"""
+    try:
+        depth = queue.approximate_depth()
+    except Exception as e:
+        log.error(f"Failed to read queue depth: {e}")
+        return float("nan")
+    return float("nan") if depth is None else float(depth)
+
+def run_worker(queue: job_queue.JobQueue, mode: str = WORKER_MODE, stop_event: threading.Event = None):
+    """stop_event가 설정될 때까지 메시지를 처리하는 루프
+    receive가 메시지가 없을 때 스스로 기다리므로, 수신에 실패했을 때만 1초 쉼"""
+    stop_event = stop_event or threading.Event()
+    if mode == "concurrent":
+        log.info(f"Running concurrent consumer with {WORKER_CONCURRENCY} threads.")
+        with ThreadPoolExecutor(max_workers=WORKER_CONCURRENCY, thread_name_prefix="report") as executor:
+            process_messages_concurrently(queue, executor, stop_event)
+    else:
+        while not stop_event.is_set():
+            if process_messages(queue) is None:
+                stop_event.wait(1)
 
 if __name__ == "__main__":
     log.info("Starting Report Worker...")
-    if not SQS_QUEUE_URL:
-        log.error("CRITICAL: SQS_QUEUE_URL environment variable is not set. Worker exiting.")
+    try:
+        queue = job_queue.get_job_queue()
+    except Exception as e:
+        log.error(f"CRITICAL: Failed to create job queue ({job_queue.JOB_QUEUE_BACKEND}): {e}. Worker exiting.")
     else:
-        while True:
-            process_messages()
-            time.sleep(1)
-
+        log.info(f"Using {job_queue.JOB_QUEUE_BACKEND} job queue backend.")
+        start_http_server(WORKER_METRICS_PORT)
+        metrics.JOB_QUEUE_DEPTH.set_function(lambda: _queue_depth(queue))
+        log.info(f"Serving metrics on port {WORKER_METRICS_PORT}.")
+        run_worker(queue)